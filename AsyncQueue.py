@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+
+class AsyncQueue(object):
+    """
+    Queue for the async methods of ShieldTester (e.g. ShieldTester.compute_async()). Pass it as progress_queue, message_queue or result_queue:
+    the calculation puts items into it from its thread and they can be read on the event loop with "async for".
+    The iteration ends when the calculation is done. Use a new AsyncQueue for each call.
+    """
+    __END = object()
+
+    def __init__(self):
+        self.__loop = None  # type: asyncio.AbstractEventLoop
+        self.__queue = None  # type: asyncio.Queue
+
+    def _get_queue(self) -> asyncio.Queue:
+        # only called on the event loop
+        if self.__queue is None:
+            self.__loop = asyncio.get_running_loop()
+            self.__queue = asyncio.Queue()
+        return self.__queue
+
+    def put(self, item: Any):
+        """
+        Add an item. Can be called from any thread.
+        :raises RuntimeError if the queue isn't used by an async method of ShieldTester
+        """
+        if self.__loop is None:
+            raise RuntimeError("AsyncQueue can only be used with the async methods of ShieldTester")
+        self.__loop.call_soon_threadsafe(self.__queue.put_nowait, item)
+
+    def close(self):
+        """
+        End the iteration after the items that were already added. Can be called from any thread.
+        """
+        if self.__loop is not None:
+            self.__loop.call_soon_threadsafe(self.__queue.put_nowait, AsyncQueue.__END)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        queue = self._get_queue()
+        item = await queue.get()
+        if item is AsyncQueue.__END:
+            queue.put_nowait(item)  # for other readers
+            raise StopAsyncIteration
+        return item
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from .ShieldTester import ShieldTester
+from .SyntheticData import SyntheticData
+from .TestCase import TestCase
+
+try:
+    # noinspection PyUnresolvedReferences
+    import resource
+    _resource_imported = True
+except ImportError:
+    # not available on Windows
+    _resource_imported = False
+
+try:
+    # noinspection PyUnresolvedReferences
+    import psutil
+    _psutil_imported = True
+except ImportError:
+    _psutil_imported = False
+
+
+class Benchmark(object):
+    """
+    Reproducible benchmarks for ShieldTester.
+    Times load_data, select_ship, the prelim filter and compute() for every booster count in the serial and the multiprocessing path.
+    By default a synthetic data file (see SyntheticData) is used, so results of different machines and versions can be compared.
+    Results can be saved as json baseline and later results are compared against it to find regressions.
+
+    Run it with: python -m shield_tester.Benchmark --help
+    """
+    VERSION = 1
+    DEFAULT_TOLERANCE = 0.25  # relative slowdown that counts as regression
+    MIN_DIFFERENCE = 0.002  # seconds, smaller differences are noise
+    MAX_REPEAT_TIME = 2.0  # seconds, slower measurements are not repeated
+    PATH_SERIAL = "serial"
+    PATH_MULTIPROCESSING = "multiprocessing"
+
+    def __init__(self, data_file: str = "", repetitions: int = 3, max_boosters: int = 8, prelim: int = 5, cpu_cores: int = 0,
+                 console_output: bool = True, synthetic_settings: Dict[str, int] = None, compute_options: Dict[str, Any] = None):
+        """
+        :param data_file: data file to use. A synthetic data file is created if empty
+        :param repetitions: each measurement is repeated this many times and the fastest time is used
+        :param max_boosters: compute() is timed for 0 to max_boosters boosters
+        :param prelim: number of loadouts for the prelim filter
+        :param cpu_cores: cores for the multiprocessing path, all cores if 0. The path is skipped if only 1 core is available
+        :param console_output: print progress and results
+        :param synthetic_settings: settings for SyntheticData.create()
+        :param compute_options: additional arguments for compute() (e.g. engine)
+        """
+        self.data_file = data_file
+        self.repetitions = max(1, repetitions)
+        self.max_boosters = max(0, min(8, max_boosters))
+        self.prelim = prelim
+        self.cpu_cores = cpu_cores or os.cpu_count()
+        self.console_output = console_output
+        self.synthetic_settings = synthetic_settings or dict()
+        self.compute_options = compute_options or dict()
+
+    @staticmethod
+    def get_peak_rss(children: bool = False) -> int:
+        """
+        Peak resident set size in bytes.
+        :param children: peak of the terminated child processes (e.g. the worker pool) instead of this process
+        :return: bytes or 0 if unknown
+        """
+        if _resource_imported:
+            usage = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF)
+            # kilobytes on Linux, bytes on macOS
+            return usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+        if _psutil_imported and not children:
+            memory_info = psutil.Process().memory_info()
+            return getattr(memory_info, "peak_wset", memory_info.rss)
+        return 0
+
+    def __print(self, text: str):
+        if self.console_output:
+            print(text)
+
+    def __measure(self, function: Callable[[], Any]) -> float:
+        """
+        :return: fastest time of all repetitions in seconds
+        """
+        best = float("inf")
+        for _ in range(self.repetitions):
+            start = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start
+            best = min(best, elapsed)
+            if elapsed > Benchmark.MAX_REPEAT_TIME:
+                break
+        return best
+
+    @staticmethod
+    def __select_benchmark_ship(tester: ShieldTester) -> TestCase:
+        # ship with the most utility slots, the first one if there are several
+        test_cases = [tester.select_ship(name) for name in tester.ship_names]
+        return max(test_cases, key=lambda tc: tc.ship.utility_slots)
+
+    def __run_compute(self, tester: ShieldTester, path: str, timings: Dict[str, float], throughput: Dict[str, float]):
+        test_case = Benchmark.__select_benchmark_ship(tester)
+        tester.set_boosters_to_test(test_case, short_list=False)
+        test_case.explosive_dps = 40
+        test_case.kinetic_dps = 60
+        test_case.thermal_dps = 60
+        test_case.absolute_dps = 5
+        test_case.damage_effectiveness = 0.7
+        for number_of_boosters in range(0, min(self.max_boosters, test_case.ship.utility_slots) + 1):
+            test_case.number_of_boosters_to_test = number_of_boosters
+            number_of_tests = tester.calculate_number_of_tests(test_case)
+            seconds = self.__measure(lambda: tester.compute(test_case, use_cache=False, **self.compute_options))
+            key = f"compute_{path}_{number_of_boosters}"
+            timings[key] = seconds
+            throughput[key] = number_of_tests / seconds if seconds > 0 else 0
+            self.__print(f"{key:<30}{seconds:>10.4f} s {throughput[key]:>14,.0f} loadouts/s")
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Run all benchmarks.
+        :return: dictionary with settings, timings (seconds), throughput (loadouts per second) and peak RSS (bytes)
+        """
+        timings = dict()  # type: Dict[str, float]
+        throughput = dict()  # type: Dict[str, float]
+        directory = tempfile.mkdtemp(prefix="shield_tester_benchmark_")
+        try:
+            # work on a copy, so the cache directory of the benchmark doesn't mix with the real one
+            data_file = os.path.join(directory, "data.json")
+            if self.data_file:
+                shutil.copyfile(self.data_file, data_file)
+            else:
+                SyntheticData.write(data_file, **self.synthetic_settings)
+
+            def load_data_uncached():
+                shutil.rmtree(os.path.join(directory, ShieldTester.CACHE_DIRECTORY_NAME), ignore_errors=True)
+                ShieldTester().load_data(data_file)
+
+            timings["load_data"] = self.__measure(load_data_uncached)
+            timings["load_data_cached"] = self.__measure(lambda: ShieldTester().load_data(data_file))
+
+            tester = ShieldTester()
+            tester.load_data(data_file)
+            names = tester.ship_names
+            timings["select_ship"] = self.__measure(lambda: [tester.select_ship(name) for name in names]) / len(names)
+
+            test_case = Benchmark.__select_benchmark_ship(tester)
+            test_case.kinetic_dps = 60
+            test_case.thermal_dps = 60
+            test_case.damage_effectiveness = 0.7
+            timings["prelim"] = self.__measure(lambda: ShieldTester.get_preliminary_loadouts(test_case, self.prelim))
+            for key in ("load_data", "load_data_cached", "select_ship", "prelim"):
+                self.__print(f"{key:<30}{timings[key]:>10.4f} s")
+
+            tester.cpu_cores = 1
+            self.__run_compute(tester, Benchmark.PATH_SERIAL, timings, throughput)
+            if self.cpu_cores > 1:
+                tester.cpu_cores = self.cpu_cores
+                tester.start_pool()
+                self.__run_compute(tester, Benchmark.PATH_MULTIPROCESSING, timings, throughput)
+                tester.shutdown()
+            else:
+                self.__print("Multiprocessing path skipped: only 1 CPU core available")
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+        return {"version": Benchmark.VERSION,
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "settings": {"data_file": self.data_file,
+                             "synthetic_settings": self.synthetic_settings,
+                             "repetitions": self.repetitions,
+                             "max_boosters": self.max_boosters,
+                             "prelim": self.prelim,
+                             "cpu_cores": self.cpu_cores,
+                             "compute_options": self.compute_options},
+                "timings": timings,
+                "throughput": throughput,
+                "peak_rss": Benchmark.get_peak_rss(),
+                "peak_rss_children": Benchmark.get_peak_rss(children=True)}
+
+    @staticmethod
+    def save(results: Dict[str, Any], file: str):
+        with open(file, "w") as json_file:
+            json.dump(results, json_file, indent=2)
+
+    @staticmethod
+    def load(file: str) -> Dict[str, Any]:
+        """
+        :raises RuntimeError if the file is not a benchmark baseline of this version
+        """
+        with open(file) as json_file:
+            results = json.load(json_file)
+        if results.get("version") != Benchmark.VERSION:
+            raise RuntimeError(f"{file} is not a benchmark baseline of version {Benchmark.VERSION}")
+        return results
+
+    @staticmethod
+    def compare(baseline: Dict[str, Any], results: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+        """
+        Compare results with a baseline. Only measurements that exist in both are compared.
+        :param baseline: earlier results
+        :param results: new results
+        :param tolerance: relative slowdown that is accepted (0.25 = 25 % slower)
+        :return: list of regressions as readable text, empty if there are none
+        """
+        regressions = list()
+        for key, seconds in results["timings"].items():
+            baseline_seconds = baseline["timings"].get(key)
+            if baseline_seconds is None:
+                continue
+            if seconds > baseline_seconds * (1 + tolerance) and seconds - baseline_seconds > Benchmark.MIN_DIFFERENCE:
+                regressions.append(f"{key}: {seconds:.4f} s instead of {baseline_seconds:.4f} s (+{(seconds / baseline_seconds - 1) * 100:.0f} %)")
+        if baseline.get("peak_rss") and results.get("peak_rss", 0) > baseline["peak_rss"] * (1 + tolerance):
+            regressions.append(f"peak_rss: {results['peak_rss']:,} bytes instead of {baseline['peak_rss']:,} bytes")
+        return regressions
+
+    @staticmethod
+    def main(args: List[str] = None) -> int:
+        """
+        Command line interface.
+        :return: exit code: 0 if there are no regressions, 1 otherwise
+        """
+        parser = argparse.ArgumentParser(prog="python -m shield_tester.Benchmark", description="Benchmarks for the shield tester")
+        parser.add_argument("--data", default="", help="data file to use instead of synthetic data")
+        parser.add_argument("--ships", type=int, default=6, help="number of synthetic ships")
+        parser.add_argument("--classes", type=int, default=8, help="synthetic shield generator classes (1-8)")
+        parser.add_argument("--blueprints", type=int, default=5, help="synthetic shield generator blueprints")
+        parser.add_argument("--experimentals", type=int, default=7, help="synthetic experimental effects")
+        parser.add_argument("--boosters", type=int, default=12, help="synthetic booster variants")
+        parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic data")
+        parser.add_argument("--max-boosters", type=int, default=8, help="highest booster count to test")
+        parser.add_argument("--repetitions", type=int, default=3)
+        parser.add_argument("--cores", type=int, default=0, help="CPU cores for the multiprocessing path, 0 for all")
+        parser.add_argument("--engine", default=ShieldTester.ENGINE_PYTHON, choices=(ShieldTester.ENGINE_PYTHON, ShieldTester.ENGINE_NUMPY))
+        parser.add_argument("--save", default="", help="save results as json baseline")
+        parser.add_argument("--baseline", default="", help="compare results with this baseline")
+        parser.add_argument("--tolerance", type=float, default=Benchmark.DEFAULT_TOLERANCE, help="accepted relative slowdown")
+        options = parser.parse_args(args)
+
+        benchmark = Benchmark(data_file=options.data,
+                              repetitions=options.repetitions,
+                              max_boosters=options.max_boosters,
+                              cpu_cores=options.cores,
+                              synthetic_settings={"number_of_ships": options.ships,
+                                                  "module_classes": options.classes,
+                                                  "number_of_blueprints": options.blueprints,
+                                                  "number_of_experimentals": options.experimentals,
+                                                  "number_of_booster_variants": options.boosters,
+                                                  "seed": options.seed},
+                              compute_options={"engine": options.engine})
+        results = benchmark.run()
+        print(f"Peak RSS: {results['peak_rss'] / 2 ** 20:.1f} MiB (workers: {results['peak_rss_children'] / 2 ** 20:.1f} MiB)")
+        if options.save:
+            Benchmark.save(results, options.save)
+        if options.baseline:
+            regressions = Benchmark.compare(Benchmark.load(options.baseline), results, options.tolerance)
+            for regression in regressions:
+                print(f"REGRESSION {regression}")
+            if regressions:
+                return 1
+            print("No regressions")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(Benchmark.main())
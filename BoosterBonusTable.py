@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import array
+import hashlib
+import os
+import pickle
+from typing import List, Optional, Tuple
+
+from .CombinationRange import CombinationRange
+from .ShieldBoosterVariant import ShieldBoosterVariant
+from .Utility import Utility
+from .VectorizedEngine import VectorizedEngine
+
+
+class BoosterBonusTable(object):
+    """
+    Booster bonuses (exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus) with diminishing returns applied
+    for every combination (with replacement) of a set of booster variants.
+    The bonuses don't depend on ship or damage, so a table can be reused for every test with the same booster variants and booster count.
+    """
+    VERSION = 1
+    FILE_PREFIX = "booster_bonuses_"
+    BLOCK_SIZE = 65536  # combinations that are calculated at once with NumPy
+
+    def __init__(self, key: str, number_of_variants: int, number_of_boosters: int, bonuses: array.array, data_hash: str = ""):
+        self.key = key
+        self.number_of_variants = number_of_variants
+        self.number_of_boosters = number_of_boosters
+        self.bonuses = bonuses  # flat array with 4 values per combination
+        self.data_hash = data_hash  # hash of the data file the booster variants were loaded from
+
+    def __len__(self):
+        return len(self.bonuses) // 4
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the bonuses in bytes
+        """
+        return len(self.bonuses) * self.bonuses.itemsize
+
+    @property
+    def combinations(self) -> CombinationRange:
+        """
+        Booster combinations in the same order as the bonuses. Combinations are tuples of indexes of the booster variants.
+        They are created on demand, slices only contain the range of the combinations.
+        """
+        return CombinationRange(self.number_of_variants, self.number_of_boosters)
+
+    def get_bonuses(self, index: int) -> Tuple[float, float, float, float]:
+        """
+        Get the bonuses of a single combination
+        :param index: index of the combination
+        :return: tuple: exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus
+        """
+        return tuple(self.bonuses[index * 4:index * 4 + 4])
+
+    def get_bonuses_slice(self, start: int, end: int) -> array.array:
+        """
+        Get the flat bonuses (4 values per combination) for the combinations from start to end (excluding)
+        """
+        return self.bonuses[start * 4:end * 4]
+
+    @staticmethod
+    def count_combinations(number_of_variants: int, number_of_boosters: int) -> int:
+        """
+        Number of combinations with replacement of number_of_boosters out of number_of_variants
+        """
+        return CombinationRange.count(number_of_variants, number_of_boosters)
+
+    @staticmethod
+    def create_key(shield_booster_variants: List[ShieldBoosterVariant], number_of_boosters: int) -> str:
+        """
+        Create a key that identifies booster variants (including their order) and booster count.
+        """
+        h = hashlib.sha256()
+        h.update(f"{BoosterBonusTable.VERSION};{number_of_boosters}".encode("utf-8"))
+        for booster in shield_booster_variants:
+            h.update(repr((booster.engineering, booster.experimental, booster.exp_res_bonus, booster.kin_res_bonus,
+                           booster.therm_res_bonus, booster.shield_strength_bonus)).encode("utf-8"))
+        return h.hexdigest()[:32]
+
+    @staticmethod
+    def create(shield_booster_variants: List[ShieldBoosterVariant], number_of_boosters: int, data_hash: str = "") -> BoosterBonusTable:
+        """
+        Calculate the bonuses for all booster combinations.
+        :param shield_booster_variants: booster variants to combine
+        :param number_of_boosters: number of boosters in each combination
+        :param data_hash: hash of the data file
+        :return: new BoosterBonusTable
+        """
+        key = BoosterBonusTable.create_key(shield_booster_variants, number_of_boosters)
+        combinations = CombinationRange(len(shield_booster_variants), number_of_boosters)
+        bonuses = array.array("d")
+        if VectorizedEngine.is_available():
+            # in blocks, so the combinations are never all in memory at once
+            for start in range(0, len(combinations), BoosterBonusTable.BLOCK_SIZE):
+                block = list(combinations[start:start + BoosterBonusTable.BLOCK_SIZE])
+                bonuses.frombytes(VectorizedEngine.pack_booster_bonuses(shield_booster_variants, block).tobytes())
+        else:
+            for combination in combinations:
+                bonuses.extend(ShieldBoosterVariant.calculate_booster_bonuses([shield_booster_variants[x] for x in combination]))
+        return BoosterBonusTable(key, len(shield_booster_variants), number_of_boosters, bonuses, data_hash)
+
+    @staticmethod
+    def get_file_path(directory: str, key: str) -> str:
+        return os.path.join(directory, f"{BoosterBonusTable.FILE_PREFIX}{key}.pickle")
+
+    def save(self, directory: str):
+        """
+        Save table to the cache directory. Existing tables with the same key are overwritten.
+        :raises OSError if the file can't be written
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = BoosterBonusTable.get_file_path(directory, self.key)
+        with open(path + ".tmp", "wb") as table_file:
+            pickle.dump((BoosterBonusTable.VERSION, self.key, self.number_of_variants, self.number_of_boosters, self.data_hash, self.bonuses),
+                        table_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+    @staticmethod
+    def load(directory: str, shield_booster_variants: List[ShieldBoosterVariant], number_of_boosters: int, data_hash: str) -> Optional[BoosterBonusTable]:
+        """
+        Load a table from the cache directory.
+        :param directory: cache directory
+        :param shield_booster_variants: booster variants of the table
+        :param number_of_boosters: booster count of the table
+        :param data_hash: hash of the current data file. Tables created from a different data file are stale.
+        :return: BoosterBonusTable or None if there is no valid table
+        """
+        key = BoosterBonusTable.create_key(shield_booster_variants, number_of_boosters)
+        path = BoosterBonusTable.get_file_path(directory, key)
+        try:
+            with open(path, "rb") as table_file:
+                version, file_key, number_of_variants, file_number_of_boosters, file_data_hash, bonuses = pickle.load(table_file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return None
+
+        if version != BoosterBonusTable.VERSION or file_key != key or file_data_hash != data_hash:
+            return None
+        table = BoosterBonusTable(key, number_of_variants, file_number_of_boosters, bonuses, file_data_hash)
+        if number_of_variants != len(shield_booster_variants) or file_number_of_boosters != number_of_boosters:
+            return None
+        if len(table) != BoosterBonusTable.count_combinations(number_of_variants, number_of_boosters):
+            return None
+        try:
+            os.utime(path)  # prune() removes the tables that weren't used for the longest time
+        except OSError:
+            pass
+        return table
+
+    @staticmethod
+    def prune(directory: str, max_bytes: int, keep: str = "") -> int:
+        """
+        Remove the least recently used tables from the cache directory until the saved tables need at most max_bytes.
+        :param directory: cache directory
+        :param max_bytes: maximum size of all saved tables
+        :param keep: key of a table that is never removed (e.g. the one that was just saved)
+        :return: number of removed files
+        """
+        keep_name = os.path.basename(BoosterBonusTable.get_file_path(directory, keep)) if keep else ""
+        return Utility.prune_files(directory, BoosterBonusTable.FILE_PREFIX, max_bytes, keep_name)
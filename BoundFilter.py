@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+from .DominanceFilter import DominanceFilter
+from .LoadOut import LoadOut
+from .ShieldBoosterVariant import ShieldBoosterVariant
+
+
+class BoundFilter(object):
+    """
+    Remove shield generator variants that can't be part of the best results, using bounds on the result of each variant.
+
+    The upper bound of a variant is its result with the best modifier of all booster variants in every slot, no real booster combination can beat it.
+    The lower bound is the result of a real booster combination: each booster variant in all slots and a greedy combination for the leaders.
+    A variant is removed if its upper bound is worse than the lower bound of the top_k-th best variant, because at least top_k results
+    are known to be better than anything it can reach. Variants that could tie are kept, so the result of the test doesn't change.
+
+    Bounds are only valid if better modifiers always lead to better results. Nothing is removed if that isn't the case (e.g. negative resistances).
+    """
+    # relative tolerance when comparing bounds, protects against rounding differences between bounds and actual values
+    TOLERANCE = 1e-6
+    LEADERS = 5  # variants with the best lower bounds that get a greedy booster combination for a better lower bound
+
+    @staticmethod
+    def is_applicable(test_case, loadout_list: Sequence[LoadOut], shield_booster_variants: Sequence[ShieldBoosterVariant], number_of_boosters: int) -> bool:
+        if not DominanceFilter.is_applicable(test_case):
+            return False
+        if any(min(b.exp_res_bonus, b.kin_res_bonus, b.therm_res_bonus) <= 0 for b in shield_booster_variants):
+            return False
+        if shield_booster_variants and 1 + number_of_boosters * min(b.shield_strength_bonus for b in shield_booster_variants) < 0:
+            return False
+        return all(min(1 - lo.shield_generator.explres, 1 - lo.shield_generator.kinres, 1 - lo.shield_generator.thermres) >= 0 for lo in loadout_list)
+
+    @staticmethod
+    def get_key(test_case, loadout: LoadOut, modifiers: Tuple[float, float, float, float]) -> Tuple[int, float]:
+        """
+        Result of a loadout with the given booster modifiers as comparable key, higher is better.
+        :return: tuple (1, -incoming dps) if the ship doesn't die, (0, survival time) otherwise
+        """
+        exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus = modifiers
+        sg = loadout.shield_generator
+        actual_dps = test_case.damage_effectiveness * (
+                test_case.explosive_dps * (1 - sg.explres) * exp_modifier +
+                test_case.kinetic_dps * (1 - sg.kinres) * kin_modifier +
+                test_case.thermal_dps * (1 - sg.thermres) * therm_modifier +
+                test_case.absolute_dps) - sg.regen * (1.0 - test_case.damage_effectiveness)
+        if actual_dps <= 0:
+            return 1, -actual_dps
+        return 0, (loadout.shield_strength * hitpoint_bonus + test_case.scb_hitpoints + test_case.guardian_hitpoints) / actual_dps
+
+    @staticmethod
+    def is_worse(upper_bound: Tuple[int, float], threshold: Tuple[int, float]) -> bool:
+        """
+        :return: True if a result with upper_bound can't reach a result with threshold, not even with rounding differences
+        """
+        if upper_bound[0] != threshold[0]:
+            return upper_bound[0] < threshold[0]
+        if threshold[0] == 1:
+            # compare incoming dps, more hitpoints only win if the dps is (almost) the same
+            return -upper_bound[1] > -threshold[1] + abs(threshold[1]) * BoundFilter.TOLERANCE
+        return upper_bound[1] < threshold[1] * (1 - BoundFilter.TOLERANCE)
+
+    @staticmethod
+    def __greedy_key(test_case, loadout: LoadOut, shield_booster_variants: Sequence[ShieldBoosterVariant], number_of_boosters: int) -> Tuple[int, float]:
+        combination = list()
+        for _ in range(number_of_boosters):
+            combination.append(max(shield_booster_variants,
+                                   key=lambda b: BoundFilter.get_key(test_case, loadout, ShieldBoosterVariant.calculate_booster_bonuses(combination + [b]))))
+        return BoundFilter.get_key(test_case, loadout, ShieldBoosterVariant.calculate_booster_bonuses(combination))
+
+    @staticmethod
+    def filter_loadouts(test_case, loadout_list: Sequence[LoadOut], shield_booster_variants: Sequence[ShieldBoosterVariant], number_of_boosters: int,
+                        top_k: int = 1) -> List[LoadOut]:
+        """
+        Remove shield generator variants whose upper bound is worse than the lower bound of the top_k-th best variant.
+        :param test_case: TestCase with damage profile
+        :param loadout_list: loadouts to filter
+        :param shield_booster_variants: booster variants that will be tested with the loadouts
+        :param number_of_boosters: number of boosters of each combination
+        :param top_k: number of results that are needed
+        :return: new list with the loadouts that can be part of the best top_k results (same order)
+        """
+        top_k = max(1, top_k)
+        if len(loadout_list) <= top_k or not shield_booster_variants or \
+                not BoundFilter.is_applicable(test_case, loadout_list, shield_booster_variants, number_of_boosters):
+            return list(loadout_list)
+
+        # best modifiers in every slot, diminishing returns don't change the order
+        best = ShieldBoosterVariant()
+        best.exp_res_bonus = min(b.exp_res_bonus for b in shield_booster_variants)
+        best.kin_res_bonus = min(b.kin_res_bonus for b in shield_booster_variants)
+        best.therm_res_bonus = min(b.therm_res_bonus for b in shield_booster_variants)
+        best.shield_strength_bonus = max(b.shield_strength_bonus for b in shield_booster_variants)
+        best_modifiers = ShieldBoosterVariant.calculate_booster_bonuses([best] * number_of_boosters)
+        upper_bounds = [BoundFilter.get_key(test_case, loadout, best_modifiers) for loadout in loadout_list]
+
+        single_variant_modifiers = [ShieldBoosterVariant.calculate_booster_bonuses([b] * number_of_boosters) for b in shield_booster_variants]
+        lower_bounds = [max(BoundFilter.get_key(test_case, loadout, modifiers) for modifiers in single_variant_modifiers) for loadout in loadout_list]
+        leaders = sorted(range(len(loadout_list)), key=lambda i: lower_bounds[i], reverse=True)[:max(top_k, BoundFilter.LEADERS)]
+        for i in leaders:
+            lower_bounds[i] = max(lower_bounds[i], BoundFilter.__greedy_key(test_case, loadout_list[i], shield_booster_variants, number_of_boosters))
+
+        threshold = sorted(lower_bounds, reverse=True)[top_k - 1]
+        return [loadout for loadout, upper_bound in zip(loadout_list, upper_bounds) if not BoundFilter.is_worse(upper_bound, threshold)]
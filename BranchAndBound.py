@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import copy
+import math
+from typing import Dict, List, Tuple
+
+from .DominanceFilter import DominanceFilter
+from .TestResult import TestResult
+
+
+class BranchAndBound(object):
+    """
+    Exact search for the best loadout without testing every booster combination.
+
+    Booster combinations are built one booster at a time in the order of test_case.shield_booster_variants. This visits the complete
+    combinations in the same order as itertools.combinations_with_replacement, so ties are resolved like in TestCase.test_case.
+    For every partial combination, an optimistic bound is calculated for each loadout by filling the remaining slots with the best
+    modifiers of the boosters that can still be added. Loadouts that can't beat the best result are dropped for the whole subtree.
+    """
+    # relative tolerance when comparing bounds, protects against rounding differences between bound and actual values
+    PRUNE_TOLERANCE = 1e-6
+
+    def __init__(self, test_case, number_of_boosters: int):
+        self.test_case = test_case
+        self.number_of_boosters = number_of_boosters
+        self.nodes_visited = 0
+        self.nodes_pruned = 0  # subtrees that were skipped entirely
+        self.leaves_evaluated = 0
+        self.loadouts_evaluated = 0
+
+        self._boosters = [(b.exp_res_bonus, b.kin_res_bonus, b.therm_res_bonus, b.shield_strength_bonus) for b in test_case.shield_booster_variants]
+        # index, 1 - explres, 1 - kinres, 1 - thermres, regen rate, shield strength
+        self._loadouts = [(i,
+                           1 - lo.shield_generator.explres,
+                           1 - lo.shield_generator.kinres,
+                           1 - lo.shield_generator.thermres,
+                           lo.shield_generator.regen * (1.0 - test_case.damage_effectiveness),
+                           lo.shield_strength) for i, lo in enumerate(test_case.loadout_list)]
+
+        # best possible modifiers of the boosters from index i to the end of the list
+        self._suffix_best = [(0.0, 0.0, 0.0, 0.0)] * len(self._boosters)
+        best = (math.inf, math.inf, math.inf, -math.inf)
+        for i in range(len(self._boosters) - 1, -1, -1):
+            b = self._boosters[i]
+            best = (min(best[0], b[0]), min(best[1], b[1]), min(best[2], b[2]), max(best[3], b[3]))
+            self._suffix_best[i] = best
+
+        self._can_bound = self._check_bounds()
+
+        # incumbent, same variables as in TestCase.test_case
+        self._best_survival_time = 0
+        self._lowest_dps = 10000
+        self._best_hitpoints = 0
+        self._best_loadout = None
+        self._best_combination = None
+
+        # best value that is known to be achievable, used for pruning only
+        self._threshold_survived = False
+        self._threshold_value = 0.0  # survival time if the ship dies, dps otherwise
+
+    @property
+    def statistics(self) -> Dict[str, int]:
+        return {"nodes_visited": self.nodes_visited,
+                "nodes_pruned": self.nodes_pruned,
+                "leaves_evaluated": self.leaves_evaluated,
+                "loadouts_evaluated": self.loadouts_evaluated}
+
+    def _check_bounds(self) -> bool:
+        """
+        Bounds are only valid if better modifiers always lead to better results.
+        """
+        if not self._boosters or not DominanceFilter.is_applicable(self.test_case):
+            return False
+        if any(min(b[0:3]) <= 0 for b in self._boosters) or 1 + self.number_of_boosters * min(b[3] for b in self._boosters) < 0:
+            return False
+        return all(min(lo[1:4]) >= 0 for lo in self._loadouts)
+
+    @staticmethod
+    def _apply_diminishing_returns(modifier: float) -> float:
+        if modifier < 0.7:
+            return 0.7 - (0.7 - modifier) / 2
+        return modifier
+
+    def _update_threshold(self, actual_dps: float, survival_time: float):
+        if actual_dps <= 0:
+            if not self._threshold_survived or actual_dps < self._threshold_value:
+                self._threshold_survived = True
+                self._threshold_value = actual_dps
+        elif not self._threshold_survived and survival_time > self._threshold_value:
+            self._threshold_value = survival_time
+
+    def _evaluate(self, loadouts: List[Tuple], modifiers: Tuple[float, float, float, float], combination: List[int], update_incumbent: bool = True):
+        """
+        Evaluate a complete booster combination. Same rules as TestCase.test_case.
+        """
+        test_case = self.test_case
+        damage_effectiveness = test_case.damage_effectiveness
+        explosive_dps = test_case.explosive_dps
+        kinetic_dps = test_case.kinetic_dps
+        thermal_dps = test_case.thermal_dps
+        absolute_dps = test_case.absolute_dps
+        additional_hitpoints = test_case.scb_hitpoints
+        guardian_hitpoints = test_case.guardian_hitpoints
+        exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus = modifiers
+
+        for index, exp, kin, therm, regen_rate, shield_strength in loadouts:
+            exp_res = exp * exp_modifier
+            kin_res = kin * kin_modifier
+            therm_res = therm * therm_modifier
+            hp = shield_strength * hitpoint_bonus
+
+            actual_dps = damage_effectiveness * (
+                    explosive_dps * exp_res +
+                    kinetic_dps * kin_res +
+                    thermal_dps * therm_res +
+                    absolute_dps) - regen_rate
+
+            survival_time = (hp + additional_hitpoints + guardian_hitpoints) / actual_dps
+            self._update_threshold(actual_dps, survival_time)
+            if not update_incumbent:
+                continue
+
+            if actual_dps > 0 and self._best_survival_time >= 0:
+                if survival_time > self._best_survival_time:
+                    self._best_loadout = index
+                    self._best_combination = list(combination)
+                    self._best_survival_time = survival_time
+                    self._best_hitpoints = hp
+            elif actual_dps <= 0:
+                if self._lowest_dps > actual_dps or (math.isclose(self._lowest_dps, actual_dps, rel_tol=1e-8) and self._best_hitpoints < hp):
+                    self._best_loadout = index
+                    self._best_combination = list(combination)
+                    self._best_survival_time = survival_time
+                    self._lowest_dps = actual_dps
+                    self._best_hitpoints = hp
+        if update_incumbent:
+            self.leaves_evaluated += 1
+            self.loadouts_evaluated += len(loadouts)
+
+    def _may_improve(self, loadout: Tuple, exp_modifier: float, kin_modifier: float, therm_modifier: float, hitpoint_bonus: float) -> bool:
+        test_case = self.test_case
+        index, exp, kin, therm, regen_rate, shield_strength = loadout
+        actual_dps = test_case.damage_effectiveness * (
+                test_case.explosive_dps * exp * exp_modifier +
+                test_case.kinetic_dps * kin * kin_modifier +
+                test_case.thermal_dps * therm * therm_modifier +
+                test_case.absolute_dps) - regen_rate
+
+        if self._threshold_survived:
+            return actual_dps <= self._threshold_value + abs(self._threshold_value) * BranchAndBound.PRUNE_TOLERANCE
+        if actual_dps <= 0:
+            return True
+        hp = shield_strength * hitpoint_bonus
+        survival_time = (hp + test_case.scb_hitpoints + test_case.guardian_hitpoints) / actual_dps
+        return survival_time >= self._threshold_value * (1 - BranchAndBound.PRUNE_TOLERANCE)
+
+    def _visit(self, start: int, products: Tuple[float, float, float, float], combination: List[int], loadouts: List[Tuple]):
+        self.nodes_visited += 1
+        remaining = self.number_of_boosters - len(combination)
+        if remaining == 0:
+            self._evaluate(loadouts, (self._apply_diminishing_returns(products[0]),
+                                      self._apply_diminishing_returns(products[1]),
+                                      self._apply_diminishing_returns(products[2]),
+                                      products[3]), combination)
+            return
+
+        if self._can_bound:
+            best = self._suffix_best[start]
+            exp_modifier = self._apply_diminishing_returns(products[0] * best[0] ** remaining)
+            kin_modifier = self._apply_diminishing_returns(products[1] * best[1] ** remaining)
+            therm_modifier = self._apply_diminishing_returns(products[2] * best[2] ** remaining)
+            hitpoint_bonus = products[3] + best[3] * remaining
+            loadouts = [lo for lo in loadouts if self._may_improve(lo, exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus)]
+            if not loadouts:
+                self.nodes_pruned += 1
+                return
+
+        for i in range(start, len(self._boosters)):
+            b = self._boosters[i]
+            combination.append(i)
+            self._visit(i, (products[0] * b[0], products[1] * b[1], products[2] * b[2], products[3] + b[3]), combination, loadouts)
+            combination.pop()
+
+    def _warm_start(self):
+        """
+        Find a good combination greedily. Its result is only used as threshold for pruning and not as incumbent
+        because the incumbent has to be found in the same order as in TestCase.test_case.
+        """
+        def threshold_key() -> Tuple[int, float]:
+            return (1, -self._threshold_value) if self._threshold_survived else (0, self._threshold_value)
+
+        def score(combination: List[int]) -> Tuple[int, float]:
+            best_key = threshold_key()
+            self._threshold_survived = False
+            self._threshold_value = 0.0
+            products = [1.0, 1.0, 1.0, 1.0]
+            for i in sorted(combination):
+                b = self._boosters[i]
+                products = [products[0] * b[0], products[1] * b[1], products[2] * b[2], products[3] + b[3]]
+            self._evaluate(self._loadouts, (self._apply_diminishing_returns(products[0]),
+                                            self._apply_diminishing_returns(products[1]),
+                                            self._apply_diminishing_returns(products[2]),
+                                            products[3]), combination, update_incumbent=False)
+            key = threshold_key()
+            # keep the best threshold found so far
+            best_key = max(key, best_key)
+            self._threshold_survived = best_key[0] == 1
+            self._threshold_value = -best_key[1] if self._threshold_survived else best_key[1]
+            return key
+
+        greedy = list()
+        for _ in range(self.number_of_boosters):
+            greedy.append(max(range(len(self._boosters)), key=lambda i: score(greedy + [i])))
+
+    def search(self) -> TestResult:
+        """
+        Run the search.
+        :return: best result as TestResult, same as TestCase.test_case with all booster combinations would return
+        """
+        if self._can_bound:
+            self._warm_start()
+        self._visit(0, (1.0, 1.0, 1.0, 1.0), list(), self._loadouts)
+
+        best_loadout = copy.copy(self.test_case.loadout_list[self._best_loadout])
+        best_loadout.boosters = [self.test_case.shield_booster_variants[x] for x in self._best_combination]
+        result = TestResult(best_loadout, self._best_survival_time, self._lowest_dps, self._best_hitpoints)
+        result.search_statistics = self.statistics
+        return result
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import math
+from typing import Optional, Tuple
+
+
+class ChunkScheduler(object):
+    """
+    Splits a range of items (booster combinations) into tasks whose size follows the measured speed.
+    Every task should take about target_time seconds: long enough to keep the overhead per task low and short enough
+    that progress is reported regularly and a cancelled test stops quickly.
+    When the end is near, tasks are made smaller so all workers finish at about the same time.
+    """
+    TARGET_TASK_TIME = 0.25  # seconds
+    MAX_GROWTH = 4  # a task is at most this many times bigger than the one before
+    SMOOTHING = 0.5  # weight of the newest measurement for the average speed
+
+    def __init__(self, number_of_items: int, workers: int = 1, initial_chunk_size: int = 1, max_chunk_size: int = 0,
+                 target_time: float = TARGET_TASK_TIME):
+        """
+        :param number_of_items: number of items to split
+        :param workers: number of processes working on the tasks
+        :param initial_chunk_size: size of the tasks until the first measurement arrives
+        :param max_chunk_size: maximum size of a task, unlimited if 0
+        :param target_time: seconds a task should take
+        """
+        self.number_of_items = number_of_items
+        self.workers = max(1, workers)
+        self.max_chunk_size = max_chunk_size if max_chunk_size > 0 else max(1, number_of_items)
+        self.target_time = target_time
+        self.chunk_size = self.__limit(initial_chunk_size)
+        self.items_per_second = 0.0  # average speed of one worker
+        self.items_scheduled = 0
+        self.items_done = 0
+
+    def __limit(self, chunk_size: int) -> int:
+        return max(1, min(self.max_chunk_size, chunk_size))
+
+    @property
+    def finished(self) -> bool:
+        return self.items_done >= self.number_of_items
+
+    def next_chunk(self) -> Optional[Tuple[int, int]]:
+        """
+        :return: (start, end) of the next task or None if all items are scheduled
+        """
+        remaining = self.number_of_items - self.items_scheduled
+        if remaining <= 0:
+            return None
+        chunk_size = self.chunk_size
+        if self.workers > 1:
+            # split the rest between the workers
+            chunk_size = min(chunk_size, math.ceil(remaining / self.workers))
+        start = self.items_scheduled
+        self.items_scheduled = min(self.number_of_items, start + max(1, chunk_size))
+        return start, self.items_scheduled
+
+    def add_measurement(self, items: int, seconds: float):
+        """
+        Add the time of a finished task and adjust the size of the next tasks.
+        :param items: size of the task
+        :param seconds: time the worker needed for the task
+        """
+        self.items_done += items
+        if items <= 0:
+            return
+        if seconds <= 0:
+            # too fast to measure
+            self.chunk_size = self.__limit(self.chunk_size * ChunkScheduler.MAX_GROWTH)
+            return
+        items_per_second = items / seconds
+        if self.items_per_second > 0:
+            items_per_second = ChunkScheduler.SMOOTHING * items_per_second + (1 - ChunkScheduler.SMOOTHING) * self.items_per_second
+        self.items_per_second = items_per_second
+        self.chunk_size = self.__limit(min(int(items_per_second * self.target_time), self.chunk_size * ChunkScheduler.MAX_GROWTH))
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import itertools
+import math
+from typing import Iterator, Tuple, Union
+
+
+class CombinationRange(object):
+    """
+    Booster combinations (combinations with replacement of number_of_boosters out of number_of_variants booster variants)
+    from rank start to end (excluding) in the order of itertools.combinations_with_replacement.
+    Combinations are created on demand by unranking, so a range only consists of four integers no matter how many combinations it covers.
+    It can be used like a read-only list of tuples and is sent to the worker processes instead of the combinations.
+    """
+    __slots__ = ("number_of_variants", "number_of_boosters", "start", "end")
+
+    def __init__(self, number_of_variants: int, number_of_boosters: int, start: int = 0, end: int = -1):
+        """
+        :param number_of_variants: number of booster variants
+        :param number_of_boosters: number of boosters in each combination
+        :param start: rank of the first combination
+        :param end: rank after the last combination, all combinations if negative
+        """
+        total = CombinationRange.count(number_of_variants, number_of_boosters)
+        self.number_of_variants = number_of_variants
+        self.number_of_boosters = number_of_boosters
+        self.end = total if end < 0 else min(end, total)
+        self.start = max(0, min(start, self.end))
+
+    @staticmethod
+    def count(number_of_variants: int, number_of_boosters: int) -> int:
+        """
+        Number of combinations with replacement of number_of_boosters out of number_of_variants
+        """
+        if number_of_variants < 1:
+            return 0
+        return math.factorial(number_of_variants + number_of_boosters - 1) // math.factorial(number_of_variants - 1) // math.factorial(number_of_boosters)
+
+    @staticmethod
+    def unrank(number_of_variants: int, number_of_boosters: int, rank: int) -> Tuple[int, ...]:
+        """
+        Get a combination by its rank without creating the combinations before it.
+        :param number_of_variants: number of booster variants
+        :param number_of_boosters: number of boosters in the combination
+        :param rank: position of the combination in the order of itertools.combinations_with_replacement
+        :return: tuple of indexes of booster variants
+        """
+        if not 0 <= rank < CombinationRange.count(number_of_variants, number_of_boosters):
+            raise IndexError("combination rank out of range")
+        combination = list()
+        value = 0
+        for position in range(0, number_of_boosters):
+            remaining = number_of_boosters - position - 1
+            while True:
+                # combinations that have value at this position
+                count = CombinationRange.count(number_of_variants - value, remaining)
+                if rank < count:
+                    break
+                rank -= count
+                value += 1
+            combination.append(value)
+        return tuple(combination)
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tuple[int, ...], CombinationRange]:
+        if isinstance(index, slice):
+            start, end, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("slices of a CombinationRange can't have a step")
+            return CombinationRange(self.number_of_variants, self.number_of_boosters, self.start + start, self.start + max(start, end))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("combination index out of range")
+        return CombinationRange.unrank(self.number_of_variants, self.number_of_boosters, self.start + index)
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        if self.start >= self.end:
+            return iter(())
+        first = CombinationRange.unrank(self.number_of_variants, self.number_of_boosters, self.start)
+        if self.number_of_boosters == 0:
+            return iter((first,))
+
+        def blocks():
+            # starting with the first combination, the combinations are blocks with the same prefix, each block is created by itertools
+            for i in range(self.number_of_boosters - 1, -1, -1):
+                prefix = first[:i]
+                for value in range(first[i] + (0 if i == self.number_of_boosters - 1 else 1), self.number_of_variants):
+                    head = prefix + (value,)
+                    yield map(head.__add__, itertools.combinations_with_replacement(range(value, self.number_of_variants), self.number_of_boosters - i - 1))
+
+        return itertools.islice(itertools.chain.from_iterable(blocks()), len(self))
+
+    def __repr__(self):
+        return f"CombinationRange({self.number_of_variants}, {self.number_of_boosters}, {self.start}, {self.end})"
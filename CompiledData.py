@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import os
+import pickle
+import re
+from typing import Any, Dict, List, Optional
+
+from .ShieldBoosterVariant import ShieldBoosterVariant
+from .ShieldGenerator import ShieldGenerator
+from .StarShip import StarShip
+
+
+class CompiledData(object):
+    """
+    Ships, booster variants and all engineered shield generators created from a data file.
+    Creating the engineered shield generators takes most of the time when loading data, so the compiled data is saved in the cache directory
+    and loaded from there as long as the data file doesn't change. The file name has the stem of the data file and its hash, so several
+    data files can share a cache directory.
+    """
+    VERSION = 2
+    FILE_PREFIX = "data_"
+
+    def __init__(self, data_hash: str = ""):
+        self.data_hash = data_hash  # hash of the data file
+        self.ships = list()  # type: List[StarShip]
+        self.shield_booster_variants = list()  # type: List[ShieldBoosterVariant]
+        # key of outer dictionary is the type, key for inner dictionary is the class
+        # and the value is a list of all engineered shield generator combinations of that class and type
+        self.shield_generators = dict()  # type: Dict[str, Dict[int, List[ShieldGenerator]]]
+        self.unengineered_shield_generators = list()  # type: List[ShieldGenerator]
+
+    @staticmethod
+    def create_from_json(j_data: Dict[str, Any], data_hash: str = "") -> CompiledData:
+        """
+        Create ships, booster variants and shield generators from the content of a data file.
+        :param j_data: content of the data file
+        :param data_hash: hash of the data file
+        :return: CompiledData
+        """
+        data = CompiledData(data_hash)
+
+        # load ships
+        for j_ship in j_data["ships"]:
+            data.ships.append(StarShip.create_from_json(j_ship))
+
+        # load shield booster variants
+        for booster_variant in j_data["shield_booster_variants"]:
+            data.shield_booster_variants.append(ShieldBoosterVariant.create_from_json(booster_variant))
+
+        # load shield generators
+        sg_node = j_data["shield_generators"]
+        for sg_type, sg_list in sg_node["modules"].items():
+            sg_type_dict = data.shield_generators.setdefault(sg_type, dict())
+            for j_generator in sg_list:
+                generator = ShieldGenerator.create_from_json(j_generator)
+                data.unengineered_shield_generators.append(generator)
+                generator_variants = ShieldGenerator.create_engineered_shield_generators(generator,
+                                                                                         sg_node["engineering"]["blueprints"],
+                                                                                         sg_node["engineering"]["experimental_effects"])
+                sg_type_dict.setdefault(generator.module_class, generator_variants)
+        return data
+
+    @staticmethod
+    def get_file_prefix(source: str) -> str:
+        """
+        :param source: path of the data file, empty string if unknown
+        :return: beginning of the names of the compiled data files of source, followed by the hash
+        """
+        stem = os.path.splitext(os.path.basename(source))[0]
+        return f"{CompiledData.FILE_PREFIX}{stem}_" if stem else CompiledData.FILE_PREFIX
+
+    @staticmethod
+    def get_file_path(directory: str, data_hash: str, source: str = "") -> str:
+        return os.path.join(directory, f"{CompiledData.get_file_prefix(source)}{data_hash[:32]}.pickle")
+
+    def save(self, directory: str, source: str = ""):
+        """
+        Save compiled data to the cache directory. Older compiled data of the same data file (same stem, other hash) is removed.
+        :param directory: cache directory
+        :param source: path of the data file
+        :raises OSError if the file can't be written
+        """
+        os.makedirs(directory, exist_ok=True)
+        path = CompiledData.get_file_path(directory, self.data_hash, source)
+        with open(path + ".tmp", "wb") as data_file:
+            pickle.dump((CompiledData.VERSION, self.data_hash, self), data_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+        # the hash is hex, so files of data files whose stem only starts with the same name don't match
+        stale = re.compile(re.escape(CompiledData.get_file_prefix(source)) + r"[0-9a-f]{32}\.pickle")
+        for name in os.listdir(directory):
+            if stale.fullmatch(name) and os.path.join(directory, name) != path:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+    @staticmethod
+    def load(directory: str, data_hash: str, source: str = "") -> Optional[CompiledData]:
+        """
+        Load compiled data from the cache directory.
+        :param directory: cache directory
+        :param data_hash: hash of the current data file
+        :param source: path of the data file
+        :return: CompiledData or None if there is no valid compiled data for the data file
+        """
+        try:
+            with open(CompiledData.get_file_path(directory, data_hash, source), "rb") as data_file:
+                version, file_data_hash, data = pickle.load(data_file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError, ImportError):
+            return None
+        if version != CompiledData.VERSION or file_data_hash != data_hash or not isinstance(data, CompiledData):
+            return None
+        return data
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+
+from .LoadOut import LoadOut
+from .ShieldBoosterVariant import ShieldBoosterVariant
+
+
+class DominanceFilter(object):
+    """
+    Remove shield generator variants and shield booster variants that can never be part of the best loadout.
+
+    A variant is dominated if another variant is at least as good in every stat that matters for the damage profile of the TestCase
+    and strictly better in at least one of them. A dominated variant can always be replaced by its dominating variant without
+    lowering survival time or raising incoming dps, so removing it doesn't change the best result.
+    If two variants are equal in every relevant stat, the first one is kept because the test picks the first one as well.
+
+    Stats that don't matter (e.g. explosive resistance when there is no explosive damage) are ignored.
+    The filter doesn't remove anything if the damage profile is outside of the range where this reasoning holds (negative values).
+    All functions accept a single TestCase or a list of TestCase (e.g. scenarios). With a list, a variant has to be dominated in all of them.
+    """
+
+    @staticmethod
+    def _as_list(test_case) -> List:
+        return list(test_case) if isinstance(test_case, (list, tuple)) else [test_case]
+
+    @staticmethod
+    def get_relevant_resistances(test_case) -> Tuple[bool, bool, bool]:
+        """
+        :return: tuple: whether explosive, kinetic and thermal resistance influence the result
+        """
+        relevant = [False, False, False]
+        for tc in DominanceFilter._as_list(test_case):
+            has_damage = tc.damage_effectiveness > 0
+            relevant[0] |= has_damage and tc.explosive_dps != 0
+            relevant[1] |= has_damage and tc.kinetic_dps != 0
+            relevant[2] |= has_damage and tc.thermal_dps != 0
+        return relevant[0], relevant[1], relevant[2]
+
+    @staticmethod
+    def is_regen_relevant(test_case) -> bool:
+        return any(tc.damage_effectiveness < 1 for tc in DominanceFilter._as_list(test_case))
+
+    @staticmethod
+    def is_applicable(test_case) -> bool:
+        """
+        Check if the damage profile of the test case allows filtering.
+        """
+        return all(0 <= tc.damage_effectiveness <= 1 and
+                   min(tc.explosive_dps, tc.kinetic_dps, tc.thermal_dps, tc.absolute_dps) >= 0 and
+                   tc.scb_hitpoints + tc.guardian_hitpoints >= 0 for tc in DominanceFilter._as_list(test_case))
+
+    @staticmethod
+    def _remove_dominated(stats: List[Tuple[float, ...]]) -> List[int]:
+        """
+        Pareto filter. Higher values are better.
+        :param stats: list of tuples, all of the same length. Only relevant stats should be included
+        :return: indexes of the non-dominated entries in ascending order
+        """
+        # an entry can only be dominated by entries that come before it in descending lexicographic order (earlier duplicates first).
+        # Domination is transitive, so it's enough to compare with the entries that were kept so far.
+        kept = list()
+        for i in sorted(range(len(stats)), key=lambda x: tuple(-v for v in stats[x])):
+            a = stats[i]
+            # b is at least as good as a: a is dominated because b is better somewhere or b is an earlier duplicate
+            if not any(all(vb >= va for va, vb in zip(a, stats[j])) for j in kept):
+                kept.append(i)
+        return sorted(kept)
+
+    @staticmethod
+    def filter_loadouts(test_case, loadout_list: Sequence[LoadOut], shield_booster_variants: Sequence[ShieldBoosterVariant] = (),
+                        shield_strengths: Sequence[Sequence[float]] = None) -> List[LoadOut]:
+        """
+        Remove dominated shield generator variants.
+        :param test_case: TestCase with damage profile
+        :param loadout_list: loadouts to filter
+        :param shield_booster_variants: booster variants that will be used with the loadouts
+        :param shield_strengths: optional shield strengths for several hull masses instead of LoadOut.shield_strength, one list per hull mass
+                                 (see LoadOut.calculate_shield_strengths). A variant has to be dominated at all hull masses.
+        :return: new list with loadouts that are not dominated (same order)
+        """
+        if not DominanceFilter.is_applicable(test_case):
+            return list(loadout_list)
+        # a higher resistance is only better if the booster modifiers can't be negative
+        if any(min(b.exp_res_bonus, b.kin_res_bonus, b.therm_res_bonus) < 0 for b in shield_booster_variants):
+            return list(loadout_list)
+        # same for shield strength and the hitpoint bonus
+        number_of_boosters = max(tc.number_of_boosters_to_test for tc in DominanceFilter._as_list(test_case))
+        if shield_booster_variants and 1 + number_of_boosters * min(b.shield_strength_bonus for b in shield_booster_variants) < 0:
+            return list(loadout_list)
+
+        relevant_exp, relevant_kin, relevant_therm = DominanceFilter.get_relevant_resistances(test_case)
+        relevant_regen = DominanceFilter.is_regen_relevant(test_case)
+
+        stats = list()
+        for i, loadout in enumerate(loadout_list):
+            sg = loadout.shield_generator
+            s = [strengths[i] for strengths in shield_strengths] if shield_strengths else [loadout.shield_strength]
+            if relevant_exp:
+                s.append(sg.explres)
+            if relevant_kin:
+                s.append(sg.kinres)
+            if relevant_therm:
+                s.append(sg.thermres)
+            if relevant_regen:
+                s.append(sg.regen)
+            stats.append(tuple(s))
+        return [loadout_list[i] for i in DominanceFilter._remove_dominated(stats)]
+
+    @staticmethod
+    def filter_booster_variants(test_case, shield_booster_variants: Sequence[ShieldBoosterVariant],
+                                loadout_list: Sequence[LoadOut] = ()) -> List[ShieldBoosterVariant]:
+        """
+        Remove dominated shield booster variants.
+        :param test_case: TestCase with damage profile
+        :param shield_booster_variants: booster variants to filter
+        :param loadout_list: loadouts that will be used with the boosters
+        :return: new list with booster variants that are not dominated (same order)
+        """
+        number_of_boosters = max(tc.number_of_boosters_to_test for tc in DominanceFilter._as_list(test_case))
+        if not DominanceFilter.is_applicable(test_case) or number_of_boosters < 1:
+            return list(shield_booster_variants)
+        # a lower modifier is only better if all resistance multipliers are positive and the hitpoint bonus can't become negative
+        if any(min(b.exp_res_bonus, b.kin_res_bonus, b.therm_res_bonus) <= 0 for b in shield_booster_variants):
+            return list(shield_booster_variants)
+        if 1 + number_of_boosters * min(b.shield_strength_bonus for b in shield_booster_variants) < 0:
+            return list(shield_booster_variants)
+        if any(min(1 - lo.shield_generator.explres, 1 - lo.shield_generator.kinres, 1 - lo.shield_generator.thermres) < 0 for lo in loadout_list):
+            return list(shield_booster_variants)
+
+        relevant_exp, relevant_kin, relevant_therm = DominanceFilter.get_relevant_resistances(test_case)
+        stats = list()
+        for booster in shield_booster_variants:
+            s = [booster.shield_strength_bonus]
+            if relevant_exp:
+                s.append(-booster.exp_res_bonus)
+            if relevant_kin:
+                s.append(-booster.kin_res_bonus)
+            if relevant_therm:
+                s.append(-booster.therm_res_bonus)
+            stats.append(tuple(s))
+        return [shield_booster_variants[i] for i in DominanceFilter._remove_dominated(stats)]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import List, Optional, Tuple
+
+from .TestResult import TestResult
+from .Utility import Utility
+
+
+class HullMassResult(object):
+    """
+    Best loadout for each hull mass of a ship, see ShieldTester.compute_hull_masses().
+    The loadouts of the results have the shield strength at their hull mass and a copy of the ship with that hull mass.
+    """
+
+    def __init__(self, hull_masses: List[float], results: List[TestResult]):
+        """
+        :param hull_masses: hull masses in ascending order
+        :param results: best TestResult for each hull mass (same order)
+        """
+        self.hull_masses = hull_masses
+        self.results = results
+
+    def __len__(self):
+        return len(self.hull_masses)
+
+    @staticmethod
+    def _get_winner(result: TestResult) -> Optional[Tuple[int, Tuple[int, ...]]]:
+        # shield generators and booster variants are shared, the loadouts are copies
+        if result.loadout is None:
+            return None  # no shield generator works at this hull mass
+        return id(result.loadout.shield_generator), tuple(id(booster) for booster in result.loadout.boosters or ())
+
+    def get_result(self, hull_mass: float) -> Optional[TestResult]:
+        """
+        :return: result of the tested hull mass that is closest to hull_mass or None if nothing was tested
+        """
+        if not self.hull_masses:
+            return None
+        return self.results[min(range(len(self.hull_masses)), key=lambda i: abs(self.hull_masses[i] - hull_mass))]
+
+    @property
+    def breakpoints(self) -> List[Tuple[float, float]]:
+        """
+        Hull masses where the best loadout (shield generator variant and boosters) changes.
+        :return: list of tuples (last hull mass of the old winner, first hull mass of the new winner)
+        """
+        breakpoints = list()
+        for i in range(1, len(self.results)):
+            if HullMassResult._get_winner(self.results[i - 1]) != HullMassResult._get_winner(self.results[i]):
+                breakpoints.append((self.hull_masses[i - 1], self.hull_masses[i]))
+        return breakpoints
+
+    def get_output_string(self, guardian_hitpoints: int = 0) -> str:
+        """
+        Get output string with the winner of each range of hull masses
+        :param guardian_hitpoints: hitpoints of the guardian shield reinforcements, see TestResult.get_output_string()
+        :return: string
+        """
+        output = list()
+        output.append("------------ HULL MASSES ------------")
+        output.append(("Hull masses: ", f"[{len(self.hull_masses)}]"))
+        output.append(("Changes of the best loadout: ", f"[{len(self.breakpoints)}]"))
+        output.append("")
+        parts = [Utility.format_output_string(output)]
+        start = 0
+        for i in range(1, len(self.results) + 1):
+            if i == len(self.results) or HullMassResult._get_winner(self.results[i - 1]) != HullMassResult._get_winner(self.results[i]):
+                parts.append(Utility.format_output_string([("Hull mass: ", f"[{self.hull_masses[start]:n} - {self.hull_masses[i - 1]:n}]")]))
+                parts.append(self.results[start].get_output_string(guardian_hitpoints))
+                start = i
+        return "\n".join(parts)
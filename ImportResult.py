@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+from .Utility import Utility
+
+
+class ImportResult(object):
+    """
+    Result of ShieldTester.import_loadouts(). Has an entry for each loadout of the input and for each line that couldn't be decoded.
+    """
+
+    def __init__(self):
+        self.lines = list()  # type: List[int] # line of the input each entry comes from (starting with 1)
+        self.ship_names = list()  # type: List[str] # name of the imported ship, empty if the import failed
+        self.errors = list()  # type: List[str] # reason why the import failed, empty if it succeeded
+        self.runtime = 0.0  # seconds
+        self.cancelled = False
+
+    def __len__(self):
+        return len(self.ship_names)
+
+    def add(self, line: int, ship_name: str = "", error: str = ""):
+        self.lines.append(line)
+        self.ship_names.append(ship_name)
+        self.errors.append(error)
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for name in self.ship_names if name)
+
+    @property
+    def failed(self) -> int:
+        return len(self) - self.succeeded
+
+    @property
+    def entries_per_second(self) -> float:
+        return len(self) / self.runtime if self.runtime > 0 else 0.0
+
+    @property
+    def statistics(self) -> Dict[str, float]:
+        """
+        :return: dictionary with the number of entries, imported and failed entries, runtime and entries per second
+        """
+        return {"entries": len(self), "succeeded": self.succeeded, "failed": self.failed, "runtime": self.runtime,
+                "entries_per_second": self.entries_per_second}
+
+    def get_output_string(self) -> str:
+        """
+        Get output string with the statistics and the reason for each failed entry
+        :return: string
+        """
+        output = list()
+        output.append("------------ IMPORT ------------")
+        output.append(("Entries: ", f"[{len(self)}]"))
+        output.append(("Imported: ", f"[{self.succeeded}]"))
+        output.append(("Failed: ", f"[{self.failed}]"))
+        output.append(("Entries per second: ", f"[{self.entries_per_second:.0f}]"))
+        if self.cancelled:
+            output.append("Cancelled before the end of the input")
+        for line, error in zip(self.lines, self.errors):
+            if error:
+                output.append((f"Line {line}: ", error))
+        return Utility.format_output_string(output)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .Utility import Utility
+
+
+class _Phase(object):
+    """
+    Context manager that measures one phase. See Instrumentation.phase().
+    """
+    def __init__(self, instrumentation: Instrumentation, name: str):
+        self._instrumentation = instrumentation
+        self._name = name
+        self._wall = 0.0
+        self._cpu = 0.0
+
+    def __enter__(self):
+        self._instrumentation.notify(Instrumentation.EVENT_PHASE_START, self._name, dict())
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._instrumentation.add_phase_time(self._name, time.perf_counter() - self._wall, time.process_time() - self._cpu)
+
+
+class _NoPhase(object):
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+class Instrumentation(object):
+    """
+    Opt-in timings and counters of a single ShieldTester.compute() or compute_scenarios() call.
+    Pass an instance to compute(). It is attached to the returned TestResult as TestResult.instrumentation.
+
+    Phases (wall and CPU time of the calling process, CPU time of the workers is in worker_busy):
+    PHASE_PRELIM, PHASE_DOMINANCE, PHASE_BOUND_FILTER, PHASE_COMBINATIONS (booster bonus table and combinations), PHASE_SEARCH (branch and bound),
+    PHASE_DISPATCH (creating, pickling and submitting tasks), PHASE_EVALUATION (testing or waiting for the workers),
+    PHASE_REDUCTION (combining the results of the tasks) and PHASE_TOTAL.
+
+    External profilers can register a hook. It's called with (event, name, data) for EVENT_PHASE_START, EVENT_PHASE_END and
+    EVENT_TASK_DONE. data is a dictionary with wall and cpu for the end of a phase and with task, worker, wall and cpu for finished tasks.
+    The hook is called in the thread that calls compute().
+    """
+    PHASE_TOTAL = "total"
+    PHASE_PRELIM = "prelim"
+    PHASE_DOMINANCE = "dominance_filter"
+    PHASE_BOUND_FILTER = "bound_filter"
+    PHASE_COMBINATIONS = "combinations"
+    PHASE_SEARCH = "search"
+    PHASE_DISPATCH = "dispatch"
+    PHASE_EVALUATION = "evaluation"
+    PHASE_REDUCTION = "reduction"
+
+    EVENT_PHASE_START = "phase_start"
+    EVENT_PHASE_END = "phase_end"
+    EVENT_TASK_DONE = "task_done"
+
+    _NO_PHASE = _NoPhase()
+
+    def __init__(self, hook: Optional[Callable[[str, str, Dict[str, Any]], None]] = None, enabled: bool = True):
+        self.hook = hook
+        self.enabled = enabled
+        self.phases = dict()  # type: Dict[str, Dict[str, float]] # key: phase, value: wall, cpu and count
+        self.chunks = 0  # tasks
+        self.combinations = 0  # booster combinations tested
+        self.loadouts_evaluated = 0
+        self.bytes_sent = 0  # pickled size of the tasks sent to the worker pool
+        self.worker_busy = dict()  # type: Dict[int, float] # key: process id, value: seconds spent running tasks
+
+    @staticmethod
+    def disabled() -> Instrumentation:
+        """
+        Instrumentation that doesn't record anything. Used if compute() is called without instrumentation.
+        """
+        return Instrumentation(enabled=False)
+
+    def phase(self, name: str):
+        """
+        Measure a phase: with instrumentation.phase(Instrumentation.PHASE_PRELIM): ...
+        Phases with the same name are added up.
+        """
+        if not self.enabled:
+            return Instrumentation._NO_PHASE
+        return _Phase(self, name)
+
+    def notify(self, event: str, name: str, data: Dict[str, Any]):
+        if self.enabled and self.hook:
+            self.hook(event, name, data)
+
+    def add_phase_time(self, name: str, wall: float, cpu: float):
+        if not self.enabled:
+            return
+        phase = self.phases.setdefault(name, {"wall": 0.0, "cpu": 0.0, "count": 0})
+        phase["wall"] += wall
+        phase["cpu"] += cpu
+        phase["count"] += 1
+        self.notify(Instrumentation.EVENT_PHASE_END, name, {"wall": wall, "cpu": cpu})
+
+    def add_task(self, task_index: int, worker: int, wall: float, cpu: float):
+        """
+        Record a finished task.
+        :param task_index: index of the task
+        :param worker: process id of the process that ran the task
+        :param wall: wall time of the task
+        :param cpu: CPU time of the task
+        """
+        if not self.enabled:
+            return
+        self.worker_busy[worker] = self.worker_busy.get(worker, 0.0) + wall
+        self.notify(Instrumentation.EVENT_TASK_DONE, str(task_index), {"task": task_index, "worker": worker, "wall": wall, "cpu": cpu})
+
+    @property
+    def statistics(self) -> Dict[str, Any]:
+        return {"phases": {name: dict(values) for name, values in self.phases.items()},
+                "chunks": self.chunks,
+                "combinations": self.combinations,
+                "loadouts_evaluated": self.loadouts_evaluated,
+                "bytes_sent": self.bytes_sent,
+                "worker_busy": dict(self.worker_busy)}
+
+    def get_output_string(self) -> str:
+        output = list()
+        output.append("--------- INSTRUMENTATION ---------")
+        for name, values in self.phases.items():
+            output.append((f"{name}: ", f"[{values['wall']:.4f} s wall, {values['cpu']:.4f} s CPU]"))
+        output.append(("Chunks: ", f"[{self.chunks:n}]"))
+        output.append(("Booster combinations: ", f"[{self.combinations:n}]"))
+        output.append(("Shield loadouts tested: ", f"[{self.loadouts_evaluated:n}]"))
+        output.append(("Bytes sent to workers: ", f"[{self.bytes_sent:n}]"))
+        for worker, busy in sorted(self.worker_busy.items()):
+            output.append((f"Process {worker} busy: ", f"[{busy:.4f} s]"))
+        output.append("")
+        return Utility.format_output_string(output)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import glob
+import json
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ImportResult import ImportResult
+from .ShieldTester import ShieldTester
+from .TestResult import TestResult
+
+
+class JournalWatcher(object):
+    """
+    Import the Loadout events of the game's journal files and compute the best loadout of every ship whose shields might have changed.
+
+    Journal files are read incrementally: the watcher keeps the byte offset of each file and only reads what was appended since the last poll().
+    Incomplete lines at the end of a file are read again with the next poll. The offsets can be saved and loaded to continue after a restart.
+    Only ship, free utility slots, highest internal slot and the free internal slots influence the shields. A ship that was imported again
+    without changes to them is not computed again.
+    """
+    FILE_PATTERN = "Journal.*.log"
+    LOADOUT_EVENT = "Loadout"
+
+    def __init__(self, tester: ShieldTester, directory: str, damage: Dict[str, float] = None, prismatics: bool = True, short_list: bool = True,
+                 state_file: str = ""):
+        """
+        :param tester: ShieldTester with loaded data, imported ships are added to it
+        :param directory: journal directory
+        :param damage: damage and hitpoint settings, see ShieldTester.compute_fleet()
+        :param prismatics: whether to use prismatics or not
+        :param short_list: booster variants to test, see ShieldTester.set_boosters_to_test()
+        :param state_file: optional json file for the byte offsets, see load_state() and save_state()
+        """
+        self.tester = tester
+        self.directory = directory
+        self.damage = damage
+        self.prismatics = prismatics
+        self.short_list = short_list
+        self.state_file = state_file
+        self.offsets = dict()  # type: Dict[str, int] # key: file name, value: byte offset of the first line that wasn't read
+        self.events_read = 0
+        self.import_result = ImportResult()  # import of the last poll, lines are the positions of the events in that poll
+        self.import_errors = 0  # events that couldn't be imported since the watcher was created
+        self.last_error = None  # type: Optional[Exception] # last exception that stopped a poll of watch()
+        self.__ship_keys = dict()  # type: Dict[str, Tuple] # key: ship name, value: shield relevant parts of the last computed ship
+
+    def load_state(self):
+        """
+        Load the byte offsets from state_file. Nothing happens if the file doesn't exist.
+        """
+        if self.state_file and os.path.exists(self.state_file):
+            with open(self.state_file) as f:
+                self.offsets = {name: int(offset) for name, offset in json.load(f).items()}
+
+    def save_state(self):
+        """
+        Save the byte offsets to state_file.
+        """
+        if self.state_file:
+            with open(self.state_file + ".tmp", "w") as f:
+                json.dump(self.offsets, f)
+            os.replace(self.state_file + ".tmp", self.state_file)
+
+    def read_events(self) -> List[Dict[str, Any]]:
+        """
+        Read the Loadout events that were added to the journal files since the last call. Files are read in the order of their names.
+        :return: list of Loadout events in the order they were written
+        """
+        events = list()
+        for path in sorted(glob.glob(os.path.join(self.directory, JournalWatcher.FILE_PATTERN))):
+            name = os.path.basename(path)
+            offset = self.offsets.get(name, 0)
+            try:
+                if os.path.getsize(path) < offset:
+                    offset = 0  # file was replaced
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read()
+            except OSError:
+                continue  # removed or still locked by the game, try again with the next poll
+
+            end = data.rfind(b"\n") + 1  # the last line might not be complete yet
+            for line in data[:end].splitlines():
+                # don't parse events that can't be a Loadout event
+                if b'"Loadout"' not in line:
+                    continue
+                try:
+                    event = json.loads(line.decode("utf-8"))
+                except ValueError:
+                    continue
+                if event.get("event") == JournalWatcher.LOADOUT_EVENT:
+                    events.append(event)
+            self.offsets[name] = offset + end
+        self.events_read += len(events)
+        return events
+
+    @staticmethod
+    def get_ship_key(tester: ShieldTester, ship_name: str) -> Tuple:
+        """
+        :return: the parts of an imported ship that influence the shields, see ShieldTester.import_loadout()
+        """
+        ship = tester.get_ship(ship_name)
+        return ship.symbol, tuple(ship.utility_slots_free), ship.highest_internal, tuple(sorted(ship.internal_slot_layout.items()))
+
+    def poll(self, result_queue: Optional[queue.SimpleQueue] = None) -> Dict[Tuple[str, int], TestResult]:
+        """
+        Import the new Loadout events and compute the ships whose shield relevant parts changed (all of them in one ShieldTester.compute_fleet() run).
+        Events that can't be imported are skipped, the reasons are in import_result. Saves the state if state_file is set.
+        :param result_queue: optional queue for the results, see ShieldTester.compute_fleet()
+        :return: dictionary with the best TestResult for each tuple (ship name, booster count) of the changed ships, empty if nothing changed
+        """
+        ship_keys = dict()  # type: Dict[str, Tuple] # in the order of the last import
+        # one event per line, a broken event only fails its own entry
+        self.import_result = self.tester.import_loadouts([json.dumps(event) for event in self.read_events()])
+        self.import_errors += self.import_result.failed
+        for ship_name in self.import_result.ship_names:
+            if ship_name:
+                ship_keys.pop(ship_name, None)
+                ship_keys[ship_name] = JournalWatcher.get_ship_key(self.tester, ship_name)
+        self.save_state()
+
+        changed = [ship_name for ship_name, key in ship_keys.items() if self.__ship_keys.get(ship_name) != key]
+        if not changed:
+            return dict()
+        results = self.tester.compute_fleet(changed, damage=self.damage, prismatics=self.prismatics, short_list=self.short_list,
+                                            result_queue=result_queue)
+        if results is None:
+            return dict()  # cancelled, the ships are computed the next time they are imported
+        for ship_name in changed:
+            self.__ship_keys[ship_name] = ship_keys[ship_name]
+        return results
+
+    # noinspection PyBroadException
+    def watch(self, result_queue: queue.SimpleQueue, stop: threading.Event, interval: float = 1.0):
+        """
+        Call poll() every interval seconds until stop is set. Use a separate thread.
+        An exception of a poll doesn't end the loop, it's printed and kept in last_error.
+        :param result_queue: queue for the results, see ShieldTester.compute_fleet()
+        :param stop: event that ends the loop
+        :param interval: seconds between polls
+        """
+        while not stop.is_set():
+            try:
+                self.poll(result_queue)
+            except Exception as e:
+                self.last_error = e
+                print(f"Could not process journal: {type(e).__name__}: {e}")
+            stop.wait(interval)
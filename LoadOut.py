@@ -1,13 +1,22 @@
 import math
 import copy
-from typing import List, Optional, Tuple, Dict, Any
+from typing import List, Optional, Tuple, Dict, Any, Sequence
 
 from .ShieldBoosterVariant import ShieldBoosterVariant
 from .ShieldGenerator import ShieldGenerator
 from .StarShip import StarShip
 
+try:
+    # noinspection PyUnresolvedReferences
+    import numpy as np
+    _numpy_imported = True
+except ImportError:
+    _numpy_imported = False
+
 
 class LoadOut(object):
+    __slots__ = ("shield_generator", "ship", "boosters", "shield_strength")
+
     def __init__(self, shield_generator: ShieldGenerator, ship: StarShip):
         self.shield_generator = shield_generator
         self.ship = ship
@@ -15,26 +24,75 @@ class LoadOut(object):
         self.shield_strength = self.__calculate_shield_strength()
 
     def __calculate_shield_strength(self):
-        # formula taken from:
-        # https://forums.frontier.co.uk/threads/the-one-formula-to-rule-them-all-the-mechanics-of-shield-and-thruster-mass-curves.300225/
-        # https://github.com/EDCD/coriolis/blob/master/src/app/shipyard/Calculations.js
         if self.shield_generator and self.ship:
-            min_mass = self.shield_generator.minmass
-            opt_mass = self.shield_generator.optmass
-            max_mass = self.shield_generator.maxmass
-            min_mul = self.shield_generator.minmul
-            opt_mul = self.shield_generator.optmul
-            max_mul = self.shield_generator.maxmul
-            hull_mass = self.ship.hull_mass
-
-            xnorm = min(1.0, (max_mass - hull_mass) / (max_mass - min_mass))
-            exponent = math.log((opt_mul - min_mul) / (max_mul - min_mul)) / math.log(min(1.0, (max_mass - opt_mass) / (max_mass - min_mass)))
-            ynorm = math.pow(xnorm, exponent)
-            mul = min_mul + ynorm * (max_mul - min_mul)
-            return round(self.ship.base_shield_strength * mul, 4)
+            return LoadOut.calculate_shield_strength(self.shield_generator, self.ship.base_shield_strength, self.ship.hull_mass)
         else:
             return 0
 
+    @staticmethod
+    def get_mass_curve_exponent(shield_generator: ShieldGenerator) -> float:
+        """
+        Exponent of the mass curve of a shield generator. It doesn't depend on the ship.
+        """
+        min_mass = shield_generator.minmass
+        opt_mass = shield_generator.optmass
+        max_mass = shield_generator.maxmass
+        min_mul = shield_generator.minmul
+        opt_mul = shield_generator.optmul
+        max_mul = shield_generator.maxmul
+        return math.log((opt_mul - min_mul) / (max_mul - min_mul)) / math.log(min(1.0, (max_mass - opt_mass) / (max_mass - min_mass)))
+
+    @staticmethod
+    def calculate_shield_strength(shield_generator: ShieldGenerator, base_shield_strength: float, hull_mass: float) -> float:
+        """
+        Shield strength of a shield generator on a ship with the given base shield strength and hull mass.
+        """
+        # formula taken from:
+        # https://forums.frontier.co.uk/threads/the-one-formula-to-rule-them-all-the-mechanics-of-shield-and-thruster-mass-curves.300225/
+        # https://github.com/EDCD/coriolis/blob/master/src/app/shipyard/Calculations.js
+        min_mass = shield_generator.minmass
+        max_mass = shield_generator.maxmass
+        min_mul = shield_generator.minmul
+        max_mul = shield_generator.maxmul
+
+        xnorm = min(1.0, (max_mass - hull_mass) / (max_mass - min_mass))
+        ynorm = math.pow(xnorm, LoadOut.get_mass_curve_exponent(shield_generator))
+        mul = min_mul + ynorm * (max_mul - min_mul)
+        return round(base_shield_strength * mul, 4)
+
+    @staticmethod
+    def calculate_shield_strengths(loadout_list: List["LoadOut"], hull_masses: Sequence[float]) -> List[List[float]]:
+        """
+        Shield strength of each loadout for several hull masses of its ship without creating loadouts for each mass.
+        With NumPy, the mass curves of all shield generators are calculated for all masses at once.
+        The values are the same as calculate_shield_strength() (rounding to 4 decimal places hides differences of the power function in the last bit).
+        A shield generator doesn't work if the hull mass is above its maximum mass, its shield strength is 0 for those masses.
+        :param loadout_list: loadouts, each with shield generator and ship
+        :param hull_masses: hull masses of the ships
+        :return: list for each hull mass with the shield strength of each loadout (same order as loadout_list)
+        """
+        if not _numpy_imported:
+            return [[LoadOut.calculate_shield_strength(loadout.shield_generator, loadout.ship.base_shield_strength, hull_mass)
+                     if hull_mass <= loadout.shield_generator.maxmass else 0 for loadout in loadout_list] for hull_mass in hull_masses]
+
+        generators = [loadout.shield_generator for loadout in loadout_list]
+        min_mass = np.array([sg.minmass for sg in generators], dtype=np.float64)
+        max_mass = np.array([sg.maxmass for sg in generators], dtype=np.float64)
+        min_mul = np.array([sg.minmul for sg in generators], dtype=np.float64)
+        max_mul = np.array([sg.maxmul for sg in generators], dtype=np.float64)
+        exponent = np.array([LoadOut.get_mass_curve_exponent(sg) for sg in generators], dtype=np.float64)
+        base_shield_strength = np.array([loadout.ship.base_shield_strength for loadout in loadout_list], dtype=np.float64)
+        masses = np.asarray(hull_masses, dtype=np.float64)[:, None]
+
+        # rows are hull masses, columns are loadouts
+        xnorm = np.minimum(1.0, (max_mass[None, :] - masses) / (max_mass - min_mass)[None, :])
+        valid = xnorm >= 0
+        ynorm = np.power(np.where(valid, xnorm, 0.0), exponent[None, :])
+        mul = min_mul[None, :] + ynorm * (max_mul - min_mul)[None, :]
+        strengths = np.where(valid, base_shield_strength[None, :] * mul, 0.0)
+        # round like calculate_shield_strength, numpy rounds values that are close to the middle differently
+        return [[round(x, 4) for x in row] for row in strengths.tolist()]
+
     def get_total_values(self) -> Optional[Tuple[float, float, float, float]]:
         """
         Calculate total shield values for the loadout (boosters + shield). Returns None if boosters are not set
@@ -59,16 +117,22 @@ class LoadOut(object):
         hp = self.shield_strength * hitpoint_bonus
         return exp_res, kin_res, therm_res, hp
 
-    def generate_loadout_event(self, default_sg: ShieldGenerator) -> Dict[str, Any]:
+    def generate_loadout_event(self, default_sg: ShieldGenerator, copy_templates: bool = True) -> Dict[str, Any]:
         """
         Generate loadout "event" to import into Coriolis
         :param default_sg: default ShieldGenerator to compare changes
+        :param copy_templates: if False, the modules of the ship and the boosters are shared with their templates.
+                               Only use it if the event is not changed (e.g. it's serialized right away)
         :return: loadout "event" as dictionary
         """
         if not self.ship:
             return dict()
 
-        loadout_json = copy.deepcopy(self.ship.loadout_template)
+        if copy_templates:
+            loadout_json = copy.deepcopy(self.ship.loadout_template)
+        else:
+            loadout_json = dict(self.ship.loadout_template)
+            loadout_json["Modules"] = list(loadout_json["Modules"])
         modules = loadout_json["Modules"]
         modules.append(self.shield_generator.create_loadout(default_sg, *self.ship.get_available_internal_slot(self.shield_generator.module_class, reverse=True)))
 
@@ -76,5 +140,5 @@ class LoadOut(object):
             raise RuntimeError("Booster number mismatch")
 
         for i in range(0, min(len(self.boosters), self.ship.utility_slots)):
-            modules.append(self.boosters[i].get_loadout_template_slot(self.ship.utility_slots_free[i]))
+            modules.append(self.boosters[i].get_loadout_template_slot(self.ship.utility_slots_free[i], copy_template=copy_templates))
         return loadout_json
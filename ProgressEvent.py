@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Optional
+
+
+class ProgressEvent(object):
+    """
+    Progress of a running test. ShieldTester.compute() puts one into the progress queue after each finished task.
+    Items are booster combinations, every item tests all loadouts (and all scenarios).
+    """
+    __slots__ = ("items_done", "items_total", "loadouts_done", "loadouts_total", "elapsed", "loadouts_per_second", "eta", "active_workers",
+                 "chunk_size")
+
+    def __init__(self, items_done: int = 0, items_total: int = 0, loadouts_done: int = 0, loadouts_total: int = 0, elapsed: float = 0.0,
+                 active_workers: int = 0, chunk_size: int = 0):
+        self.items_done = items_done
+        self.items_total = items_total
+        self.loadouts_done = loadouts_done
+        self.loadouts_total = loadouts_total
+        self.elapsed = elapsed  # seconds since the tasks were started
+        self.loadouts_per_second = loadouts_done / elapsed if elapsed > 0 else 0.0
+        # estimated seconds until all loadouts are tested
+        self.eta = (loadouts_total - loadouts_done) / self.loadouts_per_second if self.loadouts_per_second > 0 else None  # type: Optional[float]
+        self.active_workers = active_workers  # processes that are working on a task
+        self.chunk_size = chunk_size  # items of the next task
+
+    @property
+    def fraction(self) -> float:
+        return self.items_done / self.items_total if self.items_total > 0 else 1.0
+
+    @property
+    def done(self) -> bool:
+        return self.items_done >= self.items_total
+
+    def __repr__(self):
+        eta = f"{self.eta:.1f} s" if self.eta is not None else "unknown"
+        return (f"ProgressEvent({self.items_done}/{self.items_total}, {self.loadouts_per_second:,.0f} loadouts/s, ETA {eta}, "
+                f"{self.active_workers} active workers)")
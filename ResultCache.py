@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import collections
+import copy
+import os
+import pickle
+from typing import Any, Dict, Optional
+
+from .Utility import Utility
+
+
+class ResultCache(object):
+    """
+    Results of ShieldTester.compute() by TestCase fingerprint (see TestCase.get_fingerprint).
+    The most recently used results are kept in memory. If persistent is set, results are also stored in a directory and
+    are available after a restart. Every entry belongs to a data file, entries of other data files are ignored.
+    Cached results and rankings are copied when they are stored and when they are returned, so they can't be changed from outside.
+    Only the containers are copied, ships, shield generators and boosters of the loadouts are shared with the loaded data.
+    """
+    VERSION = 4
+    DEFAULT_SIZE = 128
+    DEFAULT_MAX_DISK_BYTES = 256 * 1024 * 1024
+    FILE_PREFIX = "result_"
+
+    def __init__(self, max_entries: int = DEFAULT_SIZE, directory: str = "", persistent: bool = False, max_disk_bytes: int = DEFAULT_MAX_DISK_BYTES):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.persistent = persistent  # only used if directory is set
+        self.max_disk_bytes = max_disk_bytes  # least recently used results are removed from the directory first
+        self.hits = 0
+        self.disk_hits = 0  # hits that were loaded from the directory, included in hits
+        self.misses = 0
+        self.__entries = collections.OrderedDict()  # type: collections.OrderedDict[str, Any] # key: data hash + fingerprint, least recently used first
+
+    def __len__(self):
+        return len(self.__entries)
+
+    @property
+    def statistics(self) -> Dict[str, int]:
+        return {"hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self.__entries)}
+
+    def __use_directory(self) -> bool:
+        return self.persistent and bool(self.directory)
+
+    def get_file_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{ResultCache.FILE_PREFIX}{key}.pickle")
+
+    @staticmethod
+    def __copy_result(result: Any) -> Any:
+        """
+        Copy a TestResult or a list of TestResult without copying the modules of the loadouts.
+        :param result: TestResult or list of TestResult
+        :return: copy
+        """
+        if isinstance(result, list):
+            return [ResultCache.__copy_result(r) for r in result]
+        result = copy.copy(result)
+        for name, value in vars(result).items():
+            if isinstance(value, dict):
+                setattr(result, name, dict(value))
+        if result.loadout is not None:
+            result.loadout = copy.copy(result.loadout)
+            if result.loadout.boosters is not None:
+                result.loadout.boosters = list(result.loadout.boosters)
+        return result
+
+    def __store(self, entry_key: str, result: Any):
+        self.__entries[entry_key] = result
+        self.__entries.move_to_end(entry_key)
+        while len(self.__entries) > max(0, self.max_entries):
+            self.__entries.popitem(last=False)
+
+    def __load(self, key: str, data_hash: str) -> Optional[Any]:
+        path = self.get_file_path(key)
+        try:
+            with open(path, "rb") as result_file:
+                version, file_key, file_data_hash, result = pickle.load(result_file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError, ImportError):
+            return None
+        if version != ResultCache.VERSION or file_key != key or file_data_hash != data_hash:
+            return None
+        try:
+            os.utime(path)  # least recently used results are removed first when the directory gets too big
+        except OSError:
+            pass
+        return result
+
+    def get(self, key: str, data_hash: str) -> Optional[Any]:
+        """
+        Get a result.
+        :param key: fingerprint of the test
+        :param data_hash: hash of the current data file
+        :return: copy of the result or None
+        """
+        entry_key = f"{data_hash}:{key}"
+        result = self.__entries.get(entry_key)
+        if result is not None:
+            self.__entries.move_to_end(entry_key)
+        elif self.__use_directory():
+            result = self.__load(key, data_hash)
+            if result is not None:
+                self.disk_hits += 1
+                self.__store(entry_key, result)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return ResultCache.__copy_result(result)
+
+    def put(self, key: str, data_hash: str, result: Any):
+        """
+        Add a result. Results with the same key are replaced.
+        If the result is stored in the directory, the least recently used results are removed until they need at most max_disk_bytes.
+        :param key: fingerprint of the test
+        :param data_hash: hash of the data file the test was created from
+        :param result: TestResult or list of TestResult
+        """
+        result = ResultCache.__copy_result(result)
+        self.__store(f"{data_hash}:{key}", result)
+        if self.__use_directory():
+            try:
+                os.makedirs(self.directory, exist_ok=True)
+                path = self.get_file_path(key)
+                with open(path + ".tmp", "wb") as result_file:
+                    pickle.dump((ResultCache.VERSION, key, data_hash, result), result_file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(path + ".tmp", path)
+            except OSError as e:
+                print(f"Could not save result: {e}")
+            else:
+                Utility.prune_files(self.directory, ResultCache.FILE_PREFIX, self.max_disk_bytes, os.path.basename(path))
+
+    def clear(self, remove_files: bool = False):
+        """
+        Remove all results from memory and reset the statistics.
+        :param remove_files: also remove the stored results from the directory
+        """
+        self.__entries.clear()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if remove_files and self.directory and os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.startswith(ResultCache.FILE_PREFIX):
+                    try:
+                        os.remove(os.path.join(self.directory, name))
+                    except OSError:
+                        pass
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+import array
+import functools
+import heapq
+import json
+import mmap
+import struct
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .CombinationRange import CombinationRange
+from .ShieldBoosterVariant import ShieldBoosterVariant
+from .TestResult import TestResult
+from .VectorizedEngine import VectorizedEngine
+
+try:
+    # noinspection PyUnresolvedReferences
+    import numpy as np
+    _numpy_imported = True
+except ImportError:
+    _numpy_imported = False
+
+
+class ResultGrid(object):
+    """
+    Every tested loadout of a test in a file: survival time, incoming dps and hitpoints for each booster combination and shield generator variant,
+    see ShieldTester.compute(result_grid=...). The file is memory-mapped for queries, so results can be analysed without running the test again.
+
+    File format: a header (HEADER), the json metadata (descriptions of the shield generator variants and booster variants and the test setup)
+    and the grid starting at data_offset. The grid is in row-major order: booster combinations (by rank, see CombinationRange) are the rows,
+    shield generator variants are the columns and each cell has VALUES_PER_CELL float32 values.
+    Survival time is negative if the ship doesn't die and incoming dps is the dps after regeneration (negative if the shields regenerate faster).
+    Hitpoints don't include SCBs and guardian shield reinforcements, like TestResult.total_hitpoints.
+    """
+    MAGIC = b"STGRID\x00\x01"
+    VERSION = 1
+    # magic, version, values per cell, number of combinations, number of loadouts, number of boosters, number of booster variants,
+    # complete flag, metadata size, data offset
+    HEADER = struct.Struct("<8sIIQIIIIIQ")
+    ALIGNMENT = 64
+    VALUES_PER_CELL = 3
+    SURVIVAL_TIME = 0
+    INCOMING_DPS = 1
+    HITPOINTS = 2
+
+    def __init__(self, path: str):
+        """
+        Open a grid file for queries. Use close() or the ResultGrid as context manager when done.
+        :param path: file created by ShieldTester.compute()
+        :raises RuntimeError if the file is not a result grid
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(ResultGrid.HEADER.size)
+            if len(header) < ResultGrid.HEADER.size:
+                raise RuntimeError("Not a result grid")
+            (magic, version, values_per_cell, self.number_of_combinations, self.number_of_loadouts, self.number_of_boosters,
+             self.number_of_variants, complete, metadata_size, self.data_offset) = ResultGrid.HEADER.unpack(header)
+            if magic != ResultGrid.MAGIC or version != ResultGrid.VERSION or values_per_cell != ResultGrid.VALUES_PER_CELL:
+                raise RuntimeError("Not a result grid")
+            self.complete = bool(complete)  # False if the test was cancelled, untested cells are 0
+            metadata = json.loads(f.read(metadata_size).decode("utf-8"))
+            self.loadouts = metadata["loadouts"]  # type: List[Dict[str, Any]]
+            self.shield_booster_variants = metadata["shield_booster_variants"]  # type: List[Dict[str, Any]]
+            self.test_case = metadata["test_case"]  # type: Dict[str, Any]
+            size = self.number_of_combinations * self.number_of_loadouts * ResultGrid.VALUES_PER_CELL * 4
+            self.__mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size > 0 else None
+        self.__grid = None
+        if self.__mmap is not None:
+            if _numpy_imported:
+                self.__grid = np.frombuffer(self.__mmap, dtype=np.float32, count=size // 4, offset=self.data_offset)
+                self.__grid = self.__grid.reshape(self.number_of_combinations, self.number_of_loadouts, ResultGrid.VALUES_PER_CELL)
+            else:
+                self.__grid = memoryview(self.__mmap)[self.data_offset:self.data_offset + size].cast("f")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return self.number_of_combinations * self.number_of_loadouts
+
+    def close(self):
+        if isinstance(self.__grid, memoryview):
+            self.__grid.release()
+        self.__grid = None
+        if self.__mmap is not None:
+            try:
+                self.__mmap.close()
+            except BufferError:
+                pass  # arrays from get_values() are still in use, the file is closed when they are garbage collected
+            self.__mmap = None
+
+    @staticmethod
+    def _get_loadout_description(loadout) -> Dict[str, Any]:
+        shield_generator = loadout.shield_generator
+        return {"name": shield_generator.name,
+                "class": shield_generator.module_class,
+                "engineering": shield_generator.engineered_name,
+                "experimental": shield_generator.experimental_name,
+                "shield_strength": loadout.shield_strength}
+
+    @staticmethod
+    def create(path: str, test_case, number_of_boosters: int) -> int:
+        """
+        Create the file with header and metadata. The grid is filled by test_case() and is 0 until then.
+        :param path: file name, an existing file is replaced
+        :param test_case: TestCase with the loadouts and booster variants that will be tested, grid indexes refer to them
+        :param number_of_boosters: number of boosters of each combination
+        :return: data offset for test_case()
+        """
+        number_of_combinations = CombinationRange.count(len(test_case.shield_booster_variants), number_of_boosters)
+        metadata = json.dumps({"loadouts": [ResultGrid._get_loadout_description(loadout) for loadout in test_case.loadout_list],
+                               "shield_booster_variants": [{"engineering": booster.engineering, "experimental": booster.experimental}
+                                                           for booster in test_case.shield_booster_variants],
+                               "test_case": test_case.get_log_record()}).encode("utf-8")
+        data_offset = ResultGrid.HEADER.size + len(metadata)
+        data_offset += -data_offset % ResultGrid.ALIGNMENT
+        with open(path, "wb") as f:
+            f.write(ResultGrid.HEADER.pack(ResultGrid.MAGIC, ResultGrid.VERSION, ResultGrid.VALUES_PER_CELL, number_of_combinations,
+                                           len(test_case.loadout_list), number_of_boosters, len(test_case.shield_booster_variants), 0,
+                                           len(metadata), data_offset))
+            f.write(metadata)
+            f.truncate(data_offset + number_of_combinations * len(test_case.loadout_list) * ResultGrid.VALUES_PER_CELL * 4)
+        return data_offset
+
+    @staticmethod
+    def set_complete(path: str):
+        """
+        Mark the grid as complete after all booster combinations were tested.
+        """
+        with open(path, "r+b") as f:
+            header = list(ResultGrid.HEADER.unpack(f.read(ResultGrid.HEADER.size)))
+            header[7] = 1
+            f.seek(0)
+            f.write(ResultGrid.HEADER.pack(*header))
+
+    @staticmethod
+    def test_case(test_case, booster_combinations: CombinationRange, booster_bonuses: Optional[Sequence[float]], path: str, data_offset: int,
+                  test_function: Callable, *args) -> Any:
+        """
+        Write the values of all loadouts and booster combinations of a task into the grid and run test_function for the result.
+        Runs in the worker processes, the parts of the grid don't overlap.
+        :param test_case: TestCase containing test setup
+        :param booster_combinations: range of booster combinations, the ranks are the rows of the grid
+        :param booster_bonuses: optional precalculated bonuses (see BoosterBonusTable), 4 values per booster combination
+        :param path: file created by create()
+        :param data_offset: return value of create()
+        :param test_function: TestCase.test_case or a function with the same signature
+        :param args: additional arguments for test_function
+        :return: result of test_function
+        """
+        if _numpy_imported:
+            loadouts = VectorizedEngine.pack_loadouts(test_case.loadout_list)
+            survival_time, actual_dps, hp = VectorizedEngine.evaluate(test_case, loadouts,
+                                                                      VectorizedEngine._get_bonuses(test_case, booster_combinations, booster_bonuses))
+            data = np.stack((survival_time, actual_dps, hp), axis=-1).astype(np.float32).tobytes()
+        else:
+            data = ResultGrid._evaluate(test_case, booster_combinations, booster_bonuses).tobytes()
+
+        with open(path, "r+b") as f:
+            f.seek(data_offset + booster_combinations.start * len(test_case.loadout_list) * ResultGrid.VALUES_PER_CELL * 4)
+            f.write(data)
+        return test_function(test_case, booster_combinations, booster_bonuses, *args)
+
+    @staticmethod
+    def _evaluate(test_case, booster_combinations: CombinationRange, booster_bonuses: Optional[Sequence[float]]) -> array.array:
+        # same arithmetic as TestCase.test_case
+        values = array.array("f")
+        for i, booster_combination in enumerate(booster_combinations):
+            if booster_bonuses is not None:
+                exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus = booster_bonuses[i * 4:i * 4 + 4]
+            else:
+                boosters = [test_case.shield_booster_variants[x] for x in booster_combination]
+                exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus = ShieldBoosterVariant.calculate_booster_bonuses(boosters)
+            for loadout in test_case.loadout_list:
+                hp = loadout.shield_strength * hitpoint_bonus
+                actual_dps = test_case.damage_effectiveness * (
+                        test_case.explosive_dps * (1 - loadout.shield_generator.explres) * exp_modifier +
+                        test_case.kinetic_dps * (1 - loadout.shield_generator.kinres) * kin_modifier +
+                        test_case.thermal_dps * (1 - loadout.shield_generator.thermres) * therm_modifier +
+                        test_case.absolute_dps) - loadout.shield_generator.regen * (1.0 - test_case.damage_effectiveness)
+                survival_time = (hp + test_case.scb_hitpoints + test_case.guardian_hitpoints) / actual_dps if actual_dps != 0 else float("inf")
+                values.extend((survival_time, actual_dps, hp))
+        return values
+
+    def get_boosters(self, rank: int) -> Tuple[int, ...]:
+        """
+        :return: indexes of the booster variants of a booster combination
+        """
+        return CombinationRange.unrank(self.number_of_variants, self.number_of_boosters, rank)
+
+    def get(self, loadout_index: int, rank: int) -> Tuple[float, float, float]:
+        """
+        :param loadout_index: index of the shield generator variant
+        :param rank: rank of the booster combination
+        :return: tuple: survival time, incoming dps, hitpoints
+        """
+        if not 0 <= loadout_index < self.number_of_loadouts or not 0 <= rank < self.number_of_combinations:
+            raise IndexError("grid index out of range")
+        index = (rank * self.number_of_loadouts + loadout_index) * ResultGrid.VALUES_PER_CELL
+        if _numpy_imported:
+            values = self.__grid.reshape(-1)[index:index + ResultGrid.VALUES_PER_CELL]
+        else:
+            values = self.__grid[index:index + ResultGrid.VALUES_PER_CELL]
+        return float(values[0]), float(values[1]), float(values[2])
+
+    def get_values(self, value: int = SURVIVAL_TIME) -> "np.ndarray":
+        """
+        Get one value of all cells as matrix, e.g. for a heatmap. The matrix is a read-only view of the file.
+        :param value: SURVIVAL_TIME, INCOMING_DPS or HITPOINTS
+        :return: matrix of shape (number_of_combinations, number_of_loadouts)
+        :raises RuntimeError if NumPy is not installed
+        """
+        if not _numpy_imported:
+            raise RuntimeError("NumPy is required for get_values()")
+        if self.__grid is None:
+            return np.zeros((self.number_of_combinations, self.number_of_loadouts), dtype=np.float32)
+        return self.__grid[:, :, value]
+
+    def __get_allowed_combinations(self, booster_filter: Callable[[Dict[str, Any]], bool]) -> List[int]:
+        allowed_variants = [booster_filter(booster) for booster in self.shield_booster_variants]
+        return [rank for rank, combination in enumerate(CombinationRange(self.number_of_variants, self.number_of_boosters))
+                if all(allowed_variants[x] for x in combination)]
+
+    def query(self, top_n: int = 1, loadout_filter: Callable[[Dict[str, Any]], bool] = None,
+              booster_filter: Callable[[Dict[str, Any]], bool] = None) -> List[Tuple[int, int, float, float, float]]:
+        """
+        Find the best cells of the grid with the ranking rules of TestResult, e.g. the best loadout without a certain experimental effect.
+        :param top_n: number of results
+        :param loadout_filter: optional function that gets the description of a shield generator variant (see loadouts) and returns True to keep it
+        :param booster_filter: optional function that gets the description of a booster variant (see shield_booster_variants) and returns True
+                               to keep it. Booster combinations with a variant that isn't kept are skipped
+        :return: list of tuples (loadout index, combination rank, survival time, incoming dps, hitpoints), best first
+        """
+        if top_n < 1 or self.__grid is None:
+            return list()
+        columns = [i for i, loadout in enumerate(self.loadouts) if loadout_filter is None or loadout_filter(loadout)]
+        rows = self.__get_allowed_combinations(booster_filter) if booster_filter else None
+        if not columns or rows == []:
+            return list()
+
+        if _numpy_imported:
+            grid = self.__grid
+            if rows is not None:
+                grid = grid[np.asarray(rows, dtype=np.intp)]
+            if len(columns) < self.number_of_loadouts:
+                grid = grid[:, np.asarray(columns, dtype=np.intp)]
+            indexes = VectorizedEngine.find_top_k(grid[:, :, ResultGrid.SURVIVAL_TIME], grid[:, :, ResultGrid.INCOMING_DPS],
+                                                  grid[:, :, ResultGrid.HITPOINTS], top_n)
+            results = list()
+            for index in indexes:
+                row, column = divmod(index, len(columns))
+                cell = grid[row, column]
+                results.append((columns[column], rows[row] if rows is not None else row, float(cell[0]), float(cell[1]), float(cell[2])))
+            return results
+
+        def get_entries():
+            for rank in (rows if rows is not None else range(self.number_of_combinations)):
+                for column in columns:
+                    index = (rank * self.number_of_loadouts + column) * ResultGrid.VALUES_PER_CELL
+                    survival_time, actual_dps, hp = self.__grid[index:index + ResultGrid.VALUES_PER_CELL]
+                    # survival time is only positive if the ship dies, same as actual_dps > 0
+                    yield survival_time, actual_dps, hp, (rank, column)
+
+        entries = heapq.nsmallest(top_n, get_entries(), key=functools.cmp_to_key(TestResult.compare_ranking))
+        return [(column, rank, survival_time, actual_dps, hp) for survival_time, actual_dps, hp, (rank, column) in entries]
+
+    def get_description(self, loadout_index: int, rank: int) -> str:
+        """
+        :return: shield generator variant and booster variants of a cell as text
+        """
+        loadout = self.loadouts[loadout_index]
+        boosters = [self.shield_booster_variants[x] for x in self.get_boosters(rank)]
+        return " | ".join([f"{loadout['name']} ({loadout['class']}) - {loadout['engineering']} - {loadout['experimental']}"] +
+                          [f"{booster['engineering']} - {booster['experimental']}" for booster in boosters])
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from typing import Any, Dict, List
+
+
+class ResultLog(object):
+    """
+    Structured log with one json record per line (JSONL), e.g. records of ShieldTester.write_log_record().
+
+    write() only puts the record into a queue, a background thread writes the records in batches: a batch is written when it has
+    batch_size records or flush_interval seconds after its first record. The file is rotated when it would grow beyond max_bytes:
+    it's compressed to <path>.1.gz and older files are renamed to <path>.2.gz and so on. Only the newest backups are kept.
+    Records must not be changed after they were passed to write().
+    """
+    DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+    DEFAULT_BACKUPS = 5
+    DEFAULT_BATCH_SIZE = 1000
+    DEFAULT_FLUSH_INTERVAL = 1.0  # seconds
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES, backups: int = DEFAULT_BACKUPS, batch_size: int = DEFAULT_BATCH_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL):
+        """
+        :param path: log file, directories are created if necessary
+        :param max_bytes: maximum size of the log file before it's rotated, 0 to never rotate
+        :param backups: number of compressed old log files to keep
+        :param batch_size: maximum number of records per write
+        :param flush_interval: maximum number of seconds a record waits in the queue
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.records_written = 0
+        self.batches_written = 0
+        self.rotations = 0
+        self.__queue = queue.Queue()
+        self.__file = None
+        self.__closed = False
+        self.__thread = threading.Thread(target=self.__run, name="ResultLog", daemon=True)
+        self.__thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def statistics(self) -> Dict[str, int]:
+        return {"records_written": self.records_written,
+                "batches_written": self.batches_written,
+                "rotations": self.rotations}
+
+    def write(self, record: Dict[str, Any]):
+        """
+        Add a record to the log. Doesn't wait until it's written.
+        :raises RuntimeError if the log was closed
+        """
+        if self.__closed:
+            raise RuntimeError("Log is closed")
+        self.__queue.put(record)
+
+    def flush(self):
+        """
+        Wait until all records that were passed to write() are in the file.
+        """
+        if not self.__closed:
+            done = threading.Event()
+            self.__queue.put(done)
+            done.wait()
+
+    def close(self):
+        """
+        Write the remaining records and stop the background thread.
+        """
+        if not self.__closed:
+            self.__closed = True
+            self.__queue.put(None)
+            self.__thread.join()
+
+    def __run(self):
+        closing = False
+        while not closing:
+            batch = list()
+            waiting = list()  # type: List[threading.Event]
+            item = self.__queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is None:
+                    closing = True
+                elif isinstance(item, threading.Event):
+                    waiting.append(item)
+                else:
+                    batch.append(item)
+                if closing or waiting or len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.__queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+
+            if batch:
+                self.__write_batch(batch)
+            for done in waiting:
+                done.set()
+        if self.__file:
+            self.__file.close()
+            self.__file = None
+
+    def __write_batch(self, batch: List[Dict[str, Any]]):
+        data = "".join(json.dumps(record, separators=(",", ":"), default=str) + "\n" for record in batch).encode("utf-8")
+        try:
+            if self.__file is None:
+                directory = os.path.dirname(os.path.abspath(self.path))
+                os.makedirs(directory, exist_ok=True)
+                self.__file = open(self.path, "ab")
+            if self.max_bytes and self.__file.tell() and self.__file.tell() + len(data) > self.max_bytes:
+                self.__rotate()
+            self.__file.write(data)
+            self.__file.flush()
+            self.records_written += len(batch)
+            self.batches_written += 1
+        except OSError as e:
+            print(f"Could not write log: {e}")
+
+    def __rotate(self):
+        self.__file.close()
+        self.__file = None
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{i}.gz"):
+                    os.replace(f"{self.path}.{i}.gz", f"{self.path}.{i + 1}.gz")
+            with open(self.path, "rb") as source, gzip.open(f"{self.path}.1.gz.tmp", "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.replace(f"{self.path}.1.gz.tmp", f"{self.path}.1.gz")
+        os.remove(self.path)
+        self.__file = open(self.path, "ab")
+        self.rotations += 1
@@ -0,0 +1,243 @@
+from __future__ import annotations
+
+import array
+import copy
+from typing import Any, Callable, Dict, List, Tuple
+
+from .CombinationRange import CombinationRange
+from .LoadOut import LoadOut
+from .ShieldGenerator import ShieldGenerator
+from .TestCase import TestCase
+from .TestResult import TestResult
+
+try:
+    # noinspection PyUnresolvedReferences
+    from multiprocessing import shared_memory
+    _shared_memory_imported = True
+except ImportError:
+    # Python < 3.8
+    _shared_memory_imported = False
+
+# group of blocks the current worker process is attached to, the blocks by name and the test data created from them
+_attached_group = ""
+_attached_blocks = dict()  # type: Dict[str, shared_memory.SharedMemory]
+_attached_data = dict()  # type: Dict[Tuple[Tuple[str, ...], Tuple[int, int]], Tuple[List[TestCase], memoryview]]
+
+
+class _LoadOutStats(LoadOut):
+    """
+    Stand-in for a LoadOut in worker processes. Only has the stats that are used by the tests and the index of the original loadout.
+    """
+    __slots__ = ("index",)
+
+    def __init__(self, index: int, explres: float, kinres: float, thermres: float, regen: float, shield_strength: float):
+        shield_generator = ShieldGenerator()
+        shield_generator.explres = explres
+        shield_generator.kinres = kinres
+        shield_generator.thermres = thermres
+        shield_generator.regen = regen
+        super().__init__(shield_generator, None)
+        self.index = index
+        self.shield_strength = shield_strength
+
+
+class SharedTestData(object):
+    """
+    Numeric data of a test in shared memory. Tasks for the worker pool only need to carry a SharedTestData and a range of
+    booster combinations instead of the whole TestCase with ship, loadouts and booster variants. Workers create the booster combinations
+    of their range themselves (see CombinationRange).
+
+    The parent process creates the shared memory blocks with create() and removes them with close().
+    Several tests can share blocks (see create_group()), each of them only uses its part of the blocks.
+    Pickling a SharedTestData only transfers the names and sizes of the blocks and the damage settings.
+    Worker processes attach to the blocks by name (once per test) and run the tests with stand-ins for the loadouts and with booster
+    indexes instead of ShieldBoosterVariant. Use restore_result() in the parent process to replace them with the original objects.
+    """
+    LOADOUT_STATS = 5  # explres, kinres, thermres, regen, shield strength
+
+    def __init__(self, number_of_loadouts: int, number_of_variants: int, number_of_boosters: int, number_of_combinations: int,
+                 scenario_parameters: List[Dict[str, float]], scenarios: bool, first_rank: int = 0):
+        self.number_of_loadouts = number_of_loadouts
+        self.number_of_variants = number_of_variants
+        self.number_of_boosters = number_of_boosters
+        self.number_of_combinations = number_of_combinations
+        self.first_rank = first_rank  # rank of the first booster combination (see CombinationRange)
+        self.scenario_parameters = scenario_parameters  # damage settings of each TestCase, see TestCase.SCENARIO_PARAMETERS
+        self.scenarios = scenarios  # whether the test function expects a list of TestCase
+        self.block_names = list()  # type: List[str] # loadouts, bonuses
+        self.offsets = (0, 0)  # index of the first value of this test in each block
+        self.group = ""  # workers keep the blocks of a group attached until they get a task of another group
+
+        # only set in the parent process
+        self._blocks = list()  # type: List[shared_memory.SharedMemory]
+        self._loadout_list = None  # type: List[LoadOut]
+        self._shield_booster_variants = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        state["_blocks"] = list()
+        state["_loadout_list"] = None
+        state["_shield_booster_variants"] = None
+        return state
+
+    @staticmethod
+    def is_available() -> bool:
+        return _shared_memory_imported
+
+    @staticmethod
+    def _create_block(data: array.array) -> shared_memory.SharedMemory:
+        # size 0 is not allowed
+        block = shared_memory.SharedMemory(create=True, size=max(1, len(data) * data.itemsize))
+        block.buf[:len(data) * data.itemsize] = data.tobytes()
+        return block
+
+    @staticmethod
+    def create(test_cases: List[TestCase], booster_combinations: CombinationRange, booster_bonuses: array.array,
+               scenarios: bool = False) -> SharedTestData:
+        """
+        Copy the data of a test into shared memory. Call close() when the test is done.
+        :param test_cases: TestCase or list of scenarios. All of them must have the same loadouts and booster variants
+        :param booster_combinations: all booster combinations that will be tested (booster indexes refer to the booster variants of the test cases)
+        :param booster_bonuses: bonuses of the booster combinations, 4 values per combination (see BoosterBonusTable)
+        :param scenarios: True if the test function expects a list of TestCase (e.g. TestCase.test_scenarios)
+        :return: SharedTestData
+        """
+        test_case = test_cases[0]
+        shared = SharedTestData(len(test_case.loadout_list), len(test_case.shield_booster_variants), booster_combinations.number_of_boosters,
+                                len(booster_combinations), [{key: getattr(tc, key) for key in TestCase.SCENARIO_PARAMETERS} for tc in test_cases], scenarios,
+                                booster_combinations.start)
+        shared._loadout_list = test_case.loadout_list
+        shared._shield_booster_variants = test_case.shield_booster_variants
+
+        try:
+            for data in (SharedTestData._get_loadout_stats(test_case.loadout_list), booster_bonuses):
+                shared._blocks.append(SharedTestData._create_block(data))
+        except BaseException:
+            shared.close()
+            raise
+        shared.block_names = [block.name for block in shared._blocks]
+        shared.group = ";".join(shared.block_names)
+        return shared
+
+    @staticmethod
+    def _get_loadout_stats(loadout_list: List[LoadOut]) -> array.array:
+        loadouts = array.array("d")
+        for loadout in loadout_list:
+            sg = loadout.shield_generator
+            loadouts.extend((sg.explres, sg.kinres, sg.thermres, sg.regen, loadout.shield_strength))
+        return loadouts
+
+    @staticmethod
+    def create_group(tests: List[Tuple[TestCase, CombinationRange, array.array]]) -> List[SharedTestData]:
+        """
+        Copy the data of several tests into shared memory. The loadouts of all tests are in one block and booster bonuses
+        that are used by several tests (the same array, e.g. from the same BoosterBonusTable) are only copied once.
+        Call close() of each test when all of them are done.
+        :param tests: list of tuples (test case, booster combinations, booster bonuses), see create()
+        :return: SharedTestData for each test (same order)
+        """
+        group = list()
+        loadouts = array.array("d")
+        bonus_blocks = dict()  # type: Dict[int, shared_memory.SharedMemory] # key: id of the bonuses
+        blocks = list()
+        try:
+            for test_case, booster_combinations, booster_bonuses in tests:
+                shared = SharedTestData(len(test_case.loadout_list), len(test_case.shield_booster_variants), booster_combinations.number_of_boosters,
+                                        len(booster_combinations), [{key: getattr(test_case, key) for key in TestCase.SCENARIO_PARAMETERS}], False,
+                                        booster_combinations.start)
+                shared._loadout_list = test_case.loadout_list
+                shared._shield_booster_variants = test_case.shield_booster_variants
+                if id(booster_bonuses) not in bonus_blocks:
+                    bonus_blocks[id(booster_bonuses)] = SharedTestData._create_block(booster_bonuses)
+                    blocks.append(bonus_blocks[id(booster_bonuses)])
+                shared._blocks = [bonus_blocks[id(booster_bonuses)]]
+                shared.block_names = ["", bonus_blocks[id(booster_bonuses)].name]
+                shared.offsets = (len(loadouts), 0)
+                loadouts.extend(SharedTestData._get_loadout_stats(test_case.loadout_list))
+                group.append(shared)
+            blocks.insert(0, SharedTestData._create_block(loadouts))
+        except BaseException:
+            for block in blocks:
+                block.close()
+                block.unlink()
+            raise
+        group_name = ";".join(block.name for block in blocks)
+        for shared in group:
+            shared._blocks.insert(0, blocks[0])
+            shared.block_names[0] = blocks[0].name
+            shared.group = group_name
+        return group
+
+    def close(self):
+        """
+        Remove the shared memory blocks. Only call this in the parent process.
+        """
+        for block in self._blocks:
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass  # shared with another test of the group that was closed before
+        self._blocks = list()
+
+    def _attach(self) -> Tuple[List[TestCase], memoryview]:
+        """
+        Attach to the shared memory blocks and create the test cases. The result is kept until the worker gets a task of another group.
+        """
+        global _attached_group, _attached_blocks, _attached_data
+        if _attached_group != self.group:
+            _attached_data = dict()
+            for block in _attached_blocks.values():
+                try:
+                    block.close()
+                except BufferError:
+                    pass  # still in use, the block is closed when it's garbage collected
+            _attached_blocks = dict()
+            _attached_group = self.group
+
+        key = (tuple(self.block_names), self.offsets)
+        if key not in _attached_data:
+            for name in self.block_names:
+                if name not in _attached_blocks:
+                    _attached_blocks[name] = shared_memory.SharedMemory(name=name)
+            loadouts_block, bonuses_block = (_attached_blocks[name] for name in self.block_names)
+            loadouts_offset, bonuses_offset = self.offsets
+
+            loadouts = loadouts_block.buf[loadouts_offset * 8:(loadouts_offset + self.number_of_loadouts * SharedTestData.LOADOUT_STATS) * 8].cast("d")
+            base_test_case = TestCase(None)
+            base_test_case.loadout_list = [_LoadOutStats(i, *loadouts[i * SharedTestData.LOADOUT_STATS:(i + 1) * SharedTestData.LOADOUT_STATS])
+                                           for i in range(0, self.number_of_loadouts)]
+            loadouts.release()
+            base_test_case.shield_booster_variants = list(range(0, self.number_of_variants))
+            base_test_case.number_of_boosters_to_test = self.number_of_boosters
+            test_cases = [base_test_case.create_scenario(parameters) for parameters in self.scenario_parameters]
+
+            bonuses = bonuses_block.buf[bonuses_offset * 8:(bonuses_offset + self.number_of_combinations * 4) * 8].cast("d")
+            _attached_data[key] = (test_cases, bonuses)
+        return _attached_data[key]
+
+    @staticmethod
+    def run_task(shared: SharedTestData, start: int, end: int, test_function: Callable, *args) -> Any:
+        """
+        Run test_function for a range of booster combinations in a worker process.
+        :param shared: SharedTestData created in the parent process
+        :param start: index of the first booster combination
+        :param end: index after the last booster combination
+        :param test_function: function with the same signature as TestCase.test_case (or TestCase.test_scenarios if shared.scenarios is set)
+        :param args: additional arguments for test_function
+        :return: result of test_function, use restore_result() in the parent process
+        """
+        test_cases, bonuses = shared._attach()
+        combinations = CombinationRange(shared.number_of_variants, shared.number_of_boosters, shared.first_rank + start, shared.first_rank + end)
+        return test_function(test_cases if shared.scenarios else test_cases[0], combinations, bonuses[start * 4:end * 4], *args)
+
+    def restore_result(self, result: TestResult) -> TestResult:
+        """
+        Replace the stand-in loadout and the booster indexes of a result from a worker with the original objects.
+        :return: the same TestResult
+        """
+        if isinstance(result.loadout, _LoadOutStats):
+            loadout = copy.copy(self._loadout_list[result.loadout.index])  # boosters are different for each result
+            loadout.boosters = [self._shield_booster_variants[x] for x in result.loadout.boosters]
+            result.loadout = loadout
+        return result
@@ -3,8 +3,10 @@ import copy
 
 
 class ShieldBoosterVariant(object):
+    __slots__ = ("engineering", "experimental", "shield_strength_bonus", "exp_res_bonus", "kin_res_bonus", "therm_res_bonus", "can_skip", "loadout_template")
+
     def __init__(self):
-        # no need for private attributes, we are handing out deep copies
+        # booster variants are shared by all test cases, don't change them after loading
         self.engineering = ""
         self.experimental = ""
         self.shield_strength_bonus = 0
@@ -17,14 +19,15 @@ class ShieldBoosterVariant(object):
     def __str__(self):
         return f"{self.engineering} - {self.experimental}"
 
-    def get_loadout_template_slot(self, slot: int) -> Dict[str, Any]:
+    def get_loadout_template_slot(self, slot: int, copy_template: bool = True) -> Dict[str, Any]:
         """
         Get the loadout dictionary for the provided slot number
         :param slot: int from 1 to 8 (including)
+        :param copy_template: if False, nested dictionaries (e.g. engineering) are shared with the template and must not be changed
         :return:
         """
         if self.loadout_template:
-            loadout = copy.deepcopy(self.loadout_template)
+            loadout = copy.deepcopy(self.loadout_template) if copy_template else dict(self.loadout_template)
             loadout["Slot"] = f"tinyhardpoint{slot}"
             return loadout
         return dict()
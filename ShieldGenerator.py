@@ -13,8 +13,12 @@ class ShieldGenerator(object):
     TYPE_BIWEAVE = "bi-weave"
     TYPE_PRISMATIC = "prismatic"
 
+    __slots__ = ("symbol", "integrity", "power", "explres", "kinres", "thermres", "name", "module_class", "regen", "brokenregen", "distdraw",
+                 "maxmass", "maxmul", "minmass", "minmul", "optmass", "optmul",
+                 "engineered_name", "engineered_symbol", "experimental_name", "experimental_symbol")
+
     def __init__(self):
-        # no need for private attributes, we are handing out deep copies
+        # shield generators are shared by all loadouts and test cases, don't change them after loading
         self.symbol = ""
         self.integrity = 0
         self.power = 0
@@ -119,12 +123,12 @@ class ShieldGenerator(object):
         variations = list()
 
         for blueprint in blueprints:  # type: Dict[str, Any]
-            engineered_sg = copy.deepcopy(prototype)
+            engineered_sg = copy.copy(prototype)  # all attributes are immutable values
             engineered_sg.engineered_symbol = blueprint["symbol"]
             engineered_sg.engineered_name = blueprint["name"]
             engineered_sg._apply_engineering(blueprint["features"])
             for experimental in experimentals:  # type: Dict[str, Any]
-                exp_eng_sg = copy.deepcopy(engineered_sg)
+                exp_eng_sg = copy.copy(engineered_sg)
                 exp_eng_sg.experimental_symbol = experimental["symbol"]
                 exp_eng_sg.experimental_name = experimental["name"]
                 exp_eng_sg._apply_engineering(experimental["features"], is_percentage=True)
@@ -1,4 +1,8 @@
+import asyncio
 import base64
+import bisect
+import collections
+import concurrent.futures
 import copy
 import gzip
 import itertools
@@ -6,20 +10,40 @@ import json
 import math
 import multiprocessing
 import os
+import pickle
 import queue
 import re
 import sys
+import threading
 import time
 import unicodedata
-from typing import Dict, List, Tuple, Optional, Any, Union
+from typing import Dict, List, Tuple, Optional, Any, Union, Iterable, Callable, Sequence
 
+from .AsyncQueue import AsyncQueue
+from .BoosterBonusTable import BoosterBonusTable
+from .BoundFilter import BoundFilter
+from .BranchAndBound import BranchAndBound
+from .ChunkScheduler import ChunkScheduler
+from .CombinationRange import CombinationRange
+from .CompiledData import CompiledData
+from .DominanceFilter import DominanceFilter
+from .HullMassResult import HullMassResult
+from .ImportResult import ImportResult
+from .Instrumentation import Instrumentation
 from .LoadOut import LoadOut
+from .ProgressEvent import ProgressEvent
+from .ResultCache import ResultCache
+from .ResultGrid import ResultGrid
+from .ResultLog import ResultLog
+from .SharedTestData import SharedTestData
 from .ShieldBoosterVariant import ShieldBoosterVariant
 from .ShieldGenerator import ShieldGenerator
 from .StarShip import StarShip
+from .SweepResult import SweepResult
 from .TestCase import TestCase
 from .TestResult import TestResult
 from .Utility import Utility
+from .VectorizedEngine import VectorizedEngine
 
 try:
     # noinspection PyUnresolvedReferences
@@ -29,10 +53,41 @@ except ImportError as error:
     _psutil_imported = False
     print(error)
 
+_worker_generation = None  # type: Optional[multiprocessing.Value] # set in worker processes of the pool
+
+
+class _FleetJob(object):
+    """
+    Test of one ship and booster count in ShieldTester.compute_fleet().
+    """
+    def __init__(self, ship_name: str, test_case: TestCase, booster_bonus_table: BoosterBonusTable, first_item: int, cache_key: str):
+        self.ship_name = ship_name
+        self.test_case = test_case
+        self.booster_bonus_table = booster_bonus_table
+        self.first_item = first_item  # index of the first booster combination in the booster combinations of all jobs
+        self.cache_key = cache_key
+        self.shared = None  # type: Optional[SharedTestData]
+        self.results = dict()  # type: Dict[int, TestResult] # key: index of the first booster combination of the task
+        self.items_done = 0
+
 
 class ShieldTester(object):
-    MP_CHUNK_SIZE = 10000
+    MP_CHUNK_SIZE = 10000  # maximum number of booster combinations per task
+    MP_MIN_WORKLOAD = 10000  # minimum number of loadouts to test before the worker pool is used
+    MP_TASKS_PER_WORKER = 4  # split medium workloads into at least this many tasks per worker
+    MP_TASKS_IN_FLIGHT = 2  # tasks per worker that are queued in the pool at the same time
+    INITIAL_TASK_WORKLOAD = 10000  # loadouts tested by the first task, the following tasks are sized by ChunkScheduler
+    MIN_TASK_TIME = 0.02  # seconds, lower limit for the duration of tasks with a time budget
+    TASKS_PER_TIME_BUDGET = 10  # with a time budget, tasks take at most this fraction of the remaining time
+    SWEEP_BATCH_SIZE = 32  # grid cells that are tested together by sweep()
+    BOOSTER_BONUS_TABLES_MAX_BYTES = 256 * 1024 * 1024  # booster bonus tables kept in memory, least recently used tables are removed first
+    BOOSTER_BONUS_TABLES_MAX_DISK_BYTES = 1024 * 1024 * 1024  # booster bonus tables saved in the cache directory, see BoosterBonusTable.prune()
+    IMPORT_BATCH_SIZE = 2000  # lines that are read and decoded together by import_loadouts()
+    IMPORT_MP_MIN_LINES = 200  # minimum number of lines in a batch before the worker pool is used to decode them
+    ANYTIME_FIRST_GROUP = 5  # shield generator variants that are tested first with a time budget, the following groups double in size
+    CANCEL_POLL_INTERVAL = 0.1  # seconds
     LOG_DIRECTORY = os.path.join(os.getcwd(), "Logs")
+    CACHE_DIRECTORY_NAME = ".shield_tester_cache"  # created next to the data file
 
     EXPORT_SERVICES = {"Coriolis": (Utility.create_export_url, "https://coriolis.io/import?data={}"),
                        "EDSY": (Utility.create_export_url, "https://edsy.org/#/I={}"),
@@ -41,20 +96,42 @@ class ShieldTester(object):
     CALLBACK_MESSAGE = 1
     CALLBACK_STEP = 2
     CALLBACK_CANCELLED = 3
+    CALLBACK_PROGRESS = 4
+    CALLBACK_FLEET_RESULT = 5
+
+    ENGINE_PYTHON = "python"
+    ENGINE_NUMPY = "numpy"
+
+    SEARCH_EXHAUSTIVE = "exhaustive"
+    SEARCH_BRANCH_AND_BOUND = "branch-and-bound"
 
     def __init__(self):
         self.__ships = dict()  # type: Dict[str, StarShip]
+        self.__ship_symbols = dict()  # type: Dict[str, StarShip] # key: lower case symbol
         self.__importedShips = dict()  # type: Dict[str, StarShip]
         self.__booster_variants = list()
         # key of outer dictionary is the type, key for inner dictionary is the class
         # and the value is a list of all engineered shield generator combinations of that class and type
         self.__shield_generators = dict()  # type: Dict[str, Dict[int, List[ShieldGenerator]]]
         self.__unengineered_shield_generators = dict()
+        self.__data_hash = ""
+        self.__cache_directory = ""
+        self.__booster_bonus_tables = collections.OrderedDict()  # type: collections.OrderedDict[str, BoosterBonusTable] # least recently used first
+        self.__result_cache = ResultCache()
 
         self.__runtime = 0
         self.__cpu_cores = os.cpu_count()
         self.__cancel = False
         self.__pool = None  # type: multiprocessing.Pool
+        self.__pool_size = 0
+        self.__generation = None  # type: multiprocessing.Value # increased by cancel(), tasks of older generations are skipped
+        self.__executor = None  # type: concurrent.futures.ThreadPoolExecutor # runs the calls of the async methods one after the other
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
 
     @property
     def cpu_cores(self) -> int:
@@ -63,6 +140,102 @@ class ShieldTester(object):
     @cpu_cores.setter
     def cpu_cores(self, value: int):
         self.__cpu_cores = max(1, min(os.cpu_count(), abs(value)))
+        if self.__pool and self.__pool_size != self.__cpu_cores - 1:
+            self.shutdown()  # a new pool with the right size will be started when needed
+
+    @staticmethod
+    def _initialize_worker(generation: multiprocessing.Value):
+        global _worker_generation
+        _worker_generation = generation
+        # set priority of worker processes to below normal
+        if _psutil_imported:
+            if sys.platform == "win32":
+                psutil.Process().nice(psutil.BELOW_NORMAL_PRIORITY_CLASS)
+            else:
+                psutil.Process().nice(10)
+
+    @staticmethod
+    def _run_task(generation: int, measure: bool, test_function, task: Tuple) -> Any:
+        """
+        Run a task in a worker process unless it was cancelled.
+        :param measure: return the process id and the wall and CPU time of the task together with the result
+        :return: result of test_function, tuple (result, process id, wall time, CPU time) if measure is set or None if cancelled
+        """
+        if _worker_generation is not None and _worker_generation.value != generation:
+            return None
+        if not measure:
+            return test_function(*task)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        result = test_function(*task)
+        return result, os.getpid(), time.perf_counter() - wall, time.process_time() - cpu
+
+    @staticmethod
+    def _run_task_parts(parts: List[Tuple[Callable, Tuple]]) -> List[Any]:
+        """
+        Run a task that covers several tests (see compute_fleet()).
+        :param parts: list of tuples (test function, arguments)
+        :return: list with the result of each part
+        """
+        return [function(*args) for function, args in parts]
+
+    def start_pool(self):
+        """
+        Start the worker pool. The pool is started automatically when needed but starting it in advance saves time on the first compute() call.
+        The pool is used by all following calls and it is kept running until shutdown() is called.
+        """
+        if self.__pool is None and self.__cpu_cores > 1:
+            # 1 core is handling UI and the thread calling compute(), the rest is working on running the calculations
+            if self.__generation is None:
+                self.__generation = multiprocessing.Value("i", 0)
+            self.__pool_size = self.__cpu_cores - 1
+            self.__pool = multiprocessing.Pool(processes=self.__pool_size, initializer=ShieldTester._initialize_worker, initargs=(self.__generation,))
+
+    def shutdown(self):
+        """
+        Stop the worker pool. Use the ShieldTester as context manager to do this automatically.
+        Calls of the async methods that are still running or waiting are finished first.
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+        if self.__pool is not None:
+            self.__pool.close()
+            self.__pool.join()
+            self.__pool = None
+            self.__pool_size = 0
+
+    def __use_multiprocessing(self, workload: int) -> bool:
+        # don't use multiprocessing for a very small workload
+        return self.__cpu_cores > 1 and workload > ShieldTester.MP_MIN_WORKLOAD
+
+    def __get_chunk_size(self, number_of_combinations: int, workload: int) -> int:
+        """
+        Number of booster combinations of the first tasks. Medium workloads are split into smaller tasks to keep all workers busy.
+        :param number_of_combinations: number of booster combinations to split
+        :param workload: number of loadouts to test
+        """
+        loadouts_per_combination = max(1, workload // max(1, number_of_combinations))
+        chunk_size = max(1, min(ShieldTester.MP_CHUNK_SIZE, ShieldTester.INITIAL_TASK_WORKLOAD // loadouts_per_combination))
+        if not self.__use_multiprocessing(workload):
+            return chunk_size
+        tasks = (self.__cpu_cores - 1) * ShieldTester.MP_TASKS_PER_WORKER
+        return max(1, min(chunk_size, math.ceil(number_of_combinations / tasks)))
+
+    @property
+    def cache_directory(self) -> str:
+        """
+        Directory for cached data. Empty string if no data has been loaded.
+        """
+        return self.__cache_directory
+
+    @property
+    def result_cache(self) -> ResultCache:
+        """
+        Results of compute(). Set result_cache.persistent to keep results in the cache directory.
+        Hit and miss counters are in result_cache.statistics.
+        """
+        return self.__result_cache
 
     @property
     def ship_names(self):
@@ -126,6 +299,24 @@ class ShieldTester(object):
             logfile.write("\n\n\n")
             logfile.flush()
 
+    def write_log_record(self, log: ResultLog, test_case: TestCase, result: TestResult, include_service: str = "", export: Union[Dict[str, Any], str] = ""):
+        """
+        Add the test setup and the results to a structured log. The record is written by the background thread of the log.
+        :param log: ResultLog
+        :param test_case: TestCase for information about setup
+        :param result: TestResult for information about results
+        :param include_service: add an export to chosen service (e.g. an URL)
+        :param export: export of the result that was already generated (e.g. by get_exports()), used instead of include_service
+        """
+        record = {"time": time.strftime("%Y-%m-%d %H:%M:%S"),
+                  "test_case": test_case.get_log_record(),
+                  "result": result.get_log_record()}
+        if not export and include_service:
+            export = self.get_export(result.loadout, service=include_service)
+        if export:
+            record["export"] = export
+        log.write(record)
+
     def set_boosters_to_test(self, test_case: TestCase, short_list: bool = True):
         """
         Set booster variants to test.
@@ -134,7 +325,8 @@ class ShieldTester(object):
         :raises RuntimeError if test_case is missing
         """
         if test_case:
-            test_case.shield_booster_variants = copy.deepcopy(list(filter(lambda x: not (x.can_skip and short_list), self.__booster_variants)))
+            # booster variants are shared, they are never changed
+            test_case.shield_booster_variants = [booster for booster in self.__booster_variants if not (booster.can_skip and short_list)]
         else:
             raise RuntimeError("No test case provided")
 
@@ -153,7 +345,7 @@ class ShieldTester(object):
             if prismatics:
                 shield_generators += self.__shield_generators[ShieldGenerator.TYPE_PRISMATIC][module_class]
 
-            shield_generators = copy.deepcopy(shield_generators)
+            # shield generators are shared, loadouts only reference them
             for sg in shield_generators:
                 loadouts_to_test.append(LoadOut(sg, test_case.ship))
         return loadouts_to_test
@@ -197,34 +389,452 @@ class ShieldTester(object):
 
     def get_default_shield_generator_of_variant(self, sg_variant: ShieldGenerator) -> Optional[ShieldGenerator]:
         """
-        Provide a (engineered) shield generator to get a copy of the same type but as non-engineered version.
+        Provide a (engineered) shield generator to get the same type but as non-engineered version.
         :param sg_variant: the (engineered) shield generator
-        :return: ShieldGenerator or None
+        :return: ShieldGenerator (shared, don't change it) or None
         """
         if sg_variant:
-            return copy.deepcopy(self.__unengineered_shield_generators.get(sg_variant.symbol))
+            return self.__unengineered_shield_generators.get(sg_variant.symbol)
         return None
 
+    def get_booster_bonus_table(self, shield_booster_variants: List[ShieldBoosterVariant], number_of_boosters: int) -> BoosterBonusTable:
+        """
+        Get the bonuses of all combinations of the given booster variants. Tables are kept in memory and saved to the cache directory.
+        Saved tables are only used if they were created from the same data file. The least recently used tables are removed when the tables
+        need more than BOOSTER_BONUS_TABLES_MAX_BYTES in memory or BOOSTER_BONUS_TABLES_MAX_DISK_BYTES in the cache directory.
+        :param shield_booster_variants: booster variants (e.g. test_case.shield_booster_variants)
+        :param number_of_boosters: number of boosters per combination
+        :return: BoosterBonusTable
+        """
+        key = BoosterBonusTable.create_key(shield_booster_variants, number_of_boosters)
+        table = self.__booster_bonus_tables.get(key)
+        if table and table.data_hash == self.__data_hash:
+            self.__booster_bonus_tables.move_to_end(key)
+            return table
+
+        table = None
+        if self.__cache_directory:
+            table = BoosterBonusTable.load(self.__cache_directory, shield_booster_variants, number_of_boosters, self.__data_hash)
+        if not table:
+            table = BoosterBonusTable.create(shield_booster_variants, number_of_boosters, self.__data_hash)
+            if self.__cache_directory and table.nbytes <= ShieldTester.BOOSTER_BONUS_TABLES_MAX_DISK_BYTES:
+                try:
+                    table.save(self.__cache_directory)
+                except OSError as e:
+                    print(f"Could not save booster bonus table: {e}")
+                BoosterBonusTable.prune(self.__cache_directory, ShieldTester.BOOSTER_BONUS_TABLES_MAX_DISK_BYTES, keep=key)
+
+        self.__booster_bonus_tables[key] = table
+        self.__booster_bonus_tables.move_to_end(key)
+        # the new table is kept even if it's larger than the limit, it's used right away
+        size = sum(t.nbytes for t in self.__booster_bonus_tables.values())
+        while size > ShieldTester.BOOSTER_BONUS_TABLES_MAX_BYTES and len(self.__booster_bonus_tables) > 1:
+            _, old_table = self.__booster_bonus_tables.popitem(last=False)
+            size -= old_table.nbytes
+        return table
+
+    @staticmethod
+    def __count_steps(items_done: int, items_total: int) -> int:
+        # one step per MP_CHUNK_SIZE items, the last step is for the rest
+        if items_done >= items_total:
+            return math.ceil(items_total / ShieldTester.MP_CHUNK_SIZE)
+        return items_done // ShieldTester.MP_CHUNK_SIZE
+
+    def __report_progress(self, callback, progress_queue: Optional[queue.SimpleQueue], event: ProgressEvent, items_before: int = 0):
+        """
+        Put the event into progress_queue and call the callback with CALLBACK_PROGRESS. Without progress_queue, the callback is called with
+        CALLBACK_STEP for every MP_CHUNK_SIZE items that are done since items_before, independent of the size of the tasks.
+        """
+        if progress_queue is not None:
+            progress_queue.put(event)
+            if callback:
+                callback(ShieldTester.CALLBACK_PROGRESS)
+        elif callback:
+            for _ in range(ShieldTester.__count_steps(event.items_done, event.items_total) - ShieldTester.__count_steps(items_before, event.items_total)):
+                callback(ShieldTester.CALLBACK_STEP)
+
+    def __run_tasks(self, test_function, get_task: Callable[[int, int], Tuple], number_of_items: int, items_per_loadout: int,
+                    on_result: Callable[[int, Any], None], callback=None, progress_queue: queue.SimpleQueue = None,
+                    instrumentation: Instrumentation = None, deadline: float = 0, progress_base: ProgressEvent = None) -> Optional[int]:
+        """
+        Split the items (booster combinations) into tasks and call test_function for every task. Big workloads are run on the worker pool.
+        The size of the tasks is adjusted to their measured duration (see ChunkScheduler). Only a few tasks per worker are queued at a time,
+        so cancel() and the deadline stop the workers quickly.
+        Calls the callback with CALLBACK_PROGRESS for each finished task if progress_queue is set, otherwise with CALLBACK_STEP for every
+        MP_CHUNK_SIZE items, and with CALLBACK_CANCELLED when cancelled.
+        Results are handled in the calling thread.
+        :param test_function: function to call, has to be picklable
+        :param get_task: called with start and end of a range of items, returns the tuple of arguments for test_function
+        :param number_of_items: number of items to test
+        :param items_per_loadout: loadouts that are tested per item
+        :param on_result: called with the index of the task and the result of test_function, tasks are numbered in the order of their items
+        :param progress_queue: optional queue for a ProgressEvent after each task
+        :param instrumentation: optional Instrumentation for timings and counters
+        :param deadline: time.perf_counter() value after which no more tasks are started and unfinished tasks are dropped, no limit if 0.
+                         The first task of a test is always finished, so there is a result even if the deadline is too close for a single task
+        :param progress_base: progress of the earlier parts of the same test. Its items, loadouts and elapsed time are added to the progress events
+                              and its totals are used
+        :return: number of items that were tested or None if cancelled
+        """
+        instrumentation = instrumentation or Instrumentation.disabled()
+        measure = instrumentation.enabled
+        workload = number_of_items * items_per_loadout
+        use_multiprocessing = self.__use_multiprocessing(workload)
+        workers = self.__cpu_cores - 1 if use_multiprocessing else 1
+        target_time = ChunkScheduler.TARGET_TASK_TIME
+        if deadline:
+            # short tasks, so the deadline isn't missed by much
+            target_time = max(ShieldTester.MIN_TASK_TIME, min(target_time, (deadline - time.perf_counter()) / ShieldTester.TASKS_PER_TIME_BUDGET))
+        scheduler = ChunkScheduler(number_of_items, workers, self.__get_chunk_size(number_of_items, workload), ShieldTester.MP_CHUNK_SIZE, target_time)
+        start_time = time.perf_counter()
+        base = progress_base or ProgressEvent(items_total=number_of_items, loadouts_total=workload)
+
+        def cancelled() -> Optional[int]:
+            print("Cancelled")
+            if callback:
+                callback(ShieldTester.CALLBACK_CANCELLED)
+            return None
+
+        def expired() -> bool:
+            # progress_base has the items of the earlier parts of the same test
+            return deadline and base.items_done + scheduler.items_done > 0 and time.perf_counter() >= deadline
+
+        def task_done(task_index: int, chunk: Tuple[int, int], r: Any, worker: int, wall: float, cpu: float, active_workers: int):
+            scheduler.add_measurement(chunk[1] - chunk[0], wall)
+            instrumentation.add_task(task_index, worker, wall, cpu)
+            with instrumentation.phase(Instrumentation.PHASE_REDUCTION):
+                on_result(task_index, r)
+            self.__report_progress(callback, progress_queue,
+                                   ProgressEvent(base.items_done + scheduler.items_done, base.items_total,
+                                                 base.loadouts_done + scheduler.items_done * items_per_loadout, base.loadouts_total,
+                                                 base.elapsed + time.perf_counter() - start_time, active_workers, scheduler.chunk_size),
+                                   base.items_done + scheduler.items_done - (chunk[1] - chunk[0]))
+
+        if use_multiprocessing:
+            self.start_pool()
+            generation = self.__generation.value
+            max_tasks = workers * ShieldTester.MP_TASKS_IN_FLIGHT
+            finished = queue.SimpleQueue()  # (task index, chunk, result, error) of finished tasks
+            running = 0
+            task_index = 0
+
+            def get_callback(index: int, chunk: Tuple[int, int]):
+                return lambda r: finished.put((index, chunk, r, None))
+
+            def error_callback(e: BaseException):
+                finished.put((-1, None, None, e))
+
+            while True:
+                if self.__cancel:
+                    return cancelled()
+                if expired():
+                    # skip the tasks that are still queued, results of running tasks are dropped
+                    with self.__generation.get_lock():
+                        self.__generation.value += 1
+                    break
+                if running < max_tasks:
+                    with instrumentation.phase(Instrumentation.PHASE_DISPATCH):
+                        while running < max_tasks:
+                            chunk = scheduler.next_chunk()
+                            if chunk is None:
+                                break
+                            args = (generation, True, test_function, get_task(*chunk))
+                            if measure:
+                                instrumentation.chunks += 1
+                                instrumentation.bytes_sent += len(pickle.dumps((ShieldTester._run_task, args)))
+                            self.__pool.apply_async(ShieldTester._run_task, args=args, callback=get_callback(task_index, chunk),
+                                                    error_callback=error_callback)
+                            running += 1
+                            task_index += 1
+                if running == 0:
+                    break
+                try:
+                    with instrumentation.phase(Instrumentation.PHASE_EVALUATION):
+                        index, chunk, r, e = finished.get(timeout=ShieldTester.CANCEL_POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+                running -= 1
+                if e is not None:
+                    # skip the tasks that are still queued
+                    with self.__generation.get_lock():
+                        self.__generation.value += 1
+                    raise e
+                if r is None:
+                    # cancelled in the worker
+                    continue
+                r, worker, wall, cpu = r
+                task_done(index, chunk, r, worker, wall, cpu, min(workers, running + 1))
+        else:
+            pid = os.getpid()
+            task_index = 0
+            while True:
+                if self.__cancel:
+                    return cancelled()
+                if expired():
+                    break
+                chunk = scheduler.next_chunk()
+                if chunk is None:
+                    break
+                if measure:
+                    instrumentation.chunks += 1
+                wall = time.perf_counter()
+                cpu = time.process_time()
+                with instrumentation.phase(Instrumentation.PHASE_EVALUATION):
+                    r = test_function(*get_task(*chunk))
+                task_done(task_index, chunk, r, pid, time.perf_counter() - wall, time.process_time() - cpu, 1)
+                task_index += 1
+
+        if self.__cancel:
+            return cancelled()
+        return scheduler.items_done
+
+    @staticmethod
+    def get_preliminary_order(test_case: TestCase) -> List[LoadOut]:
+        """
+        Sort all loadouts by the stats get_preliminary_loadouts() uses: loadouts that survive first (lowest incoming dps first),
+        then loadouts that die (longest survival time first).
+        :param test_case: the TestCase
+        :return: new list with all loadouts of test_case, most promising first
+        """
+        survived = list()
+        died = list()
+        for loadout in test_case.loadout_list:
+            exp_res = 1 - loadout.shield_generator.explres
+            kin_res = 1 - loadout.shield_generator.kinres
+            therm_res = 1 - loadout.shield_generator.thermres
+            hp = loadout.shield_strength
+            regen_rate = loadout.shield_generator.regen * (1.0 - test_case.damage_effectiveness)
+
+            actual_dps = test_case.damage_effectiveness * (
+                    test_case.explosive_dps * exp_res +
+                    test_case.kinetic_dps * kin_res +
+                    test_case.thermal_dps * therm_res +
+                    test_case.absolute_dps) - regen_rate
+
+            if actual_dps > 0:
+                died.append(((hp + test_case.scb_hitpoints + test_case.guardian_hitpoints) / actual_dps, loadout))
+            else:
+                survived.append((actual_dps, loadout))
+        survived.sort(key=lambda tup: tup[0])
+        died.sort(key=lambda tup: tup[0], reverse=True)
+        return [t[1] for t in survived] + [t[1] for t in died]
+
+    @staticmethod
+    def get_booster_variant_order(test_case: TestCase) -> List[ShieldBoosterVariant]:
+        """
+        Sort the booster variants by their bonuses for the damage of the test case: hitpoint bonus plus the resistance bonuses weighted by the damage.
+        :param test_case: the TestCase
+        :return: new list with all booster variants of test_case, most promising first
+        """
+        total_dps = test_case.explosive_dps + test_case.kinetic_dps + test_case.thermal_dps + test_case.absolute_dps
+
+        def get_score(booster: ShieldBoosterVariant) -> float:
+            if total_dps <= 0:
+                return booster.shield_strength_bonus
+            return booster.shield_strength_bonus + (test_case.explosive_dps * booster.exp_res_bonus +
+                                                    test_case.kinetic_dps * booster.kin_res_bonus +
+                                                    test_case.thermal_dps * booster.therm_res_bonus) / total_dps
+
+        return sorted(test_case.shield_booster_variants, key=get_score, reverse=True)
+
+    @staticmethod
+    def get_preliminary_loadouts(test_case: TestCase, prelim: int) -> List[LoadOut]:
+        """
+        Choose the <prelim> best loadouts by comparing their stats without applying any boosters to them (see prelim in compute()).
+        :param test_case: the TestCase
+        :param prelim: number of loadouts to keep
+        :return: new list with the best loadouts
+        """
+        preliminary_list = list()
+        preliminary_list_survived = list()
+        best_survival_time = 0
+        lowest_dps = 10000
+
+        for loadout in test_case.loadout_list:
+            # can't use same function in LoadOut because of speed
+            exp_res = 1 - loadout.shield_generator.explres
+            kin_res = 1 - loadout.shield_generator.kinres
+            therm_res = 1 - loadout.shield_generator.thermres
+            hp = loadout.shield_strength
+            regen_rate = loadout.shield_generator.regen * (1.0 - test_case.damage_effectiveness)
+
+            actual_dps = test_case.damage_effectiveness * (
+                    test_case.explosive_dps * exp_res +
+                    test_case.kinetic_dps * kin_res +
+                    test_case.thermal_dps * therm_res +
+                    test_case.absolute_dps) - regen_rate
+
+            survival_time = (hp + test_case.scb_hitpoints + test_case.guardian_hitpoints) / actual_dps
+
+            if actual_dps > 0:
+                preliminary_list.append((survival_time, loadout))
+                if best_survival_time >= 0:
+                    # if another run set best_survival_time to a negative value, then the ship didn't die, therefore the other result is better
+                    if survival_time > best_survival_time:
+                        best_survival_time = survival_time
+            elif actual_dps < 0:
+                preliminary_list_survived.append((actual_dps, loadout))
+                if lowest_dps > actual_dps:
+                    best_survival_time = survival_time
+                    lowest_dps = actual_dps
+
+        # keep only the best loadouts
+        if len(preliminary_list_survived) > 0:
+            preliminary_list_survived.sort(key=lambda tup: tup[0])
+            return [t[1] for t in preliminary_list_survived[:prelim]]
+        else:
+            preliminary_list.sort(key=lambda tup: tup[0], reverse=True)
+            return [t[1] for t in preliminary_list[:prelim]]
+
+    @staticmethod
+    def __get_anytime_groups(number_of_loadouts: int) -> Iterable[Tuple[int, int]]:
+        """
+        Groups of shield generator variants that are tested one after another with a time budget.
+        :return: generator of tuples: (start, end) of the group
+        """
+        start = 0
+        size = ShieldTester.ANYTIME_FIRST_GROUP
+        while start < number_of_loadouts:
+            yield start, min(number_of_loadouts, start + size)
+            start += size
+            size *= 2
+
+    def __run_test(self, test_function, test_cases: List[TestCase], scenarios: bool, booster_combinations: CombinationRange,
+                   booster_bonus_table: BoosterBonusTable, test_args: Tuple, on_result: Callable[[int, Any], None], callback=None,
+                   progress_queue: queue.SimpleQueue = None, instrumentation: Instrumentation = None, deadline: float = 0,
+                   progress_base: ProgressEvent = None) -> Optional[int]:
+        """
+        Split the booster combinations into tasks and run them. The worker pool gets the test data through shared memory once
+        instead of with every task.
+        :param test_function: TestCase.test_case or a function with the same signature (TestCase.test_scenarios if scenarios is set)
+        :param test_cases: the TestCase or all scenarios
+        :param scenarios: whether test_function expects a list of TestCase
+        :param test_args: additional arguments for test_function
+        :param progress_queue: optional queue for progress events
+        :param instrumentation: optional Instrumentation for timings and counters
+        :param deadline: see __run_tasks()
+        :param progress_base: see __run_tasks()
+        :return: number of booster combinations that were tested or None if cancelled
+        """
+        number_of_combinations = len(booster_combinations)
+        items_per_loadout = len(test_cases[0].loadout_list) * len(test_cases)
+        workload = number_of_combinations * items_per_loadout
+        if not self.__use_multiprocessing(workload) or not SharedTestData.is_available():
+            test_case = test_cases if scenarios else test_cases[0]
+
+            def get_task(start: int, end: int) -> Tuple:
+                return (test_case, booster_combinations[start:end], booster_bonus_table.get_bonuses_slice(start, end)) + test_args
+
+            tested = self.__run_tasks(test_function, get_task, number_of_combinations, items_per_loadout, on_result, callback, progress_queue,
+                                      instrumentation, deadline, progress_base)
+        else:
+            with (instrumentation or Instrumentation.disabled()).phase(Instrumentation.PHASE_DISPATCH):
+                shared = SharedTestData.create(test_cases, booster_combinations, booster_bonus_table.bonuses, scenarios)
+
+            def get_shared_task(start: int, end: int) -> Tuple:
+                return (shared, start, end, test_function) + test_args
+
+            def on_shared_result(task_index: int, r: Union[TestResult, List[TestResult]]):
+                # workers only know indexes of loadouts and booster variants
+                for result in (r if isinstance(r, list) else [r]):
+                    shared.restore_result(result)
+                on_result(task_index, r)
+
+            try:
+                tested = self.__run_tasks(SharedTestData.run_task, get_shared_task, number_of_combinations, items_per_loadout, on_shared_result,
+                                          callback, progress_queue, instrumentation, deadline, progress_base)
+            finally:
+                shared.close()
+
+        if instrumentation and tested is not None:
+            instrumentation.combinations += tested
+            instrumentation.loadouts_evaluated += tested * items_per_loadout
+        return tested
+
     def compute(self, test_case: TestCase,
                 callback=None,
                 message_queue: queue.SimpleQueue = None,
                 console_output: bool = False,
-                prelim: int = 0) -> Optional[TestResult]:
+                prelim: int = 0,
+                engine: str = ENGINE_PYTHON,
+                remove_dominated: bool = True,
+                search: str = SEARCH_EXHAUSTIVE,
+                top_k: int = 0,
+                use_cache: bool = True,
+                instrumentation: Instrumentation = None,
+                progress_queue: queue.SimpleQueue = None,
+                time_budget: float = 0,
+                quick: bool = False,
+                result_grid: str = "") -> Union[TestResult, List[TestResult], None]:
         """
-        Compute best loadout. Best to call this in an extra thread. It might take a while to complete.
+        Compute best loadout. Best to call this in an extra thread (or use compute_async()). It might take a while to complete.
         If set, the callback will be called [<number of tests> / (test_case.loadout_list or prelim) / MP_CHUNK_SIZE] times (+2 if queue is set).
+        With progress_queue, it's called once per task instead. The size of the tasks is adjusted while the test is running,
+        a task takes about ChunkScheduler.TARGET_TASK_TIME seconds and tests up to MP_CHUNK_SIZE booster combinations.
         Callback function will be called with CALLBACK_MESSAGE if there is a new message and
                                               CALLBACK_STEP is used for each step
+                                              CALLBACK_PROGRESS instead of CALLBACK_STEP if progress_queue is set
         Calling cancel() will stop the execution of this method. Some callbacks might be called before that happens.
         :param test_case: settings of test case
         :param callback: optional callback using an int as argument
         :param console_output: whether you want output on the console or not
         :param message_queue: message queue containing some output messages
+        :param progress_queue: optional queue that receives a ProgressEvent (tested and total booster combinations and loadouts, loadouts per second,
+                               estimated remaining time and active workers) for each finished task
         :param prelim: If set to a positive integer, prelim limits the amount of shield generators to consider for further tests. They are chosen by comparing
                        their stats without applying any boosters to them. <prelim> of the best ones will be tested with all booster combinations.
-                       prelim of 5 will find the same best loadout in the vast majority of cases and 13 should find the same best loadout in all cases.
-                       Using this option will alter test_case.loadout_list
+                       This is a heuristic: prelim of 5 will find the same best loadout in the vast majority of cases but there is no guarantee.
+                       Use quick for a filter that doesn't change the result. Using this option will alter test_case.loadout_list
+        :param engine: ENGINE_PYTHON or ENGINE_NUMPY. The NumPy engine evaluates all loadouts and booster combinations of a chunk as arrays.
+                       Both engines return the same result.
+        :param remove_dominated: remove shield generator and booster variants that can't be part of the best loadout (see DominanceFilter).
+                                 This doesn't change the result. test_case is not altered. Ignored if top_k is set because dominated variants
+                                 can still be part of the other top_k results.
+        :param search: SEARCH_EXHAUSTIVE tests every booster combination with every loadout.
+                       SEARCH_BRANCH_AND_BOUND builds booster combinations step by step and skips those that can't beat the best result (see BranchAndBound).
+                       It runs on a single core, ignores engine and finds the same result. Its counters are in TestResult.search_statistics.
+        :param top_k: If set to a positive integer, return a list of the <top_k> best results (best first) instead of only the best result.
+                      Each worker keeps its own top_k results and they are merged afterwards, so this doesn't need additional tests.
+        :param use_cache: return the result of an earlier test with the same settings if available (see result_cache)
+        :param instrumentation: optional Instrumentation that records timings and counters of this call. It is attached to the returned
+                                results as TestResult.instrumentation
+        :param time_budget: If set to a positive number of seconds, return the best result found when the time is up instead of testing everything.
+                            The most promising shield generator variants (by the stats prelim uses) are tested first in groups of increasing size and
+                            the booster variants are ordered by their bonuses for the damage of the test case.
+                            TestResult.search_finished and TestResult.coverage tell whether everything was tested. The first task is always finished,
+                            so a result is returned even if the budget is shorter than a single task. If the search finishes in time,
+                            the result is as good as without a time budget, but another loadout may be returned if several are equally good.
+                            Results found with a time budget are not added to the cache.
+        :param quick: remove shield generator variants whose best possible result (best modifiers of all booster variants in every slot) can't reach
+                      the results already known from a few booster combinations (see BoundFilter). Unlike prelim, this doesn't change the result and
+                      test_case is not altered. The number of remaining variants is in TestResult.bound_filter_statistics.
+        :param result_grid: If set, write survival time, incoming dps and hitpoints of every tested loadout to this file for queries afterwards
+                            (see ResultGrid). The grid has 12 bytes per loadout. All shield generator and booster variants of test_case are tested,
+                            so remove_dominated, quick and use_cache are ignored. Requires SEARCH_EXHAUSTIVE without time_budget.
+        :return: best TestResult, list of TestResult if top_k is set or None if cancelled
+        :raises RuntimeError if the engine or search is unknown, NumPy is not installed, top_k or time_budget are used with SEARCH_BRANCH_AND_BOUND
+                             or result_grid is used with SEARCH_BRANCH_AND_BOUND or time_budget
         """
+        if search not in (ShieldTester.SEARCH_EXHAUSTIVE, ShieldTester.SEARCH_BRANCH_AND_BOUND):
+            raise RuntimeError(f"Unknown search: {search}")
+        if top_k > 0 and search == ShieldTester.SEARCH_BRANCH_AND_BOUND:
+            raise RuntimeError("top_k is not supported by branch and bound")
+        if time_budget > 0 and search == ShieldTester.SEARCH_BRANCH_AND_BOUND:
+            raise RuntimeError("time_budget is not supported by branch and bound")
+        if result_grid and (search != ShieldTester.SEARCH_EXHAUSTIVE or time_budget > 0):
+            raise RuntimeError("result_grid requires an exhaustive search without time_budget")
+        if result_grid:
+            # every variant has to be in the grid and a cached result wouldn't write it
+            remove_dominated = quick = use_cache = False
+        if engine == ShieldTester.ENGINE_NUMPY:
+            if not VectorizedEngine.is_available():
+                raise RuntimeError("NumPy is required for the NumPy engine")
+            test_function = VectorizedEngine.test_case_top_k if top_k > 0 else VectorizedEngine.test_case
+        elif engine == ShieldTester.ENGINE_PYTHON:
+            test_function = TestCase.test_case_top_k if top_k > 0 else TestCase.test_case
+        else:
+            raise RuntimeError(f"Unknown engine: {engine}")
+
         self.__cancel = False
         if not test_case or not test_case.shield_booster_variants or not test_case.loadout_list:
             # nothing to test
@@ -237,12 +847,21 @@ class ShieldTester(object):
 
         self.__runtime = time.time()
         output = list()
+        instrumentation = instrumentation or Instrumentation.disabled()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        deadline = start_wall + time_budget if time_budget > 0 else 0
+
+        def attach_instrumentation(r: Union[TestResult, List[TestResult]]):
+            instrumentation.add_phase_time(Instrumentation.PHASE_TOTAL, time.perf_counter() - start_wall, time.process_time() - start_cpu)
+            for result in (r if isinstance(r, list) else [r]):
+                result.instrumentation = instrumentation if instrumentation.enabled else None
+            if console_output and instrumentation.enabled:
+                print(instrumentation.get_output_string())
 
         # ensure booster amount is valid
         booster_amount = test_case.number_of_boosters_to_test
         booster_amount = max(0, min(test_case.ship.utility_slots, booster_amount))
-        # use built in itertools and assume booster ids are starting at 1 and that there are no gaps
-        booster_combinations = list(itertools.combinations_with_replacement(range(0, len(test_case.shield_booster_variants)), booster_amount))
 
         if prelim > 0 and prelim != len(test_case.loadout_list):
             output.append("--------- QUICK TEST RUN ---------")
@@ -251,51 +870,66 @@ class ShieldTester(object):
 
         # preliminary filtering
         if prelim > 0 and prelim != len(test_case.loadout_list):
-            preliminary_list = list()
-            preliminary_list_survived = list()
-            best_survival_time = 0
-            lowest_dps = 10000
-
-            for loadout in test_case.loadout_list:
-                # can't use same function in LoadOut because of speed
-                exp_res = 1 - loadout.shield_generator.explres
-                kin_res = 1 - loadout.shield_generator.kinres
-                therm_res = 1 - loadout.shield_generator.thermres
-                hp = loadout.shield_strength
-                regen_rate = loadout.shield_generator.regen * (1.0 - test_case.damage_effectiveness)
-
-                actual_dps = test_case.damage_effectiveness * (
-                        test_case.explosive_dps * exp_res +
-                        test_case.kinetic_dps * kin_res +
-                        test_case.thermal_dps * therm_res +
-                        test_case.absolute_dps) - regen_rate
-
-                survival_time = (hp + test_case.scb_hitpoints + test_case.guardian_hitpoints) / actual_dps
-
-                if actual_dps > 0:
-                    preliminary_list.append((survival_time, loadout))
-                    if best_survival_time >= 0:
-                        # if another run set best_survival_time to a negative value, then the ship didn't die, therefore the other result is better
-                        if survival_time > best_survival_time:
-                            best_survival_time = survival_time
-                elif actual_dps < 0:
-                    preliminary_list_survived.append((actual_dps, loadout))
-                    if lowest_dps > actual_dps:
-                        best_survival_time = survival_time
-                        lowest_dps = actual_dps
+            with instrumentation.phase(Instrumentation.PHASE_PRELIM):
+                test_case.loadout_list = self.get_preliminary_loadouts(test_case, prelim)
 
-            # set only the best loadouts to be tested
-            if len(preliminary_list_survived) > 0:
-                preliminary_list_survived.sort(key=lambda tup: tup[0])
-                test_case.loadout_list = [t[1] for t in preliminary_list_survived[:prelim]]
-            else:
-                preliminary_list.sort(key=lambda tup: tup[0], reverse=True)
-                test_case.loadout_list = [t[1] for t in preliminary_list[:prelim]]
+        cache_key = ""
+        if use_cache:
+            # engine and remove_dominated don't change the result
+            cache_key = test_case.get_fingerprint(prelim, search, top_k)
+            cached_result = self.__result_cache.get(cache_key, self.__data_hash)
+            if cached_result is not None:
+                output.append("Result taken from cache")
+                output.append("")
+                if message_queue:
+                    message_queue.put(Utility.format_output_string(output))
+                    if callback:
+                        callback(ShieldTester.CALLBACK_MESSAGE)
+                if console_output:
+                    print(Utility.format_output_string(output))
+                    print((cached_result[0] if top_k > 0 else cached_result).get_output_string(test_case.guardian_hitpoints))
+                attach_instrumentation(cached_result)
+                return cached_result
+
+        if remove_dominated and top_k <= 0:
+            # work on a copy, the filter depends on the damage profile and shouldn't change the setup
+            test_case = copy.copy(test_case)
+            number_of_loadouts = len(test_case.loadout_list)
+            number_of_booster_variants = len(test_case.shield_booster_variants)
+            with instrumentation.phase(Instrumentation.PHASE_DOMINANCE):
+                test_case.loadout_list = DominanceFilter.filter_loadouts(test_case, test_case.loadout_list, test_case.shield_booster_variants)
+                test_case.shield_booster_variants = DominanceFilter.filter_booster_variants(test_case, test_case.shield_booster_variants,
+                                                                                            test_case.loadout_list)
+            output.append(("Dominated Shield Generator Variants: ", f"[{number_of_loadouts - len(test_case.loadout_list)}] removed"))
+            output.append(("Dominated Shield Booster Variants: ", f"[{number_of_booster_variants - len(test_case.shield_booster_variants)}] removed"))
+
+        bound_filter_statistics = None
+        if quick:
+            test_case = copy.copy(test_case)
+            number_of_loadouts = len(test_case.loadout_list)
+            with instrumentation.phase(Instrumentation.PHASE_BOUND_FILTER):
+                test_case.loadout_list = BoundFilter.filter_loadouts(test_case, test_case.loadout_list, test_case.shield_booster_variants, booster_amount,
+                                                                     top_k)
+            bound_filter_statistics = {"shield_generator_variants": number_of_loadouts, "kept": len(test_case.loadout_list)}
+            output.append(("Shield Generator Variants after bound filter: ", f"[{len(test_case.loadout_list)}] of [{number_of_loadouts}]"))
+
+        if deadline:
+            # most promising variants first
+            test_case = copy.copy(test_case)
+            test_case.loadout_list = self.get_preliminary_order(test_case)
+            test_case.shield_booster_variants = self.get_booster_variant_order(test_case)
+
+        number_of_combinations = BoosterBonusTable.count_combinations(len(test_case.shield_booster_variants), booster_amount)
+        if search == ShieldTester.SEARCH_EXHAUSTIVE:
+            # booster ids are indexes of test_case.shield_booster_variants, bonuses are precalculated (and cached) for all combinations
+            with instrumentation.phase(Instrumentation.PHASE_COMBINATIONS):
+                booster_bonus_table = self.get_booster_bonus_table(test_case.shield_booster_variants, booster_amount)
+                booster_combinations = booster_bonus_table.combinations
 
         output.append(("Shield Booster Count: ", f"[{test_case.number_of_boosters_to_test}]"))
         output.append(("Shield Generator Variants: ", f"[{len(test_case.loadout_list)}]"))
-        output.append(("Shield Booster Variants: ", f"[{len(booster_combinations)}]"))
-        output.append(("Shield loadouts to be tested: ", f"[{len(booster_combinations) * len(test_case.loadout_list):n}]"))
+        output.append(("Shield Booster Variants: ", f"[{number_of_combinations}]"))
+        output.append(("Shield loadouts to be tested: ", f"[{number_of_combinations * len(test_case.loadout_list):n}]"))
         output.append("Running calculations. Please wait...")
         output.append("")
         if message_queue:
@@ -307,78 +941,586 @@ class ShieldTester(object):
         output = list()
 
         best_result = TestResult(survival_time=0)
+        rankings = dict()  # type: Dict[Any, List[TestResult]] # key: chunk index (or group and chunk index), only used with top_k
+        test_args = (top_k,) if top_k > 0 else ()
+        coverage = 1.0
+        if result_grid:
+            test_args = (result_grid, ResultGrid.create(result_grid, test_case, booster_amount), test_function) + test_args
+            test_function = ResultGrid.test_case
 
-        def apply_async_callback(r: TestResult):
+        def on_result(chunk_index: Any, r: Union[TestResult, List[TestResult]]):
             nonlocal best_result
-            if best_result.survival_time < 0:
-                # ship didn't die
-                if best_result.incoming_dps > r.incoming_dps or (math.isclose(best_result.incoming_dps, r.incoming_dps, rel_tol=1e-8)
-                                                                 and best_result.total_hitpoints < r.total_hitpoints):
-                    best_result = r
-            else:
-                if r.survival_time < 0:
-                    best_result = r
-                elif r.survival_time > best_result.survival_time:
-                    best_result = r
+            if top_k > 0:
+                rankings[chunk_index] = r
+            elif r.is_better_than(best_result):
+                best_result = r
+
+        if search == ShieldTester.SEARCH_BRANCH_AND_BOUND:
+            with instrumentation.phase(Instrumentation.PHASE_SEARCH):
+                branch_and_bound = BranchAndBound(test_case, booster_amount)
+                best_result = branch_and_bound.search()
+            instrumentation.combinations += branch_and_bound.leaves_evaluated
+            instrumentation.loadouts_evaluated += branch_and_bound.loadouts_evaluated
+            self.__report_progress(callback, progress_queue,
+                                   ProgressEvent(number_of_combinations, number_of_combinations, branch_and_bound.loadouts_evaluated,
+                                                 branch_and_bound.loadouts_evaluated, time.perf_counter() - start_wall, 1))
+        elif deadline:
+            # test groups of shield generator variants until the time is up
+            number_of_loadouts = len(test_case.loadout_list)
+            groups = list(self.__get_anytime_groups(number_of_loadouts))
+            loadouts_tested = 0
+            for group_index, (start, end) in enumerate(groups):
+                group_test_case = copy.copy(test_case)
+                group_test_case.loadout_list = test_case.loadout_list[start:end]
+                progress_base = ProgressEvent(group_index * number_of_combinations, len(groups) * number_of_combinations, loadouts_tested,
+                                              number_of_combinations * number_of_loadouts, time.perf_counter() - start_wall)
+                tested = self.__run_test(test_function, [group_test_case], False, booster_combinations, booster_bonus_table, test_args,
+                                         lambda chunk_index, r, g=group_index: on_result((g, chunk_index), r), callback, progress_queue,
+                                         instrumentation, deadline, progress_base)
+                if tested is None:
+                    return None
+                loadouts_tested += tested * (end - start)
+                if tested < number_of_combinations:
+                    break
+            coverage = loadouts_tested / (number_of_combinations * number_of_loadouts) if number_of_combinations * number_of_loadouts > 0 else 1.0
+        else:
+            if self.__run_test(test_function, [test_case], False, booster_combinations, booster_bonus_table, test_args, on_result, callback,
+                               progress_queue, instrumentation) is None:
+                return None
+            if result_grid:
+                ResultGrid.set_complete(result_grid)
+
+        ranking = None
+        if top_k > 0:
+            with instrumentation.phase(Instrumentation.PHASE_REDUCTION):
+                ranking = TestResult.merge_rankings([rankings[i] for i in sorted(rankings.keys())], top_k)
+            best_result = ranking[0] if ranking else best_result
+        for result in (ranking if top_k > 0 else [best_result]):
+            result.search_finished = coverage >= 1.0
+            result.coverage = coverage
+            result.bound_filter_statistics = bound_filter_statistics
+
+        output.append("Calculations took {:.2f} seconds".format(time.time() - self.__runtime))
+        if coverage < 1.0:
+            output.append(("Time budget ran out, loadouts tested: ", f"[{coverage * 100:.1f} %]"))
+        if best_result.search_statistics:
+            output.append(("Search nodes visited: ", f"[{best_result.search_statistics['nodes_visited']:n}]"))
+            output.append(("Search nodes pruned: ", f"[{best_result.search_statistics['nodes_pruned']:n}]"))
+            output.append(("Shield loadouts tested: ", f"[{best_result.search_statistics['loadouts_evaluated']:n}]"))
+        output.append("")
+        if message_queue:
+            message_queue.put(Utility.format_output_string(output))
             if callback:
-                callback(ShieldTester.CALLBACK_STEP)
+                callback(ShieldTester.CALLBACK_MESSAGE)
+        if console_output:
+            print(Utility.format_output_string(output))
+            print(best_result.get_output_string(test_case.guardian_hitpoints))
 
-        def chunks(l, n):
-            for j in range(0, len(l), n):
-                yield l[j:j + n]
-
-        if self.__cpu_cores > 1 and (len(booster_combinations) * len(test_case.loadout_list)) > ShieldTester.MP_CHUNK_SIZE * 5:
-            # 1 core is handling UI and this thread, the rest is working on running the calculations
-            # and don't use multiprocessing for a very small workload
-            with multiprocessing.Pool(processes=self.__cpu_cores - 1) as pool:
-                self.__pool = pool
-                for chunk in chunks(booster_combinations, ShieldTester.MP_CHUNK_SIZE):
-                    if self.__cancel:
-                        print("Cancelled")
-                        self.__pool = None
-                        if callback:
-                            callback(ShieldTester.CALLBACK_CANCELLED)
-                        return None
-                    pool.apply_async(TestCase.test_case, args=(test_case, chunk), callback=apply_async_callback)
-
-                # set priority of child processes to below normal
-                if _psutil_imported:
-                    parent = psutil.Process()
-                    for child in parent.children():
-                        if sys.platform == "win32":
-                            child.nice(psutil.BELOW_NORMAL_PRIORITY_CLASS)
-                        else:
-                            child.nice(10)
-                pool.close()
-                pool.join()
-                self.__pool = None
+        if use_cache and not deadline:
+            self.__result_cache.put(cache_key, self.__data_hash, ranking if top_k > 0 else best_result)
+        attach_instrumentation(ranking if top_k > 0 else best_result)
+        if top_k > 0:
+            return ranking
+        return best_result
+
+    def compute_scenarios(self, test_case: TestCase,
+                          scenarios: List[Dict[str, float]],
+                          callback=None,
+                          message_queue: queue.SimpleQueue = None,
+                          console_output: bool = False,
+                          engine: str = ENGINE_PYTHON,
+                          remove_dominated: bool = True,
+                          instrumentation: Instrumentation = None,
+                          progress_queue: queue.SimpleQueue = None) -> Optional[List[TestResult]]:
+        """
+        Compute the best loadout for several scenarios (e.g. different threats) of the same ship, shield generator class and booster setup.
+        All scenarios are tested in a single pass over all loadouts and booster combinations, which is much faster than calling compute() for each scenario.
+        Callback, message_queue, progress_queue and cancel() work like in compute().
+        :param test_case: settings of test case. Damage and hitpoint settings are used for parameters that are missing in a scenario.
+        :param scenarios: list of dictionaries, keys are TestCase.SCENARIO_PARAMETERS (e.g. {"kinetic_dps": 100, "damage_effectiveness": 0.5})
+        :param callback: optional callback using an int as argument
+        :param message_queue: message queue containing some output messages
+        :param console_output: whether you want output on the console or not
+        :param engine: ENGINE_PYTHON or ENGINE_NUMPY
+        :param remove_dominated: remove variants that can't be part of the best loadout in any of the scenarios (see DominanceFilter)
+        :param instrumentation: optional Instrumentation, see compute(). It is attached to all results
+        :param progress_queue: optional queue for a ProgressEvent after each task, see compute()
+        :return: list with the best TestResult for each scenario (same order as scenarios) or None if cancelled
+        :raises RuntimeError if a scenario parameter or the engine is unknown, NumPy is not installed or there is nothing to test
+        """
+        if engine == ShieldTester.ENGINE_NUMPY:
+            if not VectorizedEngine.is_available():
+                raise RuntimeError("NumPy is required for the NumPy engine")
+            test_function = VectorizedEngine.test_scenarios
+        elif engine == ShieldTester.ENGINE_PYTHON:
+            test_function = TestCase.test_scenarios
         else:
-            for chunk in chunks(booster_combinations, ShieldTester.MP_CHUNK_SIZE):
-                if self.__cancel:
-                    print("Cancelled")
-                    if callback:
-                        callback(ShieldTester.CALLBACK_CANCELLED)
-                    return None
-                result = TestCase.test_case(test_case, chunk)
-                apply_async_callback(result)  # can use the same function here as mp.Pool would
+            raise RuntimeError(f"Unknown engine: {engine}")
 
-        if self.__cancel:
-            print("Cancelled")
+        self.__cancel = False
+        if not test_case or not test_case.shield_booster_variants or not test_case.loadout_list or not scenarios:
+            raise RuntimeError("Can't test nothing")
+
+        scenario_test_cases = [test_case.create_scenario(parameters) for parameters in scenarios]
+        self.__runtime = time.time()
+        output = list()
+        output.append("---------- SCENARIO TEST RUN ----------")
+        instrumentation = instrumentation or Instrumentation.disabled()
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+
+        base_test_case = copy.copy(test_case)
+        if remove_dominated:
+            with instrumentation.phase(Instrumentation.PHASE_DOMINANCE):
+                base_test_case.loadout_list = DominanceFilter.filter_loadouts(scenario_test_cases, test_case.loadout_list, test_case.shield_booster_variants)
+                base_test_case.shield_booster_variants = DominanceFilter.filter_booster_variants(scenario_test_cases, test_case.shield_booster_variants,
+                                                                                                 base_test_case.loadout_list)
+            output.append(("Dominated Shield Generator Variants: ", f"[{len(test_case.loadout_list) - len(base_test_case.loadout_list)}] removed"))
+            output.append(("Dominated Shield Booster Variants: ",
+                           f"[{len(test_case.shield_booster_variants) - len(base_test_case.shield_booster_variants)}] removed"))
+        # scenarios share the filtered loadouts and booster variants
+        scenario_test_cases = [base_test_case.create_scenario(parameters) for parameters in scenarios]
+
+        booster_amount = max(0, min(test_case.ship.utility_slots, test_case.number_of_boosters_to_test))
+        with instrumentation.phase(Instrumentation.PHASE_COMBINATIONS):
+            booster_bonus_table = self.get_booster_bonus_table(base_test_case.shield_booster_variants, booster_amount)
+            booster_combinations = booster_bonus_table.combinations
+
+        output.append(("Scenarios: ", f"[{len(scenarios)}]"))
+        output.append(("Shield Booster Count: ", f"[{test_case.number_of_boosters_to_test}]"))
+        output.append(("Shield Generator Variants: ", f"[{len(base_test_case.loadout_list)}]"))
+        output.append(("Shield Booster Variants: ", f"[{len(booster_combinations)}]"))
+        output.append(("Shield loadouts to be tested: ", f"[{len(booster_combinations) * len(base_test_case.loadout_list):n}]"))
+        output.append("Running calculations. Please wait...")
+        output.append("")
+        if message_queue:
+            message_queue.put(Utility.format_output_string(output))
             if callback:
-                callback(ShieldTester.CALLBACK_CANCELLED)
+                callback(ShieldTester.CALLBACK_MESSAGE)
+        if console_output:
+            print(Utility.format_output_string(output))
+        output = list()
+
+        best_results = [TestResult(survival_time=0) for _ in scenarios]
+
+        def on_result(_: int, results: List[TestResult]):
+            for i, r in enumerate(results):
+                if r.is_better_than(best_results[i]):
+                    best_results[i] = r
+
+        if self.__run_test(test_function, scenario_test_cases, True, booster_combinations, booster_bonus_table, (), on_result, callback,
+                           progress_queue, instrumentation) is None:
             return None
+        instrumentation.add_phase_time(Instrumentation.PHASE_TOTAL, time.perf_counter() - start_wall, time.process_time() - start_cpu)
+        if instrumentation.enabled:
+            for result in best_results:
+                result.instrumentation = instrumentation
 
         output.append("Calculations took {:.2f} seconds".format(time.time() - self.__runtime))
         output.append("")
         if message_queue:
-            message_queue.put("\n".join(output))
+            message_queue.put(Utility.format_output_string(output))
             if callback:
                 callback(ShieldTester.CALLBACK_MESSAGE)
         if console_output:
-            print("\n".join(output))
-            print(best_result.get_output_string(test_case.guardian_hitpoints))
+            print(Utility.format_output_string(output))
+            for scenario, result in zip(scenario_test_cases, best_results):
+                print(scenario.get_output_string())
+                print(result.get_output_string(scenario.guardian_hitpoints))
+            if instrumentation.enabled:
+                print(instrumentation.get_output_string())
+        return best_results
 
-        return best_result
+    def compute_hull_masses(self, test_case: TestCase,
+                            callback=None,
+                            message_queue: queue.SimpleQueue = None,
+                            console_output: bool = False,
+                            engine: str = ENGINE_PYTHON,
+                            remove_dominated: bool = True,
+                            progress_queue: queue.SimpleQueue = None) -> Optional[HullMassResult]:
+        """
+        Compute the best loadout for each hull mass in test_case.hull_masses (e.g. with cargo, fuel and armour), see TestCase.set_hull_mass_range().
+        Only the shield strength depends on the hull mass. It's calculated for all shield generator variants and masses at once
+        (see LoadOut.calculate_shield_strengths) and all masses are tested in a single pass over all loadouts and booster combinations.
+        The result for each mass is the same as compute() finds for a copy of the ship with that hull mass and the same shield generator variants.
+        Shield generators don't work above their maximum mass, the result is TestResult(survival_time=0) for masses that are too high for all of them.
+        Callback, message_queue, progress_queue and cancel() work like in compute().
+        :param test_case: settings of test case, uses ship.hull_mass if hull_masses is not set
+        :param callback: optional callback using an int as argument
+        :param message_queue: message queue containing some output messages
+        :param console_output: whether you want output on the console or not
+        :param engine: ENGINE_PYTHON or ENGINE_NUMPY
+        :param remove_dominated: remove variants that can't be part of the best loadout at any of the hull masses (see DominanceFilter)
+        :param progress_queue: optional queue for a ProgressEvent after each task, see compute()
+        :return: HullMassResult with the best TestResult for each hull mass (in ascending order) and the masses where the winner changes
+                 or None if cancelled
+        :raises RuntimeError if the engine is unknown, NumPy is not installed or there is nothing to test
+        """
+        if engine == ShieldTester.ENGINE_NUMPY:
+            if not VectorizedEngine.is_available():
+                raise RuntimeError("NumPy is required for the NumPy engine")
+            test_function = VectorizedEngine.test_hull_masses
+        elif engine == ShieldTester.ENGINE_PYTHON:
+            test_function = TestCase.test_hull_masses
+        else:
+            raise RuntimeError(f"Unknown engine: {engine}")
+
+        self.__cancel = False
+        if not test_case or not test_case.shield_booster_variants or not test_case.loadout_list:
+            raise RuntimeError("Can't test nothing")
+
+        self.__runtime = time.time()
+        hull_masses = sorted(set(test_case.hull_masses or [test_case.ship.hull_mass]))
+        shield_strengths = LoadOut.calculate_shield_strengths(test_case.loadout_list, hull_masses)
+        output = list()
+        output.append("---------- HULL MASS TEST RUN ----------")
+
+        base_test_case = copy.copy(test_case)
+        if remove_dominated:
+            base_test_case.loadout_list = DominanceFilter.filter_loadouts(test_case, test_case.loadout_list, test_case.shield_booster_variants,
+                                                                          shield_strengths)
+            base_test_case.shield_booster_variants = DominanceFilter.filter_booster_variants(test_case, test_case.shield_booster_variants,
+                                                                                             base_test_case.loadout_list)
+            output.append(("Dominated Shield Generator Variants: ", f"[{len(test_case.loadout_list) - len(base_test_case.loadout_list)}] removed"))
+            output.append(("Dominated Shield Booster Variants: ",
+                           f"[{len(test_case.shield_booster_variants) - len(base_test_case.shield_booster_variants)}] removed"))
+            kept = set(id(loadout) for loadout in base_test_case.loadout_list)
+            shield_strengths = [[strength for loadout, strength in zip(test_case.loadout_list, strengths) if id(loadout) in kept]
+                                for strengths in shield_strengths]
+
+        booster_amount = max(0, min(test_case.ship.utility_slots, test_case.number_of_boosters_to_test))
+        booster_bonus_table = self.get_booster_bonus_table(base_test_case.shield_booster_variants, booster_amount)
+        booster_combinations = booster_bonus_table.combinations
+
+        output.append(("Hull masses: ", f"[{len(hull_masses)}] from [{hull_masses[0]:n}] to [{hull_masses[-1]:n}]"))
+        output.append(("Shield Booster Count: ", f"[{test_case.number_of_boosters_to_test}]"))
+        output.append(("Shield Generator Variants: ", f"[{len(base_test_case.loadout_list)}]"))
+        output.append(("Shield Booster Variants: ", f"[{len(booster_combinations)}]"))
+        output.append(("Shield loadouts to be tested: ", f"[{len(booster_combinations) * len(base_test_case.loadout_list) * len(hull_masses):n}]"))
+        output.append("Running calculations. Please wait...")
+        output.append("")
+        if message_queue:
+            message_queue.put(Utility.format_output_string(output))
+            if callback:
+                callback(ShieldTester.CALLBACK_MESSAGE)
+        if console_output:
+            print(Utility.format_output_string(output))
+
+        task_results = dict()  # type: Dict[int, List[TestResult]] # key: task index
+
+        def on_result(task_index: int, results: List[TestResult]):
+            task_results[task_index] = results
+
+        if self.__run_test(test_function, [base_test_case], False, booster_combinations, booster_bonus_table, (shield_strengths,), on_result, callback,
+                           progress_queue) is None:
+            return None
+
+        # combine in the order of the booster combinations, so equally good results are chosen like in compute()
+        best_results = [TestResult(survival_time=0) for _ in hull_masses]
+        for task_index in sorted(task_results.keys()):
+            for i, r in enumerate(task_results[task_index]):
+                if r.is_better_than(best_results[i]):
+                    best_results[i] = r
+        loadout_indexes = {id(loadout.shield_generator): i for i, loadout in enumerate(base_test_case.loadout_list)}
+        for hull_mass, strengths, result in zip(hull_masses, shield_strengths, best_results):
+            if result.loadout is None:
+                continue
+            # the ship is shared, the result gets a copy with its hull mass
+            result.loadout.ship = result.loadout.ship.copy()
+            result.loadout.ship.hull_mass = hull_mass
+            result.loadout.shield_strength = strengths[loadout_indexes[id(result.loadout.shield_generator)]]
+        hull_mass_result = HullMassResult(hull_masses, best_results)
+
+        output = list()
+        output.append("Calculations took {:.2f} seconds".format(time.time() - self.__runtime))
+        output.append("")
+        if message_queue:
+            message_queue.put(Utility.format_output_string(output))
+            if callback:
+                callback(ShieldTester.CALLBACK_MESSAGE)
+        if console_output:
+            print(Utility.format_output_string(output))
+            print(hull_mass_result.get_output_string(test_case.guardian_hitpoints))
+        return hull_mass_result
+
+    def sweep(self, test_case: TestCase,
+              axes: Union[Dict[str, Sequence[float]], Sequence[Tuple[str, Sequence[float]]]],
+              adaptive: bool = False,
+              callback=None,
+              console_output: bool = False,
+              engine: str = ENGINE_PYTHON,
+              remove_dominated: bool = True) -> Optional[SweepResult]:
+        """
+        Compute the best loadout for every cell of a grid of damage settings (e.g. damage mix and damage effectiveness).
+        Cells are tested in batches of SWEEP_BATCH_SIZE with compute_scenarios(), so loadouts and booster bonuses are calculated once per batch.
+        If adaptive is set, only the corners of the grid are tested at first. Areas whose corners have the same winner are filled with that winner
+        (its survival time is calculated for every cell), other areas are split in half and their corners are tested, until every
+        cell is a tested corner or inside an area with the same winner at all corners. SweepResult.evaluated shows the tested cells.
+        Areas with the same winner don't have to be convex (e.g. regeneration can change whether the ship dies), so a filled cell can have
+        a different winner if it were tested. Without adaptive, every cell is tested.
+        Callback and cancel() work like in compute().
+        :param test_case: settings of test case. Parameters that are not an axis are taken from it
+        :param axes: dictionary or list of tuples (parameter, values), parameters are TestCase.SCENARIO_PARAMETERS
+        :param adaptive: only test the cells that are needed to find the areas with the same winner. Winners inside an area are assumed and not tested,
+                         which is faster for big grids but not exact
+        :param callback: optional callback using an int as argument
+        :param console_output: whether you want output on the console or not
+        :param engine: ENGINE_PYTHON or ENGINE_NUMPY
+        :param remove_dominated: see compute_scenarios()
+        :return: SweepResult or None if cancelled
+        :raises RuntimeError if a parameter is unknown, an axis has no values or there is nothing to test
+        """
+        axes = list(axes.items()) if isinstance(axes, dict) else list(axes)
+        for name, values in axes:
+            if name not in TestCase.SCENARIO_PARAMETERS:
+                raise RuntimeError(f"Unknown scenario parameter: {name}")
+            if len(values) == 0:
+                raise RuntimeError(f"No values for {name}")
+        if not test_case or not test_case.shield_booster_variants or not test_case.loadout_list:
+            raise RuntimeError("Can't test nothing")
+
+        runtime = time.time()
+        booster_amount = max(0, min(test_case.ship.utility_slots, test_case.number_of_boosters_to_test))
+        result = SweepResult(axes, test_case.loadout_list, test_case.shield_booster_variants, booster_amount)
+        generator_indexes = {id(loadout.shield_generator): i for i, loadout in enumerate(test_case.loadout_list)}
+        booster_indexes = {id(booster): i for i, booster in enumerate(test_case.shield_booster_variants)}
+
+        def evaluate(indexes: List[int]) -> bool:
+            for j in range(0, len(indexes), ShieldTester.SWEEP_BATCH_SIZE):
+                batch = indexes[j:j + ShieldTester.SWEEP_BATCH_SIZE]
+                results = self.compute_scenarios(test_case, [result.get_parameters(index) for index in batch], callback=callback, engine=engine,
+                                                 remove_dominated=remove_dominated)
+                if results is None:
+                    return False
+                for index, r in zip(batch, results):
+                    boosters = sorted(booster_indexes[id(booster)] for booster in r.loadout.boosters)
+                    result.set_winner(index, generator_indexes[id(r.loadout.shield_generator)], boosters, r.survival_time, r.incoming_dps, True)
+            return True
+
+        def fill(indexes: List[int], winner: Tuple[int, Tuple[int, ...]]):
+            # survival time of the winner of the surrounding cells
+            generator, boosters = winner
+            winner_test_case = copy.copy(test_case)
+            winner_test_case.loadout_list = [test_case.loadout_list[generator]]
+            winner_test_case.shield_booster_variants = [test_case.shield_booster_variants[x] for x in boosters]
+            scenarios = [winner_test_case.create_scenario(result.get_parameters(index)) for index in indexes]
+            for index, r in zip(indexes, TestCase.test_scenarios(scenarios, [tuple(range(0, booster_amount))])):
+                result.set_winner(index, generator, boosters, r.survival_time, r.incoming_dps, False)
+
+        if not adaptive:
+            if not evaluate(list(range(0, len(result)))):
+                return None
+        else:
+            # areas are tuples of the lowest and highest index on each axis
+            areas = [(tuple(0 for _ in result.shape), tuple(size - 1 for size in result.shape))]
+            while areas:
+                corners = dict()  # type: Dict[Tuple[Tuple[int, ...], Tuple[int, ...]], List[int]]
+                for low, high in areas:
+                    corners[(low, high)] = sorted(set(result.get_index(cell) for cell in itertools.product(*zip(low, high))))
+                if not evaluate(sorted(set(index for indexes in corners.values() for index in indexes if not result.evaluated[index]))):
+                    return None
+
+                next_areas = list()
+                for (low, high), indexes in corners.items():
+                    winners = set(result.get_winner(index) for index in indexes)
+                    if len(winners) == 1:
+                        cells = itertools.product(*(range(a, b + 1) for a, b in zip(low, high)))
+                        inside = [index for index in (result.get_index(cell) for cell in cells) if not result.evaluated[index]]
+                        if inside:
+                            fill(inside, winners.pop())
+                        continue
+                    # split the longest side, both halves share the cells in the middle
+                    axis = max(range(0, len(low)), key=lambda a: high[a] - low[a])
+                    if high[axis] - low[axis] < 2:
+                        continue  # all cells are corners
+                    middle = (low[axis] + high[axis]) // 2
+                    next_areas.append((low, high[:axis] + (middle,) + high[axis + 1:]))
+                    next_areas.append((low[:axis] + (middle,) + low[axis + 1:], high))
+                areas = next_areas
+
+        if console_output:
+            output = list()
+            output.append("------------ SWEEP ------------")
+            output.append(("Cells: ", f"[{len(result):n}]"))
+            output.append(("Tested cells: ", f"[{result.number_of_evaluated_cells:n}]"))
+            output.append("Calculations took {:.2f} seconds".format(time.time() - runtime))
+            output.append("")
+            print(Utility.format_output_string(output))
+        return result
+
+    def compute_fleet(self, ship_names: Sequence[str] = None,
+                      damage: Dict[str, float] = None,
+                      all_booster_counts: bool = False,
+                      prismatics: bool = True,
+                      short_list: bool = True,
+                      callback=None,
+                      message_queue: queue.SimpleQueue = None,
+                      result_queue: queue.SimpleQueue = None,
+                      progress_queue: queue.SimpleQueue = None,
+                      console_output: bool = False,
+                      engine: str = ENGINE_PYTHON,
+                      remove_dominated: bool = True,
+                      quick: bool = False,
+                      use_cache: bool = True) -> Optional[Dict[Tuple[str, int], TestResult]]:
+        """
+        Compute the best loadout of several ships (all ships by default) in one run. The tests of all ships and booster counts are split into
+        tasks together, so the worker pool stays busy until the last ship is done instead of running out of work at the end of each ship.
+        Each ship is set up like select_ship() does it: shield generators of the highest class that fits. Tests with the same booster variants
+        (after filtering) and booster count share the booster bonus table and it's sent to the worker pool only once (see SharedTestData.create_group()).
+        The result of each ship and booster count is put into result_queue as soon as it's done.
+        Callback, message_queue, progress_queue and cancel() work like in compute(). The callback is called with CALLBACK_FLEET_RESULT for each result.
+        :param ship_names: names of the ships (see ship_names), all ships if not set
+        :param damage: damage and hitpoint settings for all ships, keys are TestCase.SCENARIO_PARAMETERS. Missing keys use the defaults of TestCase
+        :param all_booster_counts: test every booster count from 0 to the utility slots of each ship instead of only all utility slots
+        :param prismatics: whether to use prismatics or not
+        :param short_list: booster variants to test, see set_boosters_to_test()
+        :param callback: optional callback using an int as argument
+        :param message_queue: message queue containing some output messages
+        :param result_queue: optional queue that receives a tuple (ship name, booster count, TestResult) for each result
+        :param progress_queue: optional queue for a ProgressEvent after each task, items are the booster combinations of all ships
+        :param console_output: whether you want output on the console or not
+        :param engine: ENGINE_PYTHON or ENGINE_NUMPY
+        :param remove_dominated: remove shield generator and booster variants that can't be part of the best loadout (see DominanceFilter).
+                                 This doesn't change the result.
+        :param quick: remove shield generator variants with BoundFilter, see compute()
+        :param use_cache: take results from result_cache and add new ones, results are the same as those of compute()
+        :return: dictionary with the best TestResult for each tuple (ship name, booster count) in the order of the ships or None if cancelled
+        :raises RuntimeError if a ship, a damage parameter or the engine is unknown or NumPy is not installed
+        """
+        if engine == ShieldTester.ENGINE_NUMPY:
+            if not VectorizedEngine.is_available():
+                raise RuntimeError("NumPy is required for the NumPy engine")
+            test_function = VectorizedEngine.test_case
+        elif engine == ShieldTester.ENGINE_PYTHON:
+            test_function = TestCase.test_case
+        else:
+            raise RuntimeError(f"Unknown engine: {engine}")
+
+        self.__cancel = False
+        self.__runtime = time.time()
+        results = dict()  # type: Dict[Tuple[str, int], TestResult]
+        order = list()  # type: List[Tuple[str, int]]
+        jobs = list()  # type: List[_FleetJob]
+        number_of_items = 0
+        workload = 0
+
+        def add_result(ship_name: str, number_of_boosters: int, result: TestResult, guardian_hitpoints: int):
+            results[(ship_name, number_of_boosters)] = result
+            if result_queue is not None:
+                result_queue.put((ship_name, number_of_boosters, result))
+                if callback:
+                    callback(ShieldTester.CALLBACK_FLEET_RESULT)
+            if console_output:
+                print(Utility.format_output_string([(f"{ship_name}, boosters: ", f"[{number_of_boosters}]")]))
+                print(result.get_output_string(guardian_hitpoints))
+
+        for ship_name in (ship_names if ship_names is not None else self.ship_names):
+            ship_test_case = self.select_ship(ship_name).create_scenario(damage or dict())
+            self.set_loadouts_for_class(ship_test_case, prismatics=prismatics)
+            self.set_boosters_to_test(ship_test_case, short_list=short_list)
+            if not ship_test_case.loadout_list or not ship_test_case.shield_booster_variants:
+                continue
+            utility_slots = ship_test_case.ship.utility_slots
+            for number_of_boosters in (range(0, utility_slots + 1) if all_booster_counts else [utility_slots]):
+                test_case = copy.copy(ship_test_case)
+                test_case.number_of_boosters_to_test = number_of_boosters
+                order.append((ship_name, number_of_boosters))
+                cache_key = ""
+                if use_cache:
+                    # same key as compute() without prelim, search and top_k
+                    cache_key = test_case.get_fingerprint(0, ShieldTester.SEARCH_EXHAUSTIVE, 0)
+                    cached_result = self.__result_cache.get(cache_key, self.__data_hash)
+                    if cached_result is not None:
+                        add_result(ship_name, number_of_boosters, cached_result, test_case.guardian_hitpoints)
+                        continue
+                if remove_dominated:
+                    test_case.loadout_list = DominanceFilter.filter_loadouts(test_case, test_case.loadout_list, test_case.shield_booster_variants)
+                    test_case.shield_booster_variants = DominanceFilter.filter_booster_variants(test_case, test_case.shield_booster_variants,
+                                                                                                test_case.loadout_list)
+                if quick:
+                    test_case.loadout_list = BoundFilter.filter_loadouts(test_case, test_case.loadout_list, test_case.shield_booster_variants,
+                                                                         number_of_boosters)
+                job = _FleetJob(ship_name, test_case, self.get_booster_bonus_table(test_case.shield_booster_variants, number_of_boosters),
+                                number_of_items, cache_key)
+                jobs.append(job)
+                number_of_items += len(job.booster_bonus_table)
+                workload += len(job.booster_bonus_table) * len(test_case.loadout_list)
+
+        output = list()
+        output.append("----------- FLEET TEST RUN -----------")
+        output.append(("Ships: ", f"[{len(set(ship_name for ship_name, _ in order))}]"))
+        output.append(("Tests: ", f"[{len(order)}]"))
+        output.append(("Results taken from cache: ", f"[{len(results)}]"))
+        output.append(("Shield loadouts to be tested: ", f"[{workload:n}]"))
+        output.append("Running calculations. Please wait...")
+        output.append("")
+        if message_queue:
+            message_queue.put(Utility.format_output_string(output))
+            if callback:
+                callback(ShieldTester.CALLBACK_MESSAGE)
+        if console_output:
+            print(Utility.format_output_string(output))
+
+        use_shared_test_data = self.__use_multiprocessing(workload) and SharedTestData.is_available()
+        if use_shared_test_data and jobs:
+            for job, shared in zip(jobs, SharedTestData.create_group([(job.test_case, job.booster_bonus_table.combinations, job.booster_bonus_table.bonuses)
+                                                                      for job in jobs])):
+                job.shared = shared
+        first_items = [job.first_item for job in jobs]
+        task_parts = list()  # type: List[List[Tuple[_FleetJob, int, int]]] # job and range of booster combinations of each part of a task
+
+        def get_task(start: int, end: int) -> Tuple:
+            # a task can cover the end of one job and the start of the next ones
+            parts = list()
+            i = bisect.bisect_right(first_items, start) - 1
+            while i < len(jobs) and jobs[i].first_item < end:
+                job_start = max(start, jobs[i].first_item) - jobs[i].first_item
+                job_end = min(end, jobs[i].first_item + len(jobs[i].booster_bonus_table)) - jobs[i].first_item
+                parts.append((jobs[i], job_start, job_end))
+                i += 1
+            task_parts.append(parts)
+            if use_shared_test_data:
+                return [(SharedTestData.run_task, (job.shared, job_start, job_end, test_function)) for job, job_start, job_end in parts],
+            return [(test_function, (job.test_case, job.booster_bonus_table.combinations[job_start:job_end],
+                                     job.booster_bonus_table.get_bonuses_slice(job_start, job_end))) for job, job_start, job_end in parts],
+
+        def on_result(task_index: int, r: List[TestResult]):
+            for (job, job_start, job_end), result in zip(task_parts[task_index], r):
+                if job.shared:
+                    job.shared.restore_result(result)
+                job.results[job_start] = result
+                job.items_done += job_end - job_start
+                if job.items_done == len(job.booster_bonus_table):
+                    # combine in the order of the booster combinations, so equally good results are chosen like in compute()
+                    best_result = TestResult(survival_time=0)
+                    for key in sorted(job.results.keys()):
+                        if job.results[key].is_better_than(best_result):
+                            best_result = job.results[key]
+                    job.results = dict()
+                    if use_cache:
+                        self.__result_cache.put(job.cache_key, self.__data_hash, best_result)
+                    add_result(job.ship_name, job.test_case.number_of_boosters_to_test, best_result, job.test_case.guardian_hitpoints)
+
+        try:
+            tested = self.__run_tasks(ShieldTester._run_task_parts, get_task, number_of_items, max(1, round(workload / max(1, number_of_items))),
+                                      on_result, callback, progress_queue)
+        finally:
+            for job in jobs:
+                if job.shared:
+                    job.shared.close()
+        if tested is None:
+            return None
+
+        output = list()
+        output.append("Calculations took {:.2f} seconds".format(time.time() - self.__runtime))
+        output.append("")
+        if message_queue:
+            message_queue.put(Utility.format_output_string(output))
+            if callback:
+                callback(ShieldTester.CALLBACK_MESSAGE)
+        if console_output:
+            print(Utility.format_output_string(output))
+        return {key: results[key] for key in order}
 
     def get_export(self, loadout: LoadOut, service: str = "") -> Union[Dict[str, Any], str]:
         """
@@ -394,6 +1536,40 @@ class ShieldTester(object):
             return s[0](loadout_dict, s[1])
         return ""
 
+    def get_ship(self, name: str) -> StarShip:
+        """
+        Get a ship or an imported ship by its name. The ship is shared with the test cases, use StarShip.copy() before changing it.
+        :param name: Name of the ship, see ship_names
+        :return: StarShip
+        """
+        if name in self.__ships:
+            return self.__ships[name]
+        if name in self.__importedShips:
+            return self.__importedShips[name]
+        raise RuntimeError("Could not select ship.")
+
+    def get_exports(self, loadouts: Iterable[LoadOut], service: str = "") -> List[Union[Dict[str, Any], str]]:
+        """
+        Generate exports for many loadouts at once (e.g. the results of compute_fleet()), see get_export().
+        The default shield generators are only looked up once per type and templates are not copied for services that return a string.
+        :param loadouts: loadouts containing the builds
+        :param service: use SERVICE_ constants, defaults to Coriolis
+        :return: list with a string or dictionary for each loadout (same order), empty string if a loadout has no shield generator
+        """
+        s = ShieldTester.EXPORT_SERVICES.get(service, list(ShieldTester.EXPORT_SERVICES.values())[0])
+        copy_templates = s[0] is Utility.create_slef_data  # the dictionaries of the other services are serialized right away
+        default_generators = dict()  # type: Dict[str, Optional[ShieldGenerator]] # key: symbol
+        exports = list()
+        for loadout in loadouts:
+            if loadout and loadout.shield_generator:
+                symbol = loadout.shield_generator.symbol
+                if symbol not in default_generators:
+                    default_generators[symbol] = self.get_default_shield_generator_of_variant(loadout.shield_generator)
+                exports.append(s[0](loadout.generate_loadout_event(default_generators[symbol], copy_templates), s[1]))
+            else:
+                exports.append("")
+        return exports
+
     def select_ship(self, name: str) -> TestCase:
         """
         Select a ship by its name. Get names from the property ship_names.
@@ -401,52 +1577,53 @@ class ShieldTester(object):
         :param name: Name of the ship
         :return: True if loaded successfully, False otherwise
         """
-        if name not in self.__ships and name not in self.__importedShips:
-            raise RuntimeError("Could not select ship.")
-
-        if name in self.__ships:
-            test_case = TestCase(copy.deepcopy(self.__ships[name]))
-        else:
-            test_case = TestCase(copy.deepcopy(self.__importedShips[name]))
+        # the ship is shared with other test cases, use StarShip.copy() before changing it
+        test_case = TestCase(self.get_ship(name))
         self.set_loadouts_for_class(test_case)
         test_case.number_of_boosters_to_test = test_case.ship.utility_slots
         self.set_boosters_to_test(test_case, short_list=True)
         return test_case
 
     def cancel(self):
+        """
+        Stop the running calculation. The worker pool keeps running, tasks that haven't started yet are skipped.
+        """
         self.__cancel = True
-        if self.__pool:
-            self.__pool.terminate()
-            self.__pool = None
+        if self.__generation is not None:
+            with self.__generation.get_lock():
+                self.__generation.value += 1
 
     def load_data(self, file: str):
         """
         Load data.
+        Ships, booster variants and engineered shield generators are compiled once and loaded from CACHE_DIRECTORY_NAME next to the data file
+        as long as the data file doesn't change. Booster bonus tables (and results if result_cache.persistent is set) are cached there as well.
         :param file: Path to json file
         """
-        with open(file) as json_file:
-            j_data = json.load(json_file)
-
-            # load ships
-            for j_ship in j_data["ships"]:
-                ship = StarShip.create_from_json(j_ship)
-                self.__ships.setdefault(ship.name, ship)
-
-            # load shield booster variants
-            for booster_variant in j_data["shield_booster_variants"]:
-                self.__booster_variants.append(ShieldBoosterVariant.create_from_json(booster_variant))
-
-            # load shield generators
-            sg_node = j_data["shield_generators"]
-            for sg_type, sg_list in sg_node["modules"].items():
-                sg_type_dict = self.__shield_generators.setdefault(sg_type, dict())
-                for j_generator in sg_list:
-                    generator = ShieldGenerator.create_from_json(j_generator)
-                    self.__unengineered_shield_generators.setdefault(generator.symbol, generator)
-                    generator_variants = ShieldGenerator.create_engineered_shield_generators(generator,
-                                                                                             sg_node["engineering"]["blueprints"],
-                                                                                             sg_node["engineering"]["experimental_effects"])
-                    sg_type_dict.setdefault(generator.module_class, generator_variants)
+        self.__data_hash = Utility.get_file_hash(file)
+        self.__cache_directory = os.path.join(os.path.dirname(os.path.abspath(file)), ShieldTester.CACHE_DIRECTORY_NAME)
+        self.__result_cache.directory = self.__cache_directory
+
+        data = CompiledData.load(self.__cache_directory, self.__data_hash, file)
+        if not data:
+            with open(file) as json_file:
+                data = CompiledData.create_from_json(json.load(json_file), self.__data_hash)
+            try:
+                data.save(self.__cache_directory, file)
+            except OSError as e:
+                print(f"Could not save compiled data: {e}")
+
+        for ship in data.ships:
+            self.__ships.setdefault(ship.name, ship)
+        for ship in self.__ships.values():
+            self.__ship_symbols.setdefault(ship.symbol.lower(), ship)
+        self.__booster_variants.extend(data.shield_booster_variants)
+        for generator in data.unengineered_shield_generators:
+            self.__unengineered_shield_generators.setdefault(generator.symbol, generator)
+        for sg_type, generators_by_class in data.shield_generators.items():
+            sg_type_dict = self.__shield_generators.setdefault(sg_type, dict())
+            for module_class, generator_variants in generators_by_class.items():
+                sg_type_dict.setdefault(module_class, generator_variants)
 
     def import_loadout(self, l: Dict[str, Any]) -> str:
         """
@@ -456,14 +1633,21 @@ class ShieldTester(object):
         :param l: dictionary of the imported loadout event
         :return: Name of imported ship or empty string if import failed
         """
-        ship_symbol = l["Ship"]
-        imported_ship = None  # type: StarShip
-        for ship in self.__ships.values():
-            if ship_symbol.lower() == ship.symbol.lower():
-                imported_ship = copy.deepcopy(ship)
-                break
-        if not imported_ship:
-            return ""  # can't import this ship
+        try:
+            return self.__import_loadout(l, copy.deepcopy(l["Modules"]))
+        except RuntimeError:
+            return ""
+
+    def __import_loadout(self, l: Dict[str, Any], modules: List[Dict[str, Any]]) -> str:
+        """
+        :param l: dictionary of the imported loadout event
+        :param modules: modules of the loadout event that can be used by the imported ship
+        :return: Name of imported ship
+        """
+        ship = self.__ship_symbols.get(l["Ship"].lower())
+        if not ship:
+            raise RuntimeError(f"Unknown ship: {l['Ship']}")
+        imported_ship = ship.copy(modules)
 
         if "ShipName" in l and l["ShipName"]:
             name = l["ShipName"]
@@ -476,33 +1660,162 @@ class ShieldTester(object):
         else:
             ident = "Imported"
         imported_ship.custom_name = f"{name} ({ident})"
-        imported_ship.loadout_template["Modules"] = copy.deepcopy(l["Modules"])
 
         imported_ship.highest_internal = 0
-        items_to_remove = list()
-        for module in imported_ship.loadout_template["Modules"]:
+        kept_modules = list()
+        for module in modules:
             if module["Slot"].lower().startswith("tinyhardpoint"):
                 # get amount of fitted shield boosters
                 if module["Item"].lower().startswith("hpt_shieldbooster_size0"):
-                    items_to_remove.append(module)
-                else:
-                    imported_ship.utility_slots_free.remove(int(module["Slot"][-1:]))  # remove free slot
+                    continue
+                imported_ship.utility_slots_free.remove(int(module["Slot"][-1:]))  # remove free slot
             elif module["Item"].lower().startswith("int_shieldgenerator_size"):
                 # get shield generator class
                 imported_ship.highest_internal = int(module["Slot"][-1:])
-                items_to_remove.append(module)
+                continue
             elif re.match("slot[0-9]{2}_size[0-9]", module["Slot"].lower()):
                 slot_number = int(module["Slot"][4:6])
                 if slot_number in imported_ship.internal_slot_layout:
                     # will fail when encountering a military only slot
                     imported_ship.internal_slot_layout.pop(int(module["Slot"][4:6]))
-
-        for module in items_to_remove:
-            imported_ship.loadout_template["Modules"].remove(module)
+            kept_modules.append(module)
+        imported_ship.loadout_template["Modules"] = kept_modules
 
         imported_ship.utility_slots_free.sort()
         min_sg, max_sg = self.get_compatible_shield_generator_classes(imported_ship)
         if min_sg == 0 or max_sg == 0:
-            return ""
+            raise RuntimeError("No shield generator can be fitted")
         self.__importedShips[imported_ship.custom_name] = imported_ship  # overwrite old imports with the same name
         return imported_ship.custom_name
+
+    def __decode_import_lines(self, lines: List[str]) -> List[Tuple[List[Dict[str, Any]], str]]:
+        if self.__cpu_cores > 1 and len(lines) >= ShieldTester.IMPORT_MP_MIN_LINES:
+            self.start_pool()
+            return self.__pool.map(Utility.decode_import_line, lines, chunksize=max(1, len(lines) // (self.__pool_size * ShieldTester.MP_TASKS_PER_WORKER)))
+        return [Utility.decode_import_line(line) for line in lines]
+
+    # noinspection PyBroadException
+    def import_loadouts(self, entries: Union[str, Iterable[str]]) -> ImportResult:
+        """
+        Import many loadouts, e.g. an export of a squadron. The input is read in batches of IMPORT_BATCH_SIZE lines, large batches are
+        decoded by the worker pool. Each loadout is imported like with import_loadout(), a failed entry doesn't stop the import.
+        Call cancel() to stop the import after the current batch.
+        :param entries: string or iterable of lines (e.g. an open file). One entry per line: loadout event, SLEF, URL or compressed loadout event.
+                        Empty lines are skipped. Use Utility.get_loadouts_from_string() for json that spans over several lines.
+        :return: ImportResult with the name of each imported ship or the reason why the import failed and the number of entries per second
+        """
+        self.__cancel = False
+        start_time = time.perf_counter()
+        result = ImportResult()
+        if isinstance(entries, str):
+            entries = entries.splitlines()
+
+        def import_batch(batch: List[Tuple[int, str]]):
+            for (line_number, _), (loadouts, error) in zip(batch, self.__decode_import_lines([line for _, line in batch])):
+                if error:
+                    result.add(line_number, error=error)
+                for loadout in loadouts:
+                    try:
+                        # the decoded loadouts aren't used by anything else, no need to copy the modules
+                        result.add(line_number, self.__import_loadout(loadout, loadout["Modules"]))
+                    except Exception as e:
+                        result.add(line_number, error=str(e) if isinstance(e, RuntimeError) else f"Invalid loadout: {type(e).__name__}: {e}")
+
+        batch = list()
+        for line_number, line in enumerate(entries, start=1):
+            if self.__cancel:
+                result.cancelled = True
+                break
+            if line.strip():
+                batch.append((line_number, line))
+            if len(batch) >= ShieldTester.IMPORT_BATCH_SIZE:
+                import_batch(batch)
+                batch = list()
+        if batch and not result.cancelled:
+            import_batch(batch)
+        result.runtime = time.perf_counter() - start_time
+        return result
+
+    async def __run_async(self, function: Callable, *args, **kwargs) -> Any:
+        """
+        Run a method in the executor of this ShieldTester without blocking the event loop. Calls run one after the other because
+        each of them uses all CPU cores. If the awaiting task is cancelled, a waiting call is skipped and a running call is stopped with cancel().
+        AsyncQueue arguments are closed when the call is done.
+        """
+        loop = asyncio.get_running_loop()
+        queues = [value for value in kwargs.values() if isinstance(value, AsyncQueue)]
+        for async_queue in queues:
+            async_queue._get_queue()
+        if self.__executor is None:
+            self.__executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="ShieldTester")
+
+        lock = threading.Lock()
+        state = {"started": False, "finished": False, "cancelled": False}
+
+        def run() -> Any:
+            try:
+                with lock:
+                    if state["cancelled"]:
+                        return None
+                    state["started"] = True
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    with lock:
+                        state["finished"] = True
+            finally:
+                for q in queues:
+                    q.close()
+
+        try:
+            return await loop.run_in_executor(self.__executor, run)
+        except asyncio.CancelledError:
+            with lock:
+                state["cancelled"] = True
+                if state["started"] and not state["finished"]:
+                    self.cancel()  # only this call is running, the executor runs one call at a time
+                elif not state["started"]:
+                    for q in queues:
+                        q.close()
+            raise
+
+    async def compute_async(self, test_case: TestCase, **kwargs) -> Union[TestResult, List[TestResult], None]:
+        """
+        Awaitable version of compute(). Keyword arguments are the same as for compute().
+        Calls of the async methods run one after the other in a thread of this ShieldTester, so several tasks can await them without blocking the event loop.
+        Use AsyncQueue for progress_queue and message_queue to read the events with "async for" while waiting for the result.
+        Cancelling the awaiting task stops the calculation (see cancel()) and raises asyncio.CancelledError.
+        :return: same as compute()
+        """
+        return await self.__run_async(self.compute, test_case, **kwargs)
+
+    async def compute_scenarios_async(self, test_case: TestCase, scenarios: List[Dict[str, float]], **kwargs) -> Optional[List[TestResult]]:
+        """
+        Awaitable version of compute_scenarios(), see compute_async().
+        """
+        return await self.__run_async(self.compute_scenarios, test_case, scenarios, **kwargs)
+
+    async def compute_hull_masses_async(self, test_case: TestCase, **kwargs) -> Optional[HullMassResult]:
+        """
+        Awaitable version of compute_hull_masses(), see compute_async().
+        """
+        return await self.__run_async(self.compute_hull_masses, test_case, **kwargs)
+
+    async def compute_fleet_async(self, ship_names: Sequence[str] = None, **kwargs) -> Optional[Dict[Tuple[str, int], TestResult]]:
+        """
+        Awaitable version of compute_fleet(), see compute_async(). Use an AsyncQueue as result_queue to get each result as soon as it's done.
+        """
+        return await self.__run_async(self.compute_fleet, ship_names, **kwargs)
+
+    async def sweep_async(self, test_case: TestCase, axes: Union[Dict[str, Sequence[float]], Sequence[Tuple[str, Sequence[float]]]],
+                          **kwargs) -> Optional[SweepResult]:
+        """
+        Awaitable version of sweep(), see compute_async().
+        """
+        return await self.__run_async(self.sweep, test_case, axes, **kwargs)
+
+    async def import_loadouts_async(self, entries: Union[str, Iterable[str]]) -> ImportResult:
+        """
+        Awaitable version of import_loadouts(). Cancelling the awaiting task stops the import after the current batch.
+        """
+        return await self.__run_async(self.import_loadouts, entries)
@@ -1,11 +1,14 @@
 from __future__ import annotations
 
+import copy
 from typing import Tuple, Dict, Any, List
 
 
 class StarShip(object):
+    __slots__ = ("name", "custom_name", "symbol", "loadout_template", "base_shield_strength", "hull_mass", "utility_slots_free", "highest_internal", "internal_slot_layout")
+
     def __init__(self):
-        # no need for private attributes, we are handing out deep copies
+        # ships are shared by the test cases and loadouts created from them, use copy() before changing a ship
         self.name = ""
         self.custom_name = ""
         self.symbol = ""
@@ -20,6 +23,22 @@ class StarShip(object):
     def utility_slots(self):
         return len(self.utility_slots_free)
 
+    def copy(self, modules: List[Dict[str, Any]] = None) -> StarShip:
+        """
+        Create a copy that can be changed without affecting this ship. Template, utility slots and slot layout are copied as well.
+        :param modules: optional modules for the template of the copy instead of a copy of the modules of this ship (used as they are)
+        :return: new StarShip
+        """
+        ship = copy.copy(self)
+        if modules is None:
+            ship.loadout_template = copy.deepcopy(self.loadout_template)
+        else:
+            ship.loadout_template = {key: modules if key == "Modules" else copy.deepcopy(value) for key, value in self.loadout_template.items()}
+            ship.loadout_template["Modules"] = modules
+        ship.utility_slots_free = list(self.utility_slots_free)
+        ship.internal_slot_layout = dict(self.internal_slot_layout)
+        return ship
+
     def get_available_internal_slot(self, module_class: int, reverse: bool = False) -> Tuple[int, int]:
         items = sorted(self.internal_slot_layout.items(), reverse=reverse)  # type: List[Tuple[int, int]]
         for slot, m_class in items:
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import array
+import copy
+import csv
+import itertools
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .LoadOut import LoadOut
+from .ShieldBoosterVariant import ShieldBoosterVariant
+
+try:
+    # noinspection PyUnresolvedReferences
+    import numpy as np
+    _numpy_imported = True
+except ImportError:
+    _numpy_imported = False
+
+
+class SweepResult(object):
+    """
+    Best loadout for every cell of a grid of damage settings, see ShieldTester.sweep().
+    Winners are stored as indexes: the shield generator variant is an index of loadouts and the boosters are indexes of shield_booster_variants.
+    Cells are numbered in row-major order (the last axis changes fastest).
+    """
+    NO_WINNER = -1
+
+    def __init__(self, axes: Sequence[Tuple[str, Sequence[float]]], loadouts: List[LoadOut], shield_booster_variants: List[ShieldBoosterVariant],
+                 number_of_boosters: int):
+        """
+        :param axes: list of tuples (parameter, values), parameters are TestCase.SCENARIO_PARAMETERS
+        :param loadouts: shield generator variants the generator indexes refer to
+        :param shield_booster_variants: booster variants the booster indexes refer to
+        :param number_of_boosters: boosters per loadout
+        """
+        self.axes = [(name, list(values)) for name, values in axes]
+        self.shape = tuple(len(values) for _, values in self.axes)
+        self.loadouts = loadouts
+        self.shield_booster_variants = shield_booster_variants
+        self.number_of_boosters = number_of_boosters
+        number_of_cells = 1
+        for size in self.shape:
+            number_of_cells *= size
+        self.generators = array.array("i", [SweepResult.NO_WINNER]) * number_of_cells
+        self.boosters = array.array("i", [SweepResult.NO_WINNER]) * (number_of_cells * number_of_boosters)
+        self.survival_times = array.array("d", [0.0]) * number_of_cells  # if negative, the ship didn't die
+        self.incoming_dps = array.array("d", [0.0]) * number_of_cells
+        self.evaluated = array.array("b", [0]) * number_of_cells  # 1 if all loadouts were tested, 0 if the winner of the surrounding cells was used
+
+    def __len__(self):
+        return len(self.generators)
+
+    def get_index(self, cell: Sequence[int]) -> int:
+        """
+        :param cell: index on each axis
+        :return: number of the cell
+        """
+        index = 0
+        for i, size in zip(cell, self.shape):
+            index = index * size + i
+        return index
+
+    def get_cell(self, index: int) -> Tuple[int, ...]:
+        cell = list()
+        for size in reversed(self.shape):
+            cell.append(index % size)
+            index //= size
+        return tuple(reversed(cell))
+
+    def get_parameters(self, index: int) -> Dict[str, float]:
+        """
+        :return: damage settings of a cell, can be used with TestCase.create_scenario()
+        """
+        return {name: values[i] for (name, values), i in zip(self.axes, self.get_cell(index))}
+
+    def set_winner(self, index: int, generator: int, boosters: Sequence[int], survival_time: float, incoming_dps: float, evaluated: bool):
+        self.generators[index] = generator
+        self.boosters[index * self.number_of_boosters:(index + 1) * self.number_of_boosters] = array.array("i", boosters)
+        self.survival_times[index] = survival_time
+        self.incoming_dps[index] = incoming_dps
+        self.evaluated[index] = 1 if evaluated else 0
+
+    def get_winner(self, index: int) -> Tuple[int, Tuple[int, ...]]:
+        """
+        :return: tuple (generator index, booster indexes) of a cell
+        """
+        return self.generators[index], tuple(self.boosters[index * self.number_of_boosters:(index + 1) * self.number_of_boosters])
+
+    def get_loadout(self, index: int) -> Optional[LoadOut]:
+        """
+        :return: winning LoadOut of a cell with its boosters or None if the cell has no winner
+        """
+        generator, boosters = self.get_winner(index)
+        if generator == SweepResult.NO_WINNER:
+            return None
+        loadout = copy.copy(self.loadouts[generator])
+        loadout.boosters = [self.shield_booster_variants[x] for x in boosters]
+        return loadout
+
+    @property
+    def number_of_evaluated_cells(self) -> int:
+        return sum(self.evaluated)
+
+    def to_numpy(self) -> Dict[str, np.ndarray]:
+        """
+        :return: dictionary with the arrays generators, survival_times, incoming_dps and evaluated in the shape of the grid and
+                 boosters with an additional last axis for the boosters
+        :raises RuntimeError if NumPy is not installed
+        """
+        if not _numpy_imported:
+            raise RuntimeError("NumPy is required to create arrays")
+        return {"generators": np.frombuffer(self.generators, dtype=np.int32).reshape(self.shape).copy(),
+                "boosters": np.frombuffer(self.boosters, dtype=np.int32).reshape(self.shape + (self.number_of_boosters,)).copy(),
+                "survival_times": np.frombuffer(self.survival_times, dtype=np.float64).reshape(self.shape).copy(),
+                "incoming_dps": np.frombuffer(self.incoming_dps, dtype=np.float64).reshape(self.shape).copy(),
+                "evaluated": np.frombuffer(self.evaluated, dtype=np.int8).reshape(self.shape).astype(bool)}
+
+    def save_npy(self, file: str):
+        """
+        Save the grid as structured NumPy array with the fields generator, boosters, survival_time, incoming_dps and evaluated.
+        The axes are not saved, use save_csv() for a self-contained file.
+        :raises RuntimeError if NumPy is not installed
+        """
+        arrays = self.to_numpy()
+        grid = np.empty(self.shape, dtype=[("generator", np.int32), ("boosters", np.int32, (self.number_of_boosters,)),
+                                           ("survival_time", np.float64), ("incoming_dps", np.float64), ("evaluated", np.bool_)])
+        grid["generator"] = arrays["generators"]
+        grid["boosters"] = arrays["boosters"]
+        grid["survival_time"] = arrays["survival_times"]
+        grid["incoming_dps"] = arrays["incoming_dps"]
+        grid["evaluated"] = arrays["evaluated"]
+        np.save(file, grid)
+
+    def save_csv(self, file: str):
+        """
+        Save one row per cell with the values of the axes, the winner and its survival time.
+        """
+        with open(file, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow([name for name, _ in self.axes] +
+                            ["generator", "shield_generator", "boosters", "survival_time", "incoming_dps", "evaluated"])
+            for index, cell in enumerate(itertools.product(*(range(size) for size in self.shape))):
+                generator, boosters = self.get_winner(index)
+                name = ""
+                if generator != SweepResult.NO_WINNER:
+                    name = str(self.loadouts[generator].shield_generator)
+                writer.writerow([values[i] for (_, values), i in zip(self.axes, cell)] +
+                                [generator, name, " ".join(str(x) for x in boosters), self.survival_times[index], self.incoming_dps[index],
+                                 self.evaluated[index]])
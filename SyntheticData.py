@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import random
+from typing import Any, Dict, List
+
+from .ShieldGenerator import ShieldGenerator
+
+
+class SyntheticData(object):
+    """
+    Create data files with made up ships, shield generators and booster variants in the format of data.json.
+    The values are in the same ranges as the game data but don't belong to any real module. The same settings and seed always create the same data.
+    """
+    # resistances, strength and regeneration of the shield generator types relative to TYPE_NORMAL
+    GENERATOR_TYPES = {ShieldGenerator.TYPE_NORMAL: (0.5, 0.4, -0.2, 1.0, 1.0),
+                       ShieldGenerator.TYPE_BIWEAVE: (0.5, 0.4, -0.2, 0.85, 2.2),
+                       ShieldGenerator.TYPE_PRISMATIC: (0.5, 0.4, -0.2, 1.2, 0.5)}
+
+    @staticmethod
+    def get_max_mass(module_class: int) -> float:
+        return 60.0 * module_class ** 2
+
+    @staticmethod
+    def __create_generator(sg_type: str, module_class: int) -> Dict[str, Any]:
+        explres, kinres, thermres, strength, regen = SyntheticData.GENERATOR_TYPES[sg_type]
+        max_mass = SyntheticData.get_max_mass(module_class)
+        return {"symbol": f"int_shieldgenerator_size{module_class}_class5_{sg_type}",
+                "integrity": 40 + 20 * module_class,
+                "power": round(1.0 + 0.5 * module_class, 2),
+                "explres": explres,
+                "kinres": kinres,
+                "thermres": thermres,
+                "name": sg_type,
+                "class": module_class,
+                "regen": round((0.8 + 0.4 * module_class) * regen, 4),
+                "brokenregen": round((1.6 + 0.8 * module_class) * regen, 4),
+                "distdraw": round(0.6 * strength, 4),
+                "maxmass": max_mass,
+                "maxmul": round(1.3 * strength, 4),
+                "minmass": max_mass / 10,
+                "minmul": round(0.3 * strength, 4),
+                "optmass": max_mass / 2,
+                "optmul": round(0.8 * strength, 4)}
+
+    @staticmethod
+    def __create_ship(rng: random.Random, index: int, number_of_ships: int, module_classes: int) -> Dict[str, Any]:
+        # the last ship always has 8 utility slots so every booster count can be tested
+        utility_slots = 8 if index == number_of_ships - 1 else rng.randint(2, 8)
+        highest_internal = rng.randint(max(1, module_classes - 3), module_classes)
+        hull_mass = round(rng.uniform(0.1, 0.8) * SyntheticData.get_max_mass(highest_internal), 1)
+        internal = [highest_internal] + [max(1, highest_internal - i) for i in range(1, 5)] + ["military"]
+        return {"ship": f"Synthetic Ship {index}",
+                "symbol": f"synthetic_ship_{index}",
+                "loadout_template": {"event": "Loadout", "Ship": f"synthetic_ship_{index}", "Modules": []},
+                "baseShieldStrength": rng.randint(40, 700),
+                "hullMass": hull_mass,
+                "utility_slots": utility_slots,
+                "highest_internal": highest_internal,
+                "slot_layout": {"internal": internal}}
+
+    @staticmethod
+    def __create_booster_variants(rng: random.Random, number_of_booster_variants: int) -> List[Dict[str, Any]]:
+        boosters = list()
+        for i in range(number_of_booster_variants):
+            # one resistance is the focus of the booster, like the engineering blueprints in the game
+            resistances = [rng.uniform(-0.02, 0.08) for _ in range(3)]
+            resistances[i % 3] += rng.uniform(0.1, 0.25)
+            boosters.append({"engineering": f"Blueprint {i % 4}",
+                             "experimental": f"Experimental {i}",
+                             "shield_strength_bonus": round(rng.uniform(0.05, 0.7), 4),
+                             "exp_res_bonus": round(resistances[0], 4),
+                             "kin_res_bonus": round(resistances[1], 4),
+                             "therm_res_bonus": round(resistances[2], 4),
+                             "can_skip": i % 3 == 0,
+                             "loadout_template": {"Item": "hpt_shieldbooster_size0_class5", "On": True, "Priority": 0}})
+        return boosters
+
+    @staticmethod
+    def create(number_of_ships: int = 6, module_classes: int = 8, number_of_blueprints: int = 5, number_of_experimentals: int = 7,
+               number_of_booster_variants: int = 12, seed: int = 0) -> Dict[str, Any]:
+        """
+        Create data in the format of data.json.
+        :param number_of_ships: number of ships
+        :param module_classes: shield generators are created for the classes 1 to module_classes (up to 8)
+        :param number_of_blueprints: blueprints for shield generators
+        :param number_of_experimentals: experimental effects for shield generators
+        :param number_of_booster_variants: number of booster variants
+        :param seed: seed for the random number generator
+        :return: dictionary that can be saved as json
+        """
+        if number_of_ships < 1 or not 1 <= module_classes <= 8 or number_of_blueprints < 1 or number_of_experimentals < 1 or number_of_booster_variants < 1:
+            raise RuntimeError("Invalid settings for synthetic data")
+        rng = random.Random(seed)
+
+        ships = [SyntheticData.__create_ship(rng, i, number_of_ships, module_classes) for i in range(number_of_ships)]
+        modules = {sg_type: [SyntheticData.__create_generator(sg_type, module_class) for module_class in range(1, module_classes + 1)]
+                   for sg_type in SyntheticData.GENERATOR_TYPES.keys()}
+        blueprints = [{"symbol": f"ShieldGenerator_Blueprint{i}",
+                       "name": f"Blueprint {i}",
+                       "features": {"integrity": round(rng.uniform(-0.2, 0.5), 4),
+                                    "optmul": round(rng.uniform(0.0, 0.4), 4),
+                                    "regen": round(rng.uniform(-0.3, 0.3), 4),
+                                    "brokenregen": round(rng.uniform(-0.3, 0.3), 4),
+                                    "power": round(rng.uniform(-0.2, 0.2), 4),
+                                    "distdraw": round(rng.uniform(-0.3, 0.3), 4),
+                                    "explres": round(rng.uniform(-0.1, 0.1), 4),
+                                    "kinres": round(rng.uniform(-0.1, 0.1), 4),
+                                    "thermres": round(rng.uniform(-0.1, 0.1), 4)}}
+                      for i in range(number_of_blueprints)]
+        experimentals = [{"symbol": f"special_shield_synthetic{i}",
+                          "name": f"Experimental {i}",
+                          "features": {"optmul": round(rng.uniform(-0.05, 0.1), 4),
+                                       "regen": round(rng.uniform(-0.2, 0.2), 4),
+                                       "explres": round(rng.uniform(-3.0, 3.0), 4),
+                                       "kinres": round(rng.uniform(-3.0, 3.0), 4),
+                                       "thermres": round(rng.uniform(-3.0, 3.0), 4)}}
+                         for i in range(number_of_experimentals)]
+
+        return {"ships": ships,
+                "shield_booster_variants": SyntheticData.__create_booster_variants(rng, number_of_booster_variants),
+                "shield_generators": {"modules": modules,
+                                      "engineering": {"blueprints": blueprints,
+                                                      "experimental_effects": experimentals}}}
+
+    @staticmethod
+    def write(file: str, **settings):
+        """
+        Create data and save it as json file.
+        :param file: path of the new file
+        :param settings: see create()
+        """
+        with open(file, "w") as json_file:
+            json.dump(SyntheticData.create(**settings), json_file, indent=1)
@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import copy
+import functools
+import hashlib
+import heapq
+import json
 import math
-from typing import List
+from typing import Any, List, Optional, Sequence, Dict
 
 from .LoadOut import LoadOut
 from .ShieldBoosterVariant import ShieldBoosterVariant
@@ -12,6 +16,9 @@ from .Utility import Utility
 
 
 class TestCase(object):
+    # parameters that can be changed per scenario, see create_scenario
+    SCENARIO_PARAMETERS = ("damage_effectiveness", "explosive_dps", "kinetic_dps", "thermal_dps", "absolute_dps", "scb_hitpoints", "guardian_hitpoints")
+
     def __init__(self, ship: StarShip):
         self.ship = ship
         self.damage_effectiveness = 0
@@ -24,6 +31,7 @@ class TestCase(object):
         self.shield_booster_variants = None  # type: List[ShieldBoosterVariant]
         self.loadout_list = None  # type: List[LoadOut]
         self.number_of_boosters_to_test = 0
+        self.hull_masses = None  # type: Optional[List[float]] # for ShieldTester.compute_hull_masses(), ship.hull_mass if not set
         self._use_prismatics = True  # set in ShieldTester! call ShieldTester.set_loadouts_for_class()
 
     def get_output_string(self) -> str:
@@ -53,12 +61,82 @@ class TestCase(object):
         output.append("")
         return Utility.format_output_string(output)
 
+    def get_log_record(self) -> Dict[str, Any]:
+        """
+        Get the test setup as dictionary for a structured log (see ResultLog)
+        :return: dictionary with ship, number of boosters, prismatics and the SCENARIO_PARAMETERS
+        """
+        record = {"ship": self.ship.name if self.ship else "",
+                  "custom_name": self.ship.custom_name if self.ship else "",
+                  "number_of_boosters": self.number_of_boosters_to_test,
+                  "prismatics": self._use_prismatics}
+        record.update((key, getattr(self, key)) for key in TestCase.SCENARIO_PARAMETERS)
+        return record
+
+    def set_hull_mass_range(self, minimum: float, maximum: float, step: float):
+        """
+        Set hull_masses to the masses from minimum to maximum (including) in steps of step.
+        :raises RuntimeError if step is not positive or maximum is lower than minimum
+        """
+        if step <= 0 or maximum < minimum:
+            raise RuntimeError("Invalid hull mass range")
+        number_of_masses = int(math.floor((maximum - minimum) / step + 1e-9)) + 1
+        self.hull_masses = [minimum + i * step for i in range(0, number_of_masses)]
+
+    def create_scenario(self, parameters: Dict[str, float]) -> TestCase:
+        """
+        Create a copy of this TestCase with different damage and hitpoint settings. Ship, loadouts and booster variants are shared.
+        :param parameters: dictionary with keys from SCENARIO_PARAMETERS and their new values
+        :return: new TestCase
+        :raises RuntimeError if a parameter is unknown
+        """
+        scenario = copy.copy(self)
+        for key, value in parameters.items():
+            if key not in TestCase.SCENARIO_PARAMETERS:
+                raise RuntimeError(f"Unknown scenario parameter: {key}")
+            setattr(scenario, key, value)
+        return scenario
+
+    def get_fingerprint(self, *options) -> str:
+        """
+        Canonical fingerprint of everything that influences the result of a test: ship, loadouts, booster variants, booster count and damage settings.
+        Test cases with the same fingerprint and the same options give the same result.
+        :param options: additional settings that influence the result (e.g. prelim)
+        :return: hex string
+        """
+        h = hashlib.sha256()
+
+        def add(value):
+            h.update(repr(value).encode("utf-8"))
+            h.update(b";")
+
+        ship = self.ship
+        if ship:
+            add((ship.name, ship.custom_name, ship.symbol, ship.hull_mass, ship.base_shield_strength, ship.utility_slots))
+            add(json.dumps(ship.loadout_template, sort_keys=True))
+        else:
+            add(None)
+        add(tuple(getattr(self, key) for key in TestCase.SCENARIO_PARAMETERS))
+        add((self.number_of_boosters_to_test, self._use_prismatics))
+        add(len(self.loadout_list or ()))
+        for loadout in self.loadout_list or ():
+            sg = loadout.shield_generator
+            add((sg.symbol, sg.module_class, sg.engineered_symbol, sg.experimental_symbol, sg.explres, sg.kinres, sg.thermres, sg.regen,
+                 loadout.shield_strength))
+        add(len(self.shield_booster_variants or ()))
+        for booster in self.shield_booster_variants or ():
+            add((booster.engineering, booster.experimental, booster.exp_res_bonus, booster.kin_res_bonus, booster.therm_res_bonus,
+                 booster.shield_strength_bonus))
+        add(options)
+        return h.hexdigest()
+
     @staticmethod
-    def test_case(test_case: TestCase, booster_combinations: List[List[int]]) -> TestResult:
+    def test_case(test_case: TestCase, booster_combinations: List[List[int]], booster_bonuses: Optional[Sequence[float]] = None) -> TestResult:
         """
         Run a particular test based on provided TestCase and booster combinations.
         :param test_case: TestCase containing test setup
         :param booster_combinations: list of lists of indexes of ShieldBoosterVariant
+        :param booster_bonuses: optional precalculated bonuses (see BoosterBonusTable), 4 values per booster combination
         :return: best result as TestResult
         """
         best_survival_time = 0
@@ -76,10 +154,13 @@ class TestCase(object):
         scb_hitpoints = test_case.scb_hitpoints
         guardian_hitpoints = test_case.guardian_hitpoints
 
-        for booster_combination in booster_combinations:
+        for i, booster_combination in enumerate(booster_combinations):
             boosters = [test_case.shield_booster_variants[x] for x in booster_combination]
             # Do this here instead of for each loadout to save some time.
-            exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus = ShieldBoosterVariant.calculate_booster_bonuses(boosters)
+            if booster_bonuses is not None:
+                exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus = booster_bonuses[i * 4:i * 4 + 4]
+            else:
+                exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus = ShieldBoosterVariant.calculate_booster_bonuses(boosters)
 
             for loadout in test_case.loadout_list:
                 # can't use same function in LoadOut because of speed
@@ -113,6 +194,217 @@ class TestCase(object):
                         best_hitpoints = hp
 
         # put everything together
-        best_loadout = copy.deepcopy(best_loadout)  # create copy because it might be reused by the multiprocessing pool
+        best_loadout = copy.copy(best_loadout)  # boosters are different for each result
         best_loadout.boosters = best_shield_booster_loadout
         return TestResult(best_loadout, best_survival_time, lowest_dps, best_hitpoints)
+
+    @staticmethod
+    def test_case_top_k(test_case: TestCase, booster_combinations: List[List[int]], booster_bonuses: Optional[Sequence[float]] = None,
+                        top_k: int = 1) -> List[TestResult]:
+        """
+        Same as test_case but keep the best top_k results instead of only the best one.
+        :param test_case: TestCase containing test setup
+        :param booster_combinations: list of lists of indexes of ShieldBoosterVariant
+        :param booster_bonuses: optional precalculated bonuses (see BoosterBonusTable), 4 values per booster combination
+        :param top_k: number of results to keep
+        :return: list of TestResult, best first
+        """
+        # heap of ranking tuples (survival_time, actual_dps, hp, order, loadout index, booster combination index), worst result first
+        heap = list()
+        heap_key = functools.cmp_to_key(lambda a, b: TestResult.compare_ranking(b, a))
+        worst_survival_time = 0
+        worst_dps = 0
+
+        damage_effectiveness = test_case.damage_effectiveness
+        explosive_dps = test_case.explosive_dps
+        kinetic_dps = test_case.kinetic_dps
+        thermal_dps = test_case.thermal_dps
+        absolute_dps = test_case.absolute_dps
+        scb_hitpoints = test_case.scb_hitpoints
+        guardian_hitpoints = test_case.guardian_hitpoints
+        number_of_loadouts = len(test_case.loadout_list)
+
+        for i, booster_combination in enumerate(booster_combinations):
+            if booster_bonuses is not None:
+                exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus = booster_bonuses[i * 4:i * 4 + 4]
+            else:
+                boosters = [test_case.shield_booster_variants[x] for x in booster_combination]
+                exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus = ShieldBoosterVariant.calculate_booster_bonuses(boosters)
+
+            for j, loadout in enumerate(test_case.loadout_list):
+                exp_res = (1 - loadout.shield_generator.explres) * exp_modifier
+                kin_res = (1 - loadout.shield_generator.kinres) * kin_modifier
+                therm_res = (1 - loadout.shield_generator.thermres) * therm_modifier
+                hp = loadout.shield_strength * hitpoint_bonus
+                regen_rate = loadout.shield_generator.regen * (1.0 - damage_effectiveness)
+
+                actual_dps = damage_effectiveness * (
+                        explosive_dps * exp_res +
+                        kinetic_dps * kin_res +
+                        thermal_dps * therm_res +
+                        absolute_dps) - regen_rate
+
+                survival_time = (hp + scb_hitpoints + guardian_hitpoints) / actual_dps
+
+                if len(heap) >= top_k:
+                    # skip the comparison for results that are clearly worse than the worst result on the heap
+                    if worst_survival_time < 0:
+                        if actual_dps > 0 or actual_dps > worst_dps + abs(worst_dps) * 1e-6:
+                            continue
+                    elif actual_dps > 0 and survival_time <= worst_survival_time:
+                        continue
+
+                entry = (survival_time, actual_dps, hp, i * number_of_loadouts + j, j, i)
+                if len(heap) < top_k:
+                    heapq.heappush(heap, heap_key(entry))
+                elif TestResult.compare_ranking(entry, heap[0].obj) < 0:
+                    heapq.heapreplace(heap, heap_key(entry))
+                else:
+                    continue
+                worst_survival_time, worst_dps = heap[0].obj[0:2]
+
+        results = list()
+        for key in sorted(heap, reverse=True):
+            survival_time, actual_dps, hp, order, loadout_index, combination_index = key.obj
+            loadout = copy.copy(test_case.loadout_list[loadout_index])  # boosters are different for each result
+            loadout.boosters = [test_case.shield_booster_variants[x] for x in booster_combinations[combination_index]]
+            # same as test_case: incoming dps is only reported if the ship didn't die
+            results.append(TestResult(loadout, survival_time, actual_dps if survival_time < 0 else 10000, hp))
+        return results
+
+    @staticmethod
+    def test_hull_masses(test_case: TestCase, booster_combinations: List[List[int]], booster_bonuses: Optional[Sequence[float]] = None,
+                         shield_strengths: Sequence[Sequence[float]] = ()) -> List[TestResult]:
+        """
+        Run test_case for several hull masses at once. Only the shield strength depends on the hull mass, so resistances and incoming dps
+        of each loadout and booster combination are calculated once and are used for all masses.
+        :param test_case: TestCase containing test setup
+        :param booster_combinations: list of lists of indexes of ShieldBoosterVariant
+        :param booster_bonuses: optional precalculated bonuses (see BoosterBonusTable), 4 values per booster combination
+        :param shield_strengths: list for each hull mass with the shield strength of each loadout (see LoadOut.calculate_shield_strengths)
+        :return: best result as TestResult for each hull mass. The loadouts keep the shield strength of the ship's own hull mass.
+                 Loadouts with a shield strength of 0 are skipped, the result is TestResult(survival_time=0) if no loadout is left
+        """
+        # best_survival_time, lowest_dps, best_loadout, best_shield_booster_loadout, best_hitpoints
+        states = [[0, 10000, 0, None, 0] for _ in shield_strengths]
+        damage_effectiveness = test_case.damage_effectiveness
+        explosive_dps = test_case.explosive_dps
+        kinetic_dps = test_case.kinetic_dps
+        thermal_dps = test_case.thermal_dps
+        absolute_dps = test_case.absolute_dps
+        scb_hitpoints = test_case.scb_hitpoints
+        guardian_hitpoints = test_case.guardian_hitpoints
+        loadouts = list(zip(test_case.loadout_list, zip(*shield_strengths)))  # loadout and its shield strength for each mass
+
+        for i, booster_combination in enumerate(booster_combinations):
+            boosters = [test_case.shield_booster_variants[x] for x in booster_combination]
+            if booster_bonuses is not None:
+                exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus = booster_bonuses[i * 4:i * 4 + 4]
+            else:
+                exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus = ShieldBoosterVariant.calculate_booster_bonuses(boosters)
+
+            for loadout, strengths in loadouts:
+                exp_res = (1 - loadout.shield_generator.explres) * exp_modifier
+                kin_res = (1 - loadout.shield_generator.kinres) * kin_modifier
+                therm_res = (1 - loadout.shield_generator.thermres) * therm_modifier
+                regen_rate = loadout.shield_generator.regen * (1.0 - damage_effectiveness)
+
+                actual_dps = damage_effectiveness * (
+                        explosive_dps * exp_res +
+                        kinetic_dps * kin_res +
+                        thermal_dps * therm_res +
+                        absolute_dps) - regen_rate
+
+                for shield_strength, state in zip(strengths, states):
+                    if shield_strength <= 0:
+                        continue  # hull mass is above the maximum mass of the shield generator
+                    hp = shield_strength * hitpoint_bonus
+                    survival_time = (hp + scb_hitpoints + guardian_hitpoints) / actual_dps
+
+                    # same rules as in test_case
+                    if actual_dps > 0 and state[0] >= 0:
+                        if survival_time > state[0]:
+                            state[0] = survival_time
+                            state[2] = loadout
+                            state[3] = boosters
+                            state[4] = hp
+                    elif actual_dps <= 0:
+                        if state[1] > actual_dps or (math.isclose(state[1], actual_dps, rel_tol=1e-8) and state[4] < hp):
+                            state[0] = survival_time
+                            state[1] = actual_dps
+                            state[2] = loadout
+                            state[3] = boosters
+                            state[4] = hp
+
+        results = list()
+        for best_survival_time, lowest_dps, best_loadout, best_shield_booster_loadout, best_hitpoints in states:
+            if best_shield_booster_loadout is None:
+                # no shield generator works at this hull mass
+                results.append(TestResult(survival_time=0))
+                continue
+            best_loadout = copy.copy(best_loadout)  # boosters are different for each hull mass
+            best_loadout.boosters = best_shield_booster_loadout
+            results.append(TestResult(best_loadout, best_survival_time, lowest_dps, best_hitpoints))
+        return results
+
+    @staticmethod
+    def test_scenarios(scenarios: List[TestCase], booster_combinations: List[List[int]], booster_bonuses: Optional[Sequence[float]] = None) -> List[TestResult]:
+        """
+        Run test_case for several scenarios at once. Resistances and hitpoints of each loadout and booster combination are calculated once
+        and are used for all scenarios.
+        :param scenarios: list of TestCase created by create_scenario. All scenarios must have the same loadouts and booster variants.
+        :param booster_combinations: list of lists of indexes of ShieldBoosterVariant
+        :param booster_bonuses: optional precalculated bonuses (see BoosterBonusTable), 4 values per booster combination
+        :return: best result as TestResult for each scenario
+        """
+        test_case = scenarios[0]
+        # best_survival_time, lowest_dps, best_loadout, best_shield_booster_loadout, best_hitpoints
+        states = [[0, 10000, 0, None, 0] for _ in scenarios]
+        parameters = [(s.damage_effectiveness, 1.0 - s.damage_effectiveness, s.explosive_dps, s.kinetic_dps, s.thermal_dps, s.absolute_dps,
+                       s.scb_hitpoints, s.guardian_hitpoints, states[i]) for i, s in enumerate(scenarios)]
+
+        for i, booster_combination in enumerate(booster_combinations):
+            boosters = [test_case.shield_booster_variants[x] for x in booster_combination]
+            if booster_bonuses is not None:
+                exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus = booster_bonuses[i * 4:i * 4 + 4]
+            else:
+                exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus = ShieldBoosterVariant.calculate_booster_bonuses(boosters)
+
+            for loadout in test_case.loadout_list:
+                exp_res = (1 - loadout.shield_generator.explres) * exp_modifier
+                kin_res = (1 - loadout.shield_generator.kinres) * kin_modifier
+                therm_res = (1 - loadout.shield_generator.thermres) * therm_modifier
+                hp = loadout.shield_strength * hitpoint_bonus
+                regen = loadout.shield_generator.regen
+
+                for damage_effectiveness, regen_factor, explosive_dps, kinetic_dps, thermal_dps, absolute_dps, scb_hitpoints, guardian_hitpoints, state \
+                        in parameters:
+                    actual_dps = damage_effectiveness * (
+                            explosive_dps * exp_res +
+                            kinetic_dps * kin_res +
+                            thermal_dps * therm_res +
+                            absolute_dps) - regen * regen_factor
+
+                    survival_time = (hp + scb_hitpoints + guardian_hitpoints) / actual_dps
+
+                    # same rules as in test_case
+                    if actual_dps > 0 and state[0] >= 0:
+                        if survival_time > state[0]:
+                            state[0] = survival_time
+                            state[2] = loadout
+                            state[3] = boosters
+                            state[4] = hp
+                    elif actual_dps <= 0:
+                        if state[1] > actual_dps or (math.isclose(state[1], actual_dps, rel_tol=1e-8) and state[4] < hp):
+                            state[0] = survival_time
+                            state[1] = actual_dps
+                            state[2] = loadout
+                            state[3] = boosters
+                            state[4] = hp
+
+        results = list()
+        for best_survival_time, lowest_dps, best_loadout, best_shield_booster_loadout, best_hitpoints in states:
+            best_loadout = copy.copy(best_loadout)  # boosters are different for each scenario
+            best_loadout.boosters = best_shield_booster_loadout
+            results.append(TestResult(best_loadout, best_survival_time, lowest_dps, best_hitpoints))
+        return results
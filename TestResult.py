@@ -1,3 +1,7 @@
+import functools
+import math
+from typing import Any, Dict, Optional, List, Tuple
+
 from .LoadOut import LoadOut
 from .Utility import Utility
 
@@ -8,6 +12,53 @@ class TestResult:
         self.survival_time = survival_time  # if negative, the ship didn't die
         self.incoming_dps = incoming_dps  # if negative, the ship didn't die
         self.total_hitpoints = total_hitpoints  # shield HP without guardian and SCBs
+        self.search_statistics = None  # type: Optional[Dict[str, int]] # set by searches that don't test every combination
+        self.instrumentation = None  # type: Optional["Instrumentation"] # set by ShieldTester.compute() if instrumentation was requested
+        self.search_finished = True  # False if the time budget of ShieldTester.compute() ran out before all loadouts were tested
+        self.coverage = 1.0  # fraction of the loadouts that were tested
+        self.bound_filter_statistics = None  # type: Optional[Dict[str, int]] # shield generator variants before and after BoundFilter, set if quick was used
+
+    @staticmethod
+    def is_better(survival_time: float, incoming_dps: float, total_hitpoints: float,
+                  other_survival_time: float, other_incoming_dps: float, other_total_hitpoints: float) -> bool:
+        """
+        Ranking rule for results: a ship that doesn't die beats one that dies. If both die, longer survival time wins.
+        If both don't die, lower incoming dps wins and more hitpoints win if the incoming dps is (almost) the same.
+        :return: True if the first result is better than the other one
+        """
+        if other_survival_time < 0:
+            # other ship didn't die
+            return other_incoming_dps > incoming_dps or (math.isclose(other_incoming_dps, incoming_dps, rel_tol=1e-8) and other_total_hitpoints < total_hitpoints)
+        return survival_time < 0 or survival_time > other_survival_time
+
+    def is_better_than(self, other: "TestResult") -> bool:
+        return TestResult.is_better(self.survival_time, self.incoming_dps, self.total_hitpoints,
+                                    other.survival_time, other.incoming_dps, other.total_hitpoints)
+
+    @staticmethod
+    def compare_ranking(a: Tuple[float, float, float, int], b: Tuple[float, float, float, int]) -> int:
+        """
+        Comparison function for ranking tuples (survival_time, incoming_dps, total_hitpoints, order).
+        Results that are equally good are ranked by order (lower first), i.e. the order in which they were tested.
+        :return: negative value if a ranks before b, positive value if b ranks before a
+        """
+        if TestResult.is_better(a[0], a[1], a[2], b[0], b[1], b[2]):
+            return -1
+        if TestResult.is_better(b[0], b[1], b[2], a[0], a[1], a[2]):
+            return 1
+        return (a[3] > b[3]) - (a[3] < b[3])
+
+    @staticmethod
+    def merge_rankings(rankings: List[List["TestResult"]], top_k: int) -> List["TestResult"]:
+        """
+        Merge ranked lists of results. Lists have to be provided in the order they were tested in.
+        :param rankings: ranked lists (best first)
+        :param top_k: maximum length of the merged list
+        :return: merged list of the best results (best first)
+        """
+        entries = [(r.survival_time, r.incoming_dps, r.total_hitpoints, (i, j), r) for i, ranking in enumerate(rankings) for j, r in enumerate(ranking)]
+        entries.sort(key=functools.cmp_to_key(TestResult.compare_ranking))
+        return [entry[4] for entry in entries[:top_k]]
 
     def get_output_string(self, guardian_hitpoints: int = 0):
         """
@@ -48,3 +99,23 @@ class TestResult:
         else:
             output.append("No test results. Please change DPS and/or damage effectiveness.")
         return Utility.format_output_string(output)
+
+    def get_log_record(self) -> Dict[str, Any]:
+        """
+        Get the test result as dictionary for a structured log (see ResultLog)
+        :return: dictionary with ship, shield generator, boosters, survival time, incoming dps and shield hitpoints
+        """
+        if not self.loadout or not self.loadout.shield_generator:
+            return {"survival_time": self.survival_time, "incoming_dps": self.incoming_dps}
+        shield_generator = self.loadout.shield_generator
+        ship = self.loadout.ship
+        return {"ship": ship.name if ship else "",
+                "custom_name": ship.custom_name if ship else "",
+                "shield_generator": {"name": shield_generator.name,
+                                     "class": shield_generator.module_class,
+                                     "engineering": shield_generator.engineered_name,
+                                     "experimental": shield_generator.experimental_name},
+                "boosters": [{"engineering": booster.engineering, "experimental": booster.experimental} for booster in self.loadout.boosters or ()],
+                "survival_time": self.survival_time,
+                "incoming_dps": self.incoming_dps,
+                "total_hitpoints": self.total_hitpoints}
@@ -1,8 +1,10 @@
 import base64
 import gzip
+import hashlib
 import json
+import os
 import urllib.request
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Tuple
 
 
 class Utility(object):
@@ -54,16 +56,7 @@ class Utility(object):
         try:
             lines = s.split("\n")
             for line in lines:
-                if line.startswith("{"):
-                    # could be json
-                    r.append(json.loads(line))
-                else:
-                    if line.startswith("https://"):
-                        text = line.split("=")[1]
-                    else:
-                        # maybe someone removed the first part of the URLs and left the compressed loadout event
-                        text = line
-                    r.append(json.loads(gzip.decompress(base64.b64decode(urllib.request.unquote_to_bytes(text))).decode("utf-8")))
+                r.append(Utility.decode_loadout_line(line))
         except Exception:
             pass
 
@@ -71,6 +64,40 @@ class Utility(object):
             raise RuntimeError("Not a valid import. See readme for further details.")
         return r
 
+    @staticmethod
+    def decode_loadout_line(line: str) -> Dict[str, Any]:
+        """
+        Decode a line with a loadout event as json, a Coriolis or EDSY URL or the compressed loadout event of such an URL.
+        :param line: one line without line break
+        :return: dictionary of the loadout event
+        """
+        if line.startswith("{"):
+            # could be json
+            return json.loads(line)
+        if line.startswith("https://"):
+            text = line.split("=")[1]
+        else:
+            # maybe someone removed the first part of the URLs and left the compressed loadout event
+            text = line
+        return json.loads(gzip.decompress(base64.b64decode(urllib.request.unquote_to_bytes(text))).decode("utf-8"))
+
+    # noinspection PyBroadException
+    @staticmethod
+    def decode_import_line(line: str) -> Tuple[List[Dict[str, Any]], str]:
+        """
+        Decode a line of a batch import (see ShieldTester.import_loadouts()). Errors are returned instead of raised so lines can be decoded
+        by worker processes.
+        :param line: loadout event, SLEF (in one line), URL or compressed loadout event
+        :return: tuple (loadout events, error message). SLEF can contain several loadouts, its "data" nodes are returned
+        """
+        try:
+            line = line.strip()
+            j = json.loads(line) if line.startswith("[") else Utility.decode_loadout_line(line)
+            loadouts = [j] if type(j) == dict else list(j)
+            return [loadout["data"] if "Ship" not in loadout and type(loadout.get("data")) == dict else loadout for loadout in loadouts], ""
+        except Exception as e:
+            return list(), f"Could not decode entry: {type(e).__name__}: {e}"
+
     @staticmethod
     def create_export_url(d: Dict[str, Any], url: str) -> str:
         loadout_gzip = gzip.compress(json.dumps(d).encode("utf-8"))
@@ -80,3 +107,50 @@ class Utility(object):
     @staticmethod
     def create_slef_data(d: Dict[str, Any], url: str) -> Dict[str, Any]:
         return d
+
+    @staticmethod
+    def get_file_hash(file: str) -> str:
+        """
+        Calculate the SHA-256 hash of a file's contents.
+        :param file: path to file
+        :return: hex digest
+        """
+        h = hashlib.sha256()
+        with open(file, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        return h.hexdigest()
+
+    @staticmethod
+    def prune_files(directory: str, prefix: str, max_bytes: int, keep: str = "") -> int:
+        """
+        Remove the least recently modified files starting with prefix until these files need at most max_bytes.
+        :param directory: directory containing the files
+        :param prefix: only files with this prefix are counted and removed
+        :param max_bytes: maximum size of all files with the prefix
+        :param keep: name of a file that is never removed (e.g. the one that was just saved)
+        :return: number of removed files
+        """
+        files = list()
+        try:
+            for entry in os.scandir(directory):
+                if entry.name.startswith(prefix) and entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+        except OSError:
+            return 0
+
+        total_size = sum(size for _, _, size in files)
+        removed = 0
+        for _, name, size in sorted(files):
+            if total_size <= max_bytes:
+                break
+            if name == keep:
+                continue
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                continue
+            total_size -= size
+            removed += 1
+        return removed
@@ -0,0 +1,303 @@
+from __future__ import annotations
+
+import copy
+import functools
+import math
+from typing import List, Tuple, Sequence, Optional
+
+from .LoadOut import LoadOut
+from .ShieldBoosterVariant import ShieldBoosterVariant
+from .TestResult import TestResult
+
+try:
+    # noinspection PyUnresolvedReferences
+    import numpy as np
+    _numpy_imported = True
+except ImportError:
+    _numpy_imported = False
+
+
+class VectorizedEngine(object):
+    """
+    NumPy implementation of TestCase.test_case. All loadouts and all booster combinations of a chunk are evaluated as one grid.
+    The arithmetic is done in the same order as in TestCase.test_case so both engines produce identical numbers.
+    """
+    # loadout matrix columns
+    COL_EXP = 0
+    COL_KIN = 1
+    COL_THERM = 2
+    COL_REGEN = 3
+    COL_HP = 4
+
+    # candidates for the "didn't die" tie-breaking have to be this close to the lowest dps (relative)
+    # the scalar rule uses math.isclose with rel_tol=1e-8, this leaves plenty of room for chained ties
+    SURVIVED_CANDIDATE_TOLERANCE = 1e-6
+
+    @staticmethod
+    def is_available() -> bool:
+        return _numpy_imported
+
+    @staticmethod
+    def pack_loadouts(loadout_list: List[LoadOut]) -> "np.ndarray":
+        """
+        Pack the stats of all loadouts that are used by the tests into a matrix.
+        :param loadout_list: list of LoadOut
+        :return: matrix of shape (len(loadout_list), 5). Use the COL_ constants to access the columns
+        """
+        matrix = np.empty((len(loadout_list), 5), dtype=np.float64)
+        for i, loadout in enumerate(loadout_list):
+            matrix[i, VectorizedEngine.COL_EXP] = 1 - loadout.shield_generator.explres
+            matrix[i, VectorizedEngine.COL_KIN] = 1 - loadout.shield_generator.kinres
+            matrix[i, VectorizedEngine.COL_THERM] = 1 - loadout.shield_generator.thermres
+            matrix[i, VectorizedEngine.COL_REGEN] = loadout.shield_generator.regen
+            matrix[i, VectorizedEngine.COL_HP] = loadout.shield_strength
+        return matrix
+
+    @staticmethod
+    def pack_booster_bonuses(shield_booster_variants: List[ShieldBoosterVariant], booster_combinations: Sequence[Sequence[int]]) -> "np.ndarray":
+        """
+        Calculate the booster bonuses of all combinations at once. Same results as ShieldBoosterVariant.calculate_booster_bonuses.
+        :param shield_booster_variants: list of ShieldBoosterVariant
+        :param booster_combinations: list of lists of indexes of ShieldBoosterVariant. All combinations must have the same length.
+        :return: matrix of shape (len(booster_combinations), 4) with the columns exp_modifier, kin_modifier, therm_modifier, hitpoint_bonus
+        """
+        variants = np.array([(b.exp_res_bonus, b.kin_res_bonus, b.therm_res_bonus, b.shield_strength_bonus) for b in shield_booster_variants],
+                            dtype=np.float64).reshape(-1, 4)
+        number_of_boosters = len(booster_combinations[0]) if len(booster_combinations) > 0 else 0
+        combinations = np.array(booster_combinations, dtype=np.intp).reshape(len(booster_combinations), number_of_boosters)
+
+        bonuses = np.ones((len(booster_combinations), 4), dtype=np.float64)
+        # multiply one booster after the other to keep the same rounding as the scalar version
+        for j in range(number_of_boosters):
+            booster = variants[combinations[:, j]]
+            bonuses[:, 0:3] *= booster[:, 0:3]
+            bonuses[:, 3] += booster[:, 3]
+
+        # Compensate for diminishing returns
+        resistances = bonuses[:, 0:3]
+        bonuses[:, 0:3] = np.where(resistances < 0.7, 0.7 - (0.7 - resistances) / 2, resistances)
+        return bonuses
+
+    @staticmethod
+    def evaluate_resistances(loadouts: "np.ndarray", bonuses: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Calculate the part of the grid that doesn't depend on the damage: resistances and hitpoints of all booster combinations (rows) and loadouts (columns).
+        :param loadouts: matrix from pack_loadouts
+        :param bonuses: matrix from pack_booster_bonuses
+        :return: tuple: exp_res, kin_res, therm_res, hitpoints. Each of shape (len(bonuses), len(loadouts))
+        """
+        exp_res = loadouts[None, :, VectorizedEngine.COL_EXP] * bonuses[:, 0, None]
+        kin_res = loadouts[None, :, VectorizedEngine.COL_KIN] * bonuses[:, 1, None]
+        therm_res = loadouts[None, :, VectorizedEngine.COL_THERM] * bonuses[:, 2, None]
+        hp = loadouts[None, :, VectorizedEngine.COL_HP] * bonuses[:, 3, None]
+        return exp_res, kin_res, therm_res, hp
+
+    @staticmethod
+    def evaluate_damage(test_case, loadouts: "np.ndarray", resistances: Tuple["np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"]) \
+            -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Apply the damage of a TestCase to the grid from evaluate_resistances.
+        :return: tuple: survival_time, actual_dps, hitpoints
+        """
+        exp_res, kin_res, therm_res, hp = resistances
+        damage_effectiveness = test_case.damage_effectiveness
+        regen_rate = loadouts[:, VectorizedEngine.COL_REGEN] * (1.0 - damage_effectiveness)
+
+        actual_dps = damage_effectiveness * (
+                test_case.explosive_dps * exp_res +
+                test_case.kinetic_dps * kin_res +
+                test_case.thermal_dps * therm_res +
+                test_case.absolute_dps) - regen_rate[None, :]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            survival_time = (hp + test_case.scb_hitpoints + test_case.guardian_hitpoints) / actual_dps
+        return survival_time, actual_dps, hp
+
+    @staticmethod
+    def evaluate(test_case, loadouts: "np.ndarray", bonuses: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+        """
+        Calculate the grid of all booster combinations (rows) and loadouts (columns).
+        :param test_case: TestCase containing test setup
+        :param loadouts: matrix from pack_loadouts
+        :param bonuses: matrix from pack_booster_bonuses
+        :return: tuple: survival_time, actual_dps, hitpoints. Each of shape (len(bonuses), len(loadouts))
+        """
+        return VectorizedEngine.evaluate_damage(test_case, loadouts, VectorizedEngine.evaluate_resistances(loadouts, bonuses))
+
+    @staticmethod
+    def find_best(survival_time: "np.ndarray", actual_dps: "np.ndarray", hp: "np.ndarray") -> Tuple[int, float, float, float]:
+        """
+        Find the best entry of a grid using the same rules as TestCase.test_case. The grid is traversed in row-major order,
+        which is the order TestCase.test_case uses (booster combinations in the outer loop, loadouts in the inner loop).
+        :return: tuple: flat index, survival_time, lowest_dps, hitpoints
+        """
+        survival_time = survival_time.ravel()
+        actual_dps = actual_dps.ravel()
+        hp = hp.ravel()
+
+        survived = actual_dps <= 0
+        if survived.any():
+            # ship didn't die: lowest dps wins and hitpoints decide if the dps is (almost) the same.
+            # The rule depends on the order of evaluation, so run it on the few entries close to the minimum.
+            min_dps = actual_dps[survived].min()
+            threshold = min_dps + abs(min_dps) * VectorizedEngine.SURVIVED_CANDIDATE_TOLERANCE
+            candidates = np.flatnonzero(survived & (actual_dps <= threshold))
+
+            best_index = 0
+            lowest_dps = 10000
+            best_hitpoints = 0
+            for i in candidates.tolist():
+                dps = float(actual_dps[i])
+                hitpoints = float(hp[i])
+                if lowest_dps > dps or (math.isclose(lowest_dps, dps, rel_tol=1e-8) and best_hitpoints < hitpoints):
+                    best_index = i
+                    lowest_dps = dps
+                    best_hitpoints = hitpoints
+            return best_index, float(survival_time[best_index]), lowest_dps, best_hitpoints
+
+        # argmax returns the first occurrence which matches the strict comparison of the scalar loop
+        best_index = int(np.argmax(survival_time))
+        return best_index, float(survival_time[best_index]), 10000, float(hp[best_index])
+
+    @staticmethod
+    def _create_result(test_case, booster_combinations: List[List[int]], index: int, survival_time: float, incoming_dps: float, hitpoints: float) -> TestResult:
+        """
+        Create a TestResult for a flat index of the grid.
+        """
+        combination_index, loadout_index = divmod(index, len(test_case.loadout_list))
+        loadout = copy.copy(test_case.loadout_list[loadout_index])  # boosters are different for each result
+        loadout.boosters = [test_case.shield_booster_variants[x] for x in booster_combinations[combination_index]]
+        return TestResult(loadout, survival_time, incoming_dps, hitpoints)
+
+    @staticmethod
+    def _get_bonuses(test_case, booster_combinations: List[List[int]], booster_bonuses: Optional[Sequence[float]]) -> "np.ndarray":
+        if booster_bonuses is not None:
+            return np.asarray(booster_bonuses, dtype=np.float64).reshape(-1, 4)
+        return VectorizedEngine.pack_booster_bonuses(test_case.shield_booster_variants, booster_combinations)
+
+    @staticmethod
+    def test_case(test_case, booster_combinations: List[List[int]], booster_bonuses: Optional[Sequence[float]] = None) -> TestResult:
+        """
+        Run a particular test based on provided TestCase and booster combinations. Drop-in replacement for TestCase.test_case.
+        :param test_case: TestCase containing test setup
+        :param booster_combinations: list of lists of indexes of ShieldBoosterVariant
+        :param booster_bonuses: optional precalculated bonuses (see BoosterBonusTable), 4 values per booster combination
+        :return: best result as TestResult
+        """
+        loadouts = VectorizedEngine.pack_loadouts(test_case.loadout_list)
+        bonuses = VectorizedEngine._get_bonuses(test_case, booster_combinations, booster_bonuses)
+        survival_time, actual_dps, hp = VectorizedEngine.evaluate(test_case, loadouts, bonuses)
+        best_index, best_survival_time, lowest_dps, best_hitpoints = VectorizedEngine.find_best(survival_time, actual_dps, hp)
+        return VectorizedEngine._create_result(test_case, booster_combinations, best_index, best_survival_time, lowest_dps, best_hitpoints)
+
+    @staticmethod
+    def find_top_k(survival_time: "np.ndarray", actual_dps: "np.ndarray", hp: "np.ndarray", top_k: int) -> List[int]:
+        """
+        Find the best top_k entries of a grid using the ranking rules of TestResult.
+        :return: list of flat indexes, best first
+        """
+        survival_time = survival_time.ravel()
+        actual_dps = actual_dps.ravel()
+        hp = hp.ravel()
+
+        # candidates: every entry that might be within the best top_k, the exact order is determined afterwards
+        survived = np.flatnonzero(actual_dps <= 0)
+        if len(survived) > top_k:
+            threshold = np.partition(actual_dps[survived], top_k - 1)[top_k - 1]
+            threshold += abs(threshold) * VectorizedEngine.SURVIVED_CANDIDATE_TOLERANCE
+            candidates = survived[actual_dps[survived] <= threshold]
+        else:
+            candidates = survived
+            missing = top_k - len(survived)
+            died = np.flatnonzero(actual_dps > 0)
+            if missing > 0 and len(died) > 0:
+                if len(died) > missing:
+                    threshold = np.partition(survival_time[died], len(died) - missing)[len(died) - missing]
+                    died = died[survival_time[died] >= threshold]
+                candidates = np.concatenate((candidates, died))
+
+        entries = [(float(survival_time[i]), float(actual_dps[i]), float(hp[i]), i) for i in candidates.tolist()]
+        entries.sort(key=functools.cmp_to_key(TestResult.compare_ranking))
+        return [entry[3] for entry in entries[:top_k]]
+
+    @staticmethod
+    def test_case_top_k(test_case, booster_combinations: List[List[int]], booster_bonuses: Optional[Sequence[float]] = None,
+                        top_k: int = 1) -> List[TestResult]:
+        """
+        Drop-in replacement for TestCase.test_case_top_k.
+        :param test_case: TestCase containing test setup
+        :param booster_combinations: list of lists of indexes of ShieldBoosterVariant
+        :param booster_bonuses: optional precalculated bonuses (see BoosterBonusTable), 4 values per booster combination
+        :param top_k: number of results to keep
+        :return: list of TestResult, best first
+        """
+        loadouts = VectorizedEngine.pack_loadouts(test_case.loadout_list)
+        bonuses = VectorizedEngine._get_bonuses(test_case, booster_combinations, booster_bonuses)
+        survival_time, actual_dps, hp = VectorizedEngine.evaluate(test_case, loadouts, bonuses)
+
+        results = list()
+        for index in VectorizedEngine.find_top_k(survival_time, actual_dps, hp, top_k):
+            survival = float(survival_time.flat[index])
+            # same as test_case: incoming dps is only reported if the ship didn't die
+            results.append(VectorizedEngine._create_result(test_case, booster_combinations, index, survival,
+                                                           float(actual_dps.flat[index]) if survival < 0 else 10000, float(hp.flat[index])))
+        return results
+
+    @staticmethod
+    def test_scenarios(scenarios: List, booster_combinations: List[List[int]], booster_bonuses: Optional[Sequence[float]] = None) -> List[TestResult]:
+        """
+        Drop-in replacement for TestCase.test_scenarios. Resistances and hitpoints are calculated once for all scenarios.
+        :param scenarios: list of TestCase created by TestCase.create_scenario
+        :param booster_combinations: list of lists of indexes of ShieldBoosterVariant
+        :param booster_bonuses: optional precalculated bonuses (see BoosterBonusTable), 4 values per booster combination
+        :return: best result as TestResult for each scenario
+        """
+        test_case = scenarios[0]
+        loadouts = VectorizedEngine.pack_loadouts(test_case.loadout_list)
+        resistances = VectorizedEngine.evaluate_resistances(loadouts, VectorizedEngine._get_bonuses(test_case, booster_combinations, booster_bonuses))
+
+        results = list()
+        for scenario in scenarios:
+            survival_time, actual_dps, hp = VectorizedEngine.evaluate_damage(scenario, loadouts, resistances)
+            best_index, best_survival_time, lowest_dps, best_hitpoints = VectorizedEngine.find_best(survival_time, actual_dps, hp)
+            results.append(VectorizedEngine._create_result(test_case, booster_combinations, best_index, best_survival_time, lowest_dps, best_hitpoints))
+        return results
+
+    @staticmethod
+    def test_hull_masses(test_case, booster_combinations: List[List[int]], booster_bonuses: Optional[Sequence[float]] = None,
+                         shield_strengths: Sequence[Sequence[float]] = ()) -> List[TestResult]:
+        """
+        Drop-in replacement for TestCase.test_hull_masses. Resistances and incoming dps are calculated once for all hull masses.
+        :param test_case: TestCase containing test setup
+        :param booster_combinations: list of lists of indexes of ShieldBoosterVariant
+        :param booster_bonuses: optional precalculated bonuses (see BoosterBonusTable), 4 values per booster combination
+        :param shield_strengths: list for each hull mass with the shield strength of each loadout (see LoadOut.calculate_shield_strengths)
+        :return: best result as TestResult for each hull mass, TestResult(survival_time=0) if no loadout has shields at that mass
+        """
+        loadouts = VectorizedEngine.pack_loadouts(test_case.loadout_list)
+        bonuses = VectorizedEngine._get_bonuses(test_case, booster_combinations, booster_bonuses)
+        exp_res, kin_res, therm_res, _ = VectorizedEngine.evaluate_resistances(loadouts, bonuses)
+
+        results = list()
+        actual_dps = None
+        for strengths in shield_strengths:
+            hp = np.asarray(strengths, dtype=np.float64)[None, :] * bonuses[:, 3, None]
+            if actual_dps is None:
+                survival_time, actual_dps, hp = VectorizedEngine.evaluate_damage(test_case, loadouts, (exp_res, kin_res, therm_res, hp))
+            else:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    survival_time = (hp + test_case.scb_hitpoints + test_case.guardian_hitpoints) / actual_dps
+
+            # like TestCase.test_hull_masses, loadouts without shields at this mass are skipped
+            valid = np.flatnonzero(np.asarray(strengths, dtype=np.float64) > 0)
+            if len(valid) == 0:
+                results.append(TestResult(survival_time=0))
+                continue
+            valid_dps = actual_dps
+            if len(valid) < len(test_case.loadout_list):
+                survival_time, valid_dps, hp = survival_time[:, valid], actual_dps[:, valid], hp[:, valid]
+            best_index, best_survival_time, lowest_dps, best_hitpoints = VectorizedEngine.find_best(survival_time, valid_dps, hp)
+            combination_index, column = divmod(best_index, len(valid))
+            best_index = combination_index * len(test_case.loadout_list) + int(valid[column])
+            results.append(VectorizedEngine._create_result(test_case, booster_combinations, best_index, best_survival_time, lowest_dps, best_hitpoints))
+        return results
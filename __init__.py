@@ -1,10 +1,30 @@
 from .Utility import Utility
+from .AsyncQueue import AsyncQueue
 from .StarShip import StarShip
+from .BoosterBonusTable import BoosterBonusTable
+from .BranchAndBound import BranchAndBound
+from .ChunkScheduler import ChunkScheduler
+from .CombinationRange import CombinationRange
+from .CompiledData import CompiledData
 from .ShieldBoosterVariant import ShieldBoosterVariant
 from .ShieldGenerator import ShieldGenerator
+from .DominanceFilter import DominanceFilter
+from .BoundFilter import BoundFilter
+from .HullMassResult import HullMassResult
+from .ImportResult import ImportResult
+from .Instrumentation import Instrumentation
 from .TestCase import TestCase
 from .LoadOut import LoadOut
+from .ProgressEvent import ProgressEvent
 from .TestResult import TestResult
+from .VectorizedEngine import VectorizedEngine
+from .ResultCache import ResultCache
+from .ResultGrid import ResultGrid
+from .ResultLog import ResultLog
+from .SweepResult import SweepResult
+from .SyntheticData import SyntheticData
+from .SharedTestData import SharedTestData
 from .ShieldTester import ShieldTester
+from .JournalWatcher import JournalWatcher
 
-__all__ = "LoadOut", "ShieldBoosterVariant", "ShieldGenerator", "ShieldTester", "StarShip", "TestCase", "TestResult", "Utility"
+__all__ = "AsyncQueue", "BoosterBonusTable", "BoundFilter", "BranchAndBound", "ChunkScheduler", "CombinationRange", "CompiledData", "DominanceFilter", "HullMassResult", "ImportResult", "Instrumentation", "JournalWatcher", "LoadOut", "ProgressEvent", "ResultCache", "ResultGrid", "ResultLog", "SharedTestData", "ShieldBoosterVariant", "ShieldGenerator", "ShieldTester", "StarShip", "SweepResult", "SyntheticData", "TestCase", "TestResult", "Utility", "VectorizedEngine"
@@ -0,0 +1,45 @@
+import importlib.util
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data.json")  # created with SyntheticData.write()
+
+# the repository is the package, load it under its import name
+if "shield_tester" not in sys.modules:
+    _spec = importlib.util.spec_from_file_location("shield_tester", os.path.join(ROOT, "__init__.py"), submodule_search_locations=[ROOT])
+    _module = importlib.util.module_from_spec(_spec)
+    sys.modules["shield_tester"] = _module
+    _spec.loader.exec_module(_module)
+
+import shield_tester as st
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    # the cache directory is created next to the data file
+    path = str(tmp_path / "data.json")
+    shutil.copyfile(DATA_FILE, path)
+    return path
+
+
+@pytest.fixture
+def tester(data_file):
+    tester = st.ShieldTester()
+    tester.load_data(data_file)
+    tester.cpu_cores = 1
+    yield tester
+    tester.shutdown()
+
+
+@pytest.fixture
+def mp_tester(tester, monkeypatch):
+    # use the worker pool for small workloads, even if there is only one core
+    monkeypatch.setattr(os, "cpu_count", lambda: 2)
+    monkeypatch.setattr(st.ShieldTester, "MP_MIN_WORKLOAD", 0)
+    monkeypatch.setattr(st.ShieldTester, "MP_CHUNK_SIZE", 10)
+    tester.cpu_cores = 2
+    return tester
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+import shield_tester as st
+
+
+def create_test_case(tester, number_of_boosters=2):
+    test_case = tester.select_ship("Synthetic Ship 5")
+    test_case.number_of_boosters_to_test = number_of_boosters
+    test_case.kinetic_dps = 70
+    test_case.thermal_dps = 50
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return test_case
+
+
+def test_compute_async(tester):
+    test_case = create_test_case(tester)
+    expected = tester.compute(test_case, use_cache=False)
+
+    async def run():
+        progress_queue = st.AsyncQueue()
+        task = asyncio.ensure_future(tester.compute_async(test_case, progress_queue=progress_queue, use_cache=False))
+        events = [event async for event in progress_queue]
+        return await task, events
+
+    result, events = asyncio.run(run())
+    assert result.survival_time == pytest.approx(expected.survival_time)
+    assert events and events[-1].done and events[-1].items_done == events[-1].items_total
+
+
+def test_calls_run_one_after_the_other(tester):
+    test_case = create_test_case(tester)
+
+    async def run():
+        return await asyncio.gather(tester.compute_async(test_case, use_cache=False),
+                                    tester.sweep_async(test_case, {"kinetic_dps": [0, 100]}),
+                                    tester.compute_fleet_async(["Synthetic Ship 2"], damage={"kinetic_dps": 70}, use_cache=False))
+
+    result, sweep, fleet = asyncio.run(run())
+    assert result.survival_time == pytest.approx(tester.compute(test_case, use_cache=False).survival_time)
+    assert len(sweep) == 2 and len(fleet) == 1
+
+
+def test_cancel_running_and_waiting_calls(tester, monkeypatch):
+    monkeypatch.setattr(st.ShieldTester, "MP_CHUNK_SIZE", 10)
+    test_case = create_test_case(tester, 4)
+
+    async def run():
+        progress_queue = st.AsyncQueue()
+        running = asyncio.ensure_future(tester.compute_async(test_case, progress_queue=progress_queue, use_cache=False))
+        waiting = asyncio.ensure_future(tester.compute_async(test_case, use_cache=False))
+        async for _ in progress_queue:
+            running.cancel()
+            waiting.cancel()
+            break
+        for task in (running, waiting):
+            with pytest.raises(asyncio.CancelledError):
+                await task
+        # the next call isn't affected
+        return await tester.compute_async(create_test_case(tester), use_cache=False)
+
+    result = asyncio.run(run())
+    assert result.survival_time == pytest.approx(tester.compute(create_test_case(tester), use_cache=False).survival_time)
+
+
+def test_async_queue_needs_an_async_call():
+    with pytest.raises(RuntimeError):
+        st.AsyncQueue().put(1)
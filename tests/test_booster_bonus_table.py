@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+import shield_tester as st
+
+
+def get_saved_tables(tester):
+    return [name for name in os.listdir(tester.cache_directory) if name.startswith(st.BoosterBonusTable.FILE_PREFIX)]
+
+
+def test_table_matches_booster_bonuses(tester, data_file):
+    variants = tester.select_ship("Synthetic Ship 0").shield_booster_variants
+    table = tester.get_booster_bonus_table(variants, 3)
+    assert len(table) == st.BoosterBonusTable.count_combinations(len(variants), 3)
+    for index, combination in enumerate(table.combinations):
+        assert table.get_bonuses(index) == pytest.approx(st.ShieldBoosterVariant.calculate_booster_bonuses(variants, list(combination)))
+
+    # a new tester loads the saved table
+    other = st.ShieldTester()
+    other.load_data(data_file)
+    loaded = st.BoosterBonusTable.load(other.cache_directory, variants, 3, table.data_hash)
+    assert loaded is not None and list(loaded.bonuses) == list(table.bonuses)
+
+
+def test_tables_are_bounded(tester, monkeypatch):
+    variants = tester.select_ship("Synthetic Ship 0").shield_booster_variants
+    first = tester.get_booster_bonus_table(variants, 3)
+    assert tester.get_booster_bonus_table(variants, 3) is first
+    monkeypatch.setattr(st.ShieldTester, "BOOSTER_BONUS_TABLES_MAX_BYTES", first.nbytes)
+    monkeypatch.setattr(st.ShieldTester, "BOOSTER_BONUS_TABLES_MAX_DISK_BYTES", first.nbytes * 2)
+
+    # filtered variants create new tables, only the most recently used ones are kept
+    for i in range(1, 4):
+        table = tester.get_booster_bonus_table(variants[i:], 3)
+        assert tester.get_booster_bonus_table(variants[i:], 3) is table
+    assert tester.get_booster_bonus_table(variants, 3) is not first
+    saved = get_saved_tables(tester)
+    assert os.path.basename(st.BoosterBonusTable.get_file_path(tester.cache_directory, first.key)) in saved
+    assert sum(os.path.getsize(os.path.join(tester.cache_directory, name)) for name in saved) <= first.nbytes * 2
+
+
+def test_prune_removes_least_recently_used(tmp_path, tester):
+    directory = str(tmp_path / "tables")
+    os.mkdir(directory)
+    variants = tester.select_ship("Synthetic Ship 0").shield_booster_variants
+    tables = [st.BoosterBonusTable.create(variants, number_of_boosters) for number_of_boosters in range(1, 4)]
+    sizes = list()
+    for i, table in enumerate(tables):
+        table.save(directory)
+        path = st.BoosterBonusTable.get_file_path(directory, table.key)
+        os.utime(path, (1000 + i, 1000 + i))
+        sizes.append(os.path.getsize(path))
+
+    # the oldest table is kept, so the second one is removed
+    assert st.BoosterBonusTable.prune(directory, sizes[0] + sizes[2], keep=tables[0].key) == 1
+    assert not os.path.exists(st.BoosterBonusTable.get_file_path(directory, tables[1].key))
+    assert st.BoosterBonusTable.prune(directory, 0, keep=tables[0].key) == 1
+    assert os.listdir(directory) == [os.path.basename(st.BoosterBonusTable.get_file_path(directory, tables[0].key))]
@@ -0,0 +1,28 @@
+import pytest
+
+import shield_tester as st
+
+SCENARIOS = [{"kinetic_dps": 100, "thermal_dps": 50, "damage_effectiveness": 0.6},
+             {"explosive_dps": 5, "damage_effectiveness": 0.1},  # shields regenerate faster than the damage
+             {"thermal_dps": 80, "absolute_dps": 30, "damage_effectiveness": 0.9, "scb_hitpoints": 500}]
+
+
+@pytest.mark.parametrize("scenario", SCENARIOS)
+@pytest.mark.parametrize("number_of_boosters", [0, 1, 3, 4])
+def test_branch_and_bound_finds_same_result(tester, number_of_boosters, scenario):
+    test_case = tester.select_ship("Synthetic Ship 4")
+    test_case.number_of_boosters_to_test = number_of_boosters
+    for name, value in scenario.items():
+        setattr(test_case, name, value)
+    tester.set_boosters_to_test(test_case, short_list=False)
+
+    expected = tester.compute(test_case, search=st.ShieldTester.SEARCH_EXHAUSTIVE)
+    result = tester.compute(test_case, search=st.ShieldTester.SEARCH_BRANCH_AND_BOUND)
+    assert result.survival_time == pytest.approx(expected.survival_time)
+    assert result.incoming_dps == pytest.approx(expected.incoming_dps)
+    assert result.total_hitpoints == pytest.approx(expected.total_hitpoints)
+    assert len(result.loadout.boosters) == len(expected.loadout.boosters)
+
+    statistics = result.search_statistics
+    assert statistics["loadouts_evaluated"] <= len(test_case.loadout_list) * st.BoosterBonusTable.count_combinations(
+        len(test_case.shield_booster_variants), len(expected.loadout.boosters))
@@ -0,0 +1,29 @@
+import itertools
+import pickle
+
+import pytest
+
+import shield_tester as st
+
+
+@pytest.mark.parametrize("number_of_variants, number_of_boosters", [(1, 0), (1, 3), (5, 1), (6, 3), (4, 5)])
+def test_range_matches_itertools(number_of_variants, number_of_boosters):
+    expected = list(itertools.combinations_with_replacement(range(number_of_variants), number_of_boosters))
+    combinations = st.CombinationRange(number_of_variants, number_of_boosters)
+    assert len(combinations) == st.CombinationRange.count(number_of_variants, number_of_boosters) == len(expected)
+    assert list(combinations) == expected
+    assert [combinations[i] for i in range(len(expected))] == expected
+    for start, end in itertools.combinations(range(len(expected) + 1), 2):
+        assert list(combinations[start:end]) == expected[start:end]
+
+
+def test_range_is_small_and_checks_bounds():
+    combinations = st.CombinationRange(20, 8)
+    assert len(combinations) == 2220075
+    part = combinations[1000000:1000010]
+    assert list(part) == [combinations[i] for i in range(1000000, 1000010)]
+    assert len(pickle.dumps(part)) < 200
+    with pytest.raises(IndexError):
+        combinations[len(combinations)]
+    with pytest.raises(ValueError):
+        combinations[::2]
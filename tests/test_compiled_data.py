@@ -0,0 +1,66 @@
+import json
+import os
+
+import pytest
+
+import shield_tester as st
+from conftest import DATA_FILE
+
+
+def get_compiled_files(directory):
+    return sorted(name for name in os.listdir(directory) if name.startswith(st.CompiledData.FILE_PREFIX))
+
+
+def write_data(path, base_shield_strength):
+    with open(DATA_FILE) as json_file:
+        data = json.load(json_file)
+    data["ships"][0]["baseShieldStrength"] = base_shield_strength
+    with open(path, "w") as json_file:
+        json.dump(data, json_file)
+
+
+def compute(tester):
+    test_case = tester.select_ship("Synthetic Ship 0")
+    test_case.number_of_boosters_to_test = 2
+    test_case.thermal_dps = 60
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return tester.compute(test_case, use_cache=False)
+
+
+def test_compiled_data_gives_same_result(tester, data_file):
+    expected = compute(tester)
+    assert len(get_compiled_files(tester.cache_directory)) == 1
+
+    other = st.ShieldTester()
+    other.load_data(data_file)
+    other.cpu_cores = 1
+    assert other.ship_names == tester.ship_names
+    result = compute(other)
+    assert str(result.loadout.shield_generator) == str(expected.loadout.shield_generator)
+    assert result.survival_time == pytest.approx(expected.survival_time)
+
+
+def test_data_files_in_same_directory_keep_their_compiled_data(tmp_path):
+    paths = [str(tmp_path / name) for name in ("ships.json", "ships_test.json")]
+    for strength, path in zip((400, 500), paths):
+        write_data(path, strength)
+        st.ShieldTester().load_data(path)
+    cache_directory = str(tmp_path / st.ShieldTester.CACHE_DIRECTORY_NAME)
+    compiled = get_compiled_files(cache_directory)
+    assert len(compiled) == 2
+
+    # loading again uses the compiled data of each file
+    for path in paths:
+        st.ShieldTester().load_data(path)
+    assert get_compiled_files(cache_directory) == compiled
+
+    # only the stale file of the changed data file is replaced
+    write_data(paths[0], 600)
+    tester = st.ShieldTester()
+    tester.load_data(paths[0])
+    assert tester.select_ship("Synthetic Ship 0").ship.base_shield_strength == 600
+    new_compiled = get_compiled_files(cache_directory)
+    assert len(new_compiled) == 2
+    assert compiled[1] in new_compiled and compiled[0] not in new_compiled
+    data_hash = st.Utility.get_file_hash(paths[0])
+    assert st.CompiledData.load(cache_directory, data_hash, paths[0]).data_hash == data_hash
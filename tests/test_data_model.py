@@ -0,0 +1,33 @@
+import pytest
+
+import shield_tester as st
+
+
+@pytest.mark.parametrize("cls", [st.LoadOut, st.ShieldGenerator, st.ShieldBoosterVariant, st.StarShip])
+def test_classes_use_slots(cls):
+    assert "__slots__" in vars(cls)
+    assert not hasattr(cls.__new__(cls), "__dict__")
+
+
+def test_test_cases_share_catalog_objects(tester):
+    test_case = tester.select_ship("Synthetic Ship 1")
+    other = tester.select_ship("Synthetic Ship 1")
+    assert other is not test_case and other.ship is test_case.ship
+    assert [lo.shield_generator for lo in other.loadout_list] == [lo.shield_generator for lo in test_case.loadout_list]
+    assert all(a is b for a, b in zip(other.shield_booster_variants, test_case.shield_booster_variants))
+
+    test_case.number_of_boosters_to_test = 2
+    test_case.kinetic_dps = 50
+    tester.set_boosters_to_test(test_case, short_list=False)
+    result = tester.compute(test_case, use_cache=False)
+    assert any(result.loadout.shield_generator is lo.shield_generator for lo in test_case.loadout_list)
+    assert all(any(booster is variant for variant in test_case.shield_booster_variants) for booster in result.loadout.boosters)
+
+
+def test_ship_copy_is_independent(tester):
+    ship = tester.select_ship("Synthetic Ship 1").ship
+    copy = ship.copy()
+    copy.loadout_template["Modules"].append({"Slot": "TinyHardpoint1"})
+    copy.utility_slots_free.pop()
+    assert ship.loadout_template["Modules"] == [] and copy.loadout_template["Modules"] != []
+    assert len(copy.utility_slots_free) == len(ship.utility_slots_free) - 1
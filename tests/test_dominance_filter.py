@@ -0,0 +1,41 @@
+import pytest
+
+import shield_tester as st
+
+
+def create_test_case(tester, number_of_boosters, **damage):
+    test_case = tester.select_ship("Synthetic Ship 2")
+    test_case.number_of_boosters_to_test = number_of_boosters
+    for name, value in damage.items():
+        setattr(test_case, name, value)
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return test_case
+
+
+def test_remove_dominated_keeps_first_duplicate():
+    stats = [(1, 1), (2, 2), (2, 1), (2, 2), (3, 0)]
+    assert st.DominanceFilter._remove_dominated(stats) == [1, 4]
+
+
+def test_filter_ignores_negative_damage(tester):
+    test_case = create_test_case(tester, 2, kinetic_dps=-10, damage_effectiveness=0.5)
+    assert st.DominanceFilter.filter_loadouts(test_case, test_case.loadout_list) == test_case.loadout_list
+    assert st.DominanceFilter.filter_booster_variants(test_case, test_case.shield_booster_variants) == test_case.shield_booster_variants
+
+
+@pytest.mark.parametrize("damage", [{"kinetic_dps": 120, "damage_effectiveness": 0.7},
+                                    {"thermal_dps": 60, "explosive_dps": 20, "damage_effectiveness": 1},
+                                    {"absolute_dps": 50, "damage_effectiveness": 0.3}])
+@pytest.mark.parametrize("number_of_boosters", [1, 2, 3])
+def test_filter_doesnt_change_result(tester, number_of_boosters, damage):
+    test_case = create_test_case(tester, number_of_boosters, **damage)
+    number_of_loadouts = len(test_case.loadout_list)
+    loadouts = st.DominanceFilter.filter_loadouts(test_case, test_case.loadout_list, test_case.shield_booster_variants)
+    assert 0 < len(loadouts) < number_of_loadouts
+
+    expected = tester.compute(test_case, remove_dominated=False, use_cache=False)
+    result = tester.compute(test_case, remove_dominated=True, use_cache=False)
+    assert len(test_case.loadout_list) == number_of_loadouts
+    assert result.survival_time == pytest.approx(expected.survival_time)
+    assert result.incoming_dps == pytest.approx(expected.incoming_dps)
+    assert result.total_hitpoints == pytest.approx(expected.total_hitpoints)
@@ -0,0 +1,62 @@
+import copy
+
+import pytest
+
+import shield_tester as st
+
+SCENARIOS = [{"kinetic_dps": 100, "thermal_dps": 50, "damage_effectiveness": 0.6},
+             {"explosive_dps": 5, "damage_effectiveness": 0.1},  # shields regenerate faster than the damage
+             {"thermal_dps": 80, "absolute_dps": 30, "damage_effectiveness": 0.9}]
+
+
+def create_test_case(tester, number_of_boosters, scenario, duplicates=False):
+    test_case = tester.select_ship("Synthetic Ship 5")
+    test_case.number_of_boosters_to_test = number_of_boosters
+    for name, value in scenario.items():
+        setattr(test_case, name, value)
+    tester.set_boosters_to_test(test_case, short_list=False)
+    if duplicates:
+        # every variant has an equally good copy that is tested later and must not win
+        test_case.loadout_list = test_case.loadout_list[::3]
+        for loadout in list(test_case.loadout_list):
+            loadout = copy.copy(loadout)
+            loadout.shield_generator = copy.copy(loadout.shield_generator)
+            loadout.shield_generator.engineered_name += " (copy)"
+            test_case.loadout_list.append(loadout)
+        copies = [copy.copy(booster) for booster in test_case.shield_booster_variants]
+        for booster in copies:
+            booster.experimental += " (copy)"
+        test_case.shield_booster_variants += copies
+    return test_case
+
+
+def get_winner(result):
+    shield_generator = result.loadout.shield_generator
+    return ((shield_generator.symbol, shield_generator.engineered_name, shield_generator.experimental_name),
+            [(booster.engineering, booster.experimental) for booster in result.loadout.boosters])
+
+
+def assert_same_values(result, other):
+    assert other.survival_time == pytest.approx(result.survival_time)
+    assert other.incoming_dps == pytest.approx(result.incoming_dps)
+    assert other.total_hitpoints == pytest.approx(result.total_hitpoints)
+
+
+@pytest.mark.skipif(not st.VectorizedEngine.is_available(), reason="NumPy is not installed")
+@pytest.mark.parametrize("scenario", SCENARIOS)
+@pytest.mark.parametrize("number_of_boosters", [0, 1, 2, 3])
+def test_numpy_engine_finds_same_loadout(tester, number_of_boosters, scenario):
+    test_case = create_test_case(tester, number_of_boosters, scenario, duplicates=True)
+    python_result = tester.compute(test_case, engine=st.ShieldTester.ENGINE_PYTHON, use_cache=False)
+    numpy_result = tester.compute(test_case, engine=st.ShieldTester.ENGINE_NUMPY, use_cache=False)
+    assert len(python_result.loadout.boosters) == number_of_boosters
+    assert "(copy)" not in str(get_winner(python_result))
+    assert get_winner(numpy_result) == get_winner(python_result)
+    assert_same_values(python_result, numpy_result)
+
+
+def test_numpy_engine_needs_numpy(tester, monkeypatch):
+    monkeypatch.setattr(st.VectorizedEngine, "is_available", staticmethod(lambda: False))
+    test_case = create_test_case(tester, 1, SCENARIOS[0])
+    with pytest.raises(RuntimeError):
+        tester.compute(test_case, engine=st.ShieldTester.ENGINE_NUMPY)
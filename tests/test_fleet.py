@@ -0,0 +1,55 @@
+import queue
+
+import pytest
+
+DAMAGE = {"kinetic_dps": 90, "thermal_dps": 30, "damage_effectiveness": 0.7}
+SHIPS = ["Synthetic Ship 2", "Synthetic Ship 3", "Synthetic Ship 5"]
+
+
+def compute_ship(tester, ship_name, booster_amount):
+    test_case = tester.select_ship(ship_name)
+    test_case.number_of_boosters_to_test = booster_amount
+    for name, value in DAMAGE.items():
+        setattr(test_case, name, value)
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return tester.compute(test_case, use_cache=False)
+
+
+def check_fleet(tester, results, all_booster_counts):
+    for ship_name in SHIPS:
+        utility_slots = tester.select_ship(ship_name).ship.utility_slots
+        booster_counts = range(utility_slots + 1) if all_booster_counts else [utility_slots]
+        for booster_amount in booster_counts:
+            expected = compute_ship(tester, ship_name, booster_amount)
+            result = results[(ship_name, booster_amount)]
+            assert result.survival_time == pytest.approx(expected.survival_time)
+            assert result.incoming_dps == pytest.approx(expected.incoming_dps)
+
+
+def test_fleet_matches_compute(tester):
+    result_queue = queue.SimpleQueue()
+    results = tester.compute_fleet(SHIPS, damage=DAMAGE, short_list=False, result_queue=result_queue, use_cache=False)
+    assert [ship_name for ship_name, _ in results] == SHIPS
+    check_fleet(tester, results, False)
+    queued = []
+    while not result_queue.empty():
+        queued.append(result_queue.get())
+    assert sorted((name, amount) for name, amount, _ in queued) == sorted(results)
+
+
+def test_fleet_all_booster_counts(tester):
+    results = tester.compute_fleet(SHIPS, damage=DAMAGE, all_booster_counts=True, short_list=False, use_cache=False)
+    check_fleet(tester, results, True)
+
+
+def test_fleet_with_pool(mp_tester):
+    results = mp_tester.compute_fleet(SHIPS, damage=DAMAGE, all_booster_counts=True, short_list=False, use_cache=False)
+    mp_tester.cpu_cores = 1
+    check_fleet(mp_tester, results, True)
+
+
+def test_fleet_errors(tester):
+    with pytest.raises(RuntimeError):
+        tester.compute_fleet(["Unknown Ship"])
+    with pytest.raises(RuntimeError):
+        tester.compute_fleet(SHIPS, damage={"hull_mass": 1})
@@ -0,0 +1,91 @@
+import copy
+
+import pytest
+
+import shield_tester as st
+
+ENGINES = [st.ShieldTester.ENGINE_PYTHON]
+if st.VectorizedEngine.is_available():
+    ENGINES.append(st.ShieldTester.ENGINE_NUMPY)
+
+
+@pytest.mark.parametrize("guardian_hitpoints", [0, 200])
+def test_hull_masses_above_maximum_mass(tester, guardian_hitpoints):
+    test_case = tester.select_ship("Synthetic Ship 0")
+    test_case.number_of_boosters_to_test = 2
+    test_case.kinetic_dps = 100
+    test_case.thermal_dps = 50
+    test_case.damage_effectiveness = 0.6
+    test_case.guardian_hitpoints = guardian_hitpoints
+    tester.set_boosters_to_test(test_case, short_list=False)
+    max_mass = max(loadout.shield_generator.maxmass for loadout in test_case.loadout_list)
+    test_case.set_hull_mass_range(test_case.ship.hull_mass, max_mass * 1.5, (max_mass * 1.5 - test_case.ship.hull_mass) / 20)
+
+    results = [tester.compute_hull_masses(test_case, engine=engine) for engine in ENGINES]
+    for result in results:
+        assert len(result) == len(test_case.hull_masses)
+        for hull_mass, r in zip(result.hull_masses, result.results):
+            if hull_mass > max_mass:
+                assert r.loadout is None
+                assert r.survival_time == 0
+            else:
+                assert r.loadout.shield_generator.maxmass >= hull_mass
+                assert r.loadout.shield_strength > 0
+        assert result.breakpoints[-1][0] <= max_mass < result.breakpoints[-1][1]
+        assert "No test results" in result.get_output_string(guardian_hitpoints)
+
+    for other in results[1:]:
+        assert other.breakpoints == results[0].breakpoints
+        for a, b in zip(results[0].results, other.results):
+            assert a.survival_time == pytest.approx(b.survival_time)
+
+
+def create_test_case(tester):
+    test_case = tester.select_ship("Synthetic Ship 5")
+    test_case.number_of_boosters_to_test = 2
+    test_case.kinetic_dps = 70
+    test_case.explosive_dps = 40
+    test_case.damage_effectiveness = 0.8
+    tester.set_boosters_to_test(test_case, short_list=False)
+    test_case.set_hull_mass_range(test_case.ship.hull_mass, test_case.ship.hull_mass * 1.6, test_case.ship.hull_mass * 0.1)
+    return test_case
+
+
+def check_against_compute(tester, test_case, result):
+    for hull_mass, r in zip(result.hull_masses, result.results):
+        # same shield generator variants with a copy of the ship with that hull mass
+        mass_test_case = copy.copy(test_case)
+        ship = test_case.ship.copy()
+        ship.hull_mass = hull_mass
+        mass_test_case.loadout_list = [st.LoadOut(loadout.shield_generator, ship) for loadout in test_case.loadout_list]
+        expected = tester.compute(mass_test_case, use_cache=False)
+        assert r.survival_time == pytest.approx(expected.survival_time)
+        assert r.loadout.ship.hull_mass == hull_mass
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_hull_masses_match_compute(tester, engine):
+    test_case = create_test_case(tester)
+    result = tester.compute_hull_masses(test_case, engine=engine)
+    assert result.hull_masses == sorted(test_case.hull_masses)
+    check_against_compute(tester, test_case, result)
+
+
+def test_hull_masses_with_pool(mp_tester):
+    test_case = create_test_case(mp_tester)
+    result = mp_tester.compute_hull_masses(test_case)
+    mp_tester.cpu_cores = 1
+    check_against_compute(mp_tester, test_case, result)
+
+
+def test_hull_mass_errors(tester):
+    test_case = create_test_case(tester)
+    with pytest.raises(RuntimeError):
+        test_case.set_hull_mass_range(100, 50, 10)
+    with pytest.raises(RuntimeError):
+        test_case.set_hull_mass_range(100, 200, 0)
+    with pytest.raises(RuntimeError):
+        tester.compute_hull_masses(test_case, engine="unknown")
+    test_case.loadout_list = []
+    with pytest.raises(RuntimeError):
+        tester.compute_hull_masses(test_case)
@@ -0,0 +1,66 @@
+import base64
+import gzip
+import json
+
+import pytest
+
+import shield_tester as st
+
+
+def create_loadout(ship_name: str, booster_slots: int = 1, ship: str = "Synthetic_Ship_5") -> dict:
+    modules = [{"Slot": f"TinyHardpoint{i}", "Item": "Hpt_ShieldBooster_Size0_Class5"} for i in range(1, booster_slots + 1)]
+    modules.append({"Slot": "TinyHardpoint8", "Item": "Hpt_HeatSinkLauncher_Turret_Tiny"})
+    modules.append({"Slot": "Slot01_Size6", "Item": "Int_ShieldGenerator_Size6_Class5"})
+    return {"event": "Loadout", "Ship": ship, "ShipName": ship_name, "ShipIdent": "ST-01", "Modules": modules}
+
+
+def create_lines():
+    lines = [json.dumps(create_loadout(f"Ship {i}", i % 3)) for i in range(30)]
+    compressed = base64.b64encode(gzip.compress(json.dumps(create_loadout("From URL")).encode("utf-8"))).decode("utf-8")
+    lines.append("https://coriolis.io/import?data=" + compressed.replace("=", "%3D"))
+    lines.append("")
+    lines.append("not a loadout")
+    lines.append(json.dumps(create_loadout("Unknown", ship="no_such_ship")))
+    lines.append(json.dumps([{"header": {}, "data": create_loadout("SLEF 1")}, {"header": {}, "data": create_loadout("SLEF 2")}]))
+    return lines
+
+
+def check_result(tester, result):
+    assert len(result) == 35
+    assert result.succeeded == 33 and result.failed == 2
+    assert result.ship_names[:3] == ["Ship 0 (ST-01)", "Ship 1 (ST-01)", "Ship 2 (ST-01)"]
+    assert result.ship_names[30] == "From URL (ST-01)"
+    assert result.errors[31].startswith("Could not decode entry") and result.lines[31] == 33
+    assert result.errors[32] == "Unknown ship: no_such_ship" and result.lines[32] == 34
+    assert result.ship_names[33:] == ["SLEF 1 (ST-01)", "SLEF 2 (ST-01)"] and result.lines[33:] == [35, 35]
+    assert "Line 33: " in result.get_output_string()
+    for name in ("Ship 2 (ST-01)", "SLEF 2 (ST-01)"):
+        assert name in tester.ship_names
+
+    test_case = tester.select_ship("Ship 2 (ST-01)")
+    # shield boosters are replaced by the test, other utility modules are kept
+    assert test_case.ship.utility_slots_free == list(range(1, 8))
+    assert test_case.ship.utility_slots == tester.select_ship("Synthetic Ship 5").ship.utility_slots - 1
+
+
+def test_import_loadouts(tester):
+    result = tester.import_loadouts("\n".join(create_lines()))
+    check_result(tester, result)
+    assert not result.cancelled and result.statistics["entries"] == 35
+
+
+def test_import_loadouts_in_batches(tester, monkeypatch):
+    monkeypatch.setattr(st.ShieldTester, "IMPORT_BATCH_SIZE", 4)
+    check_result(tester, tester.import_loadouts(iter(create_lines())))
+
+
+def test_import_loadouts_with_pool(mp_tester, monkeypatch):
+    monkeypatch.setattr(st.ShieldTester, "IMPORT_MP_MIN_LINES", 2)
+    check_result(mp_tester, mp_tester.import_loadouts(create_lines()))
+
+
+def test_import_loadout_keeps_its_behaviour(tester):
+    loadout = create_loadout("Single", 2)
+    assert tester.import_loadout(loadout) == "Single (ST-01)"
+    assert len(loadout["Modules"]) == 4
+    assert tester.import_loadout(create_loadout("Unknown", ship="no_such_ship")) == ""
@@ -0,0 +1,41 @@
+import shield_tester as st
+
+
+def create_test_case(tester):
+    test_case = tester.select_ship("Synthetic Ship 0")
+    test_case.number_of_boosters_to_test = 2
+    test_case.kinetic_dps = 70
+    test_case.damage_effectiveness = 0.5
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return test_case
+
+
+def test_instrumentation_is_attached_to_result(tester):
+    test_case = create_test_case(tester)
+    events = list()
+    instrumentation = st.Instrumentation(hook=lambda event, name, data: events.append((event, name)))
+    result = tester.compute(test_case, instrumentation=instrumentation, remove_dominated=False, use_cache=False)
+    assert result.instrumentation is instrumentation
+
+    statistics = instrumentation.statistics
+    assert {st.Instrumentation.PHASE_TOTAL, st.Instrumentation.PHASE_EVALUATION} <= set(statistics["phases"])
+    assert statistics["combinations"] == st.BoosterBonusTable.count_combinations(len(test_case.shield_booster_variants), 2)
+    assert statistics["chunks"] >= 1 and statistics["loadouts_evaluated"] > 0
+    assert (st.Instrumentation.EVENT_PHASE_END, st.Instrumentation.PHASE_TOTAL) in events
+    assert any(event == st.Instrumentation.EVENT_TASK_DONE for event, _ in events)
+    assert "INSTRUMENTATION" in instrumentation.get_output_string()
+
+
+def test_workers_are_measured(mp_tester):
+    instrumentation = st.Instrumentation()
+    mp_tester.compute(create_test_case(mp_tester), instrumentation=instrumentation, use_cache=False)
+    assert instrumentation.bytes_sent > 0
+    assert instrumentation.statistics["worker_busy"]
+
+
+def test_disabled_instrumentation_records_nothing():
+    instrumentation = st.Instrumentation.disabled()
+    with instrumentation.phase(st.Instrumentation.PHASE_PRELIM):
+        pass
+    instrumentation.add_task(0, 1, 0.1, 0.1)
+    assert instrumentation.phases == {} and instrumentation.worker_busy == {}
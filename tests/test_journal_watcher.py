@@ -0,0 +1,105 @@
+import json
+import os
+import queue
+import threading
+
+import shield_tester as st
+
+
+def create_event(tester, ship_name):
+    test_case = tester.select_ship(ship_name)
+    loadout = test_case.loadout_list[0]
+    loadout.boosters = test_case.shield_booster_variants[:1]
+    event = dict(tester.get_export(loadout, "SLEF"))
+    event["event"] = "Loadout"
+    event["timestamp"] = "2026-10-16T10:00:00Z"
+    return json.dumps(event)
+
+
+def test_poll_reports_events_that_cant_be_imported(tester, tmp_path):
+    events = [create_event(tester, "Synthetic Ship 0"),
+              json.dumps({"event": "Loadout", "Ship": "unknown_ship", "Modules": []}),
+              json.dumps({"event": "Loadout", "Ship": "synthetic_ship_1"}),  # no modules
+              create_event(tester, "Synthetic Ship 1")]
+    with open(str(tmp_path / "Journal.2026-10-16T100000.01.log"), "w") as f:
+        f.write('{"timestamp":"2026-10-16T10:00:00Z","event":"Fileheader"}\n' + "\n".join(events) + "\n")
+
+    watcher = st.JournalWatcher(tester, str(tmp_path), damage={"kinetic_dps": 80})
+    results = watcher.poll()
+    assert sorted(ship_name for ship_name, _ in results) == ["Synthetic Ship 0 (Imported)", "Synthetic Ship 1 (Imported)"]
+    assert watcher.import_result.succeeded == 2
+    assert watcher.import_result.lines == [1, 2, 3, 4]
+    assert "unknown_ship" in watcher.import_result.errors[1]
+    assert watcher.import_result.errors[2]
+    assert watcher.import_errors == 2
+    assert watcher.poll() == {}
+
+
+def test_watch_continues_after_errors(tester, tmp_path, capsys):
+    path = str(tmp_path / "Journal.2026-10-16T100000.01.log")
+    with open(path, "w") as f:
+        f.write(create_event(tester, "Synthetic Ship 0") + "\n")
+
+    # unknown damage parameters make compute_fleet() fail
+    watcher = st.JournalWatcher(tester, str(tmp_path), damage={"unknown_dps": 80})
+    result_queue = queue.SimpleQueue()
+    stop = threading.Event()
+    thread = threading.Thread(target=watcher.watch, args=(result_queue, stop, 0.01), daemon=True)
+    thread.start()
+    try:
+        for _ in range(3000):
+            if watcher.last_error is not None:
+                break
+            stop.wait(0.01)
+        assert isinstance(watcher.last_error, RuntimeError)
+
+        watcher.damage = {"kinetic_dps": 80}
+        with open(path, "a") as f:
+            f.write(create_event(tester, "Synthetic Ship 0") + "\n")
+        ship_name, _, result = result_queue.get(timeout=30)
+        assert ship_name == "Synthetic Ship 0 (Imported)"
+        assert result.loadout is not None
+    finally:
+        stop.set()
+        thread.join(timeout=30)
+    assert "Could not process journal" in capsys.readouterr().out
+
+
+def test_incremental_read_and_state(tester, tmp_path):
+    path = str(tmp_path / "Journal.2026-10-16T100000.01.log")
+    state_file = str(tmp_path / "state.json")
+    event = create_event(tester, "Synthetic Ship 0")
+    with open(path, "w") as f:
+        f.write('{"timestamp":"2026-10-16T10:00:00Z","event":"Fileheader"}\n' + event + "\n" + event[:20])
+
+    watcher = st.JournalWatcher(tester, str(tmp_path), damage={"kinetic_dps": 80}, state_file=state_file)
+    assert len(watcher.read_events()) == 1
+    assert watcher.read_events() == []
+    # the incomplete line is read again when it's finished
+    with open(path, "a") as f:
+        f.write(event[20:] + "\n")
+    assert len(watcher.read_events()) == 1
+    assert watcher.events_read == 2
+
+    results = watcher.poll()
+    assert results == {}  # nothing new to import
+    with open(state_file) as f:
+        assert json.load(f) == {os.path.basename(path): os.path.getsize(path)}
+
+    restarted = st.JournalWatcher(tester, str(tmp_path), state_file=state_file)
+    restarted.load_state()
+    assert restarted.offsets == watcher.offsets
+    assert restarted.read_events() == []
+
+
+def test_unchanged_ships_are_not_computed_again(tester, tmp_path):
+    path = str(tmp_path / "Journal.2026-10-16T100000.01.log")
+    with open(path, "w") as f:
+        f.write(create_event(tester, "Synthetic Ship 0") + "\n")
+    watcher = st.JournalWatcher(tester, str(tmp_path), damage={"kinetic_dps": 80})
+    assert [ship_name for ship_name, _ in watcher.poll()] == ["Synthetic Ship 0 (Imported)"]
+
+    with open(path, "a") as f:
+        f.write(create_event(tester, "Synthetic Ship 0") + "\n")
+    assert watcher.poll() == {}
+    assert watcher.import_result.succeeded == 1
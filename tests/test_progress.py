@@ -0,0 +1,62 @@
+import math
+import queue
+
+import pytest
+
+import shield_tester as st
+
+
+def create_test_case(tester, number_of_boosters=3):
+    test_case = tester.select_ship("Synthetic Ship 5")
+    test_case.number_of_boosters_to_test = number_of_boosters
+    test_case.thermal_dps = 70
+    test_case.damage_effectiveness = 0.5
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return test_case
+
+
+def count_calls(tester, test_case, **kwargs):
+    calls = list()
+    tester.compute(test_case, callback=calls.append, remove_dominated=False, use_cache=False, **kwargs)
+    return calls
+
+
+def test_scheduler_covers_all_items():
+    scheduler = st.ChunkScheduler(1000, workers=2, initial_chunk_size=10, max_chunk_size=100, target_time=0.1)
+    chunks = list()
+    while True:
+        chunk = scheduler.next_chunk()
+        if chunk is None:
+            break
+        chunks.append(chunk)
+        # 1000 items per second, tasks should take 0.1 s
+        scheduler.add_measurement(chunk[1] - chunk[0], (chunk[1] - chunk[0]) / 1000)
+    assert chunks[0] == (0, 10)
+    assert all(a[1] == b[0] for a, b in zip(chunks, chunks[1:])) and chunks[-1][1] == 1000
+    assert max(end - start for start, end in chunks) == 100
+    assert scheduler.finished
+
+
+@pytest.mark.parametrize("use_pool", [False, True])
+def test_callback_steps_per_chunk_size(tester, monkeypatch, use_pool, request):
+    if use_pool:
+        tester = request.getfixturevalue("mp_tester")
+    monkeypatch.setattr(st.ShieldTester, "MP_CHUNK_SIZE", 50)
+    test_case = create_test_case(tester)
+    number_of_combinations = st.BoosterBonusTable.count_combinations(len(test_case.shield_booster_variants), 3)
+    calls = count_calls(tester, test_case)
+    assert calls.count(st.ShieldTester.CALLBACK_STEP) == math.ceil(number_of_combinations / 50)
+
+
+def test_progress_events(tester):
+    test_case = create_test_case(tester)
+    progress_queue = queue.SimpleQueue()
+    calls = count_calls(tester, test_case, progress_queue=progress_queue)
+    events = list()
+    while not progress_queue.empty():
+        events.append(progress_queue.get())
+    assert events and calls.count(st.ShieldTester.CALLBACK_PROGRESS) == len(events)
+    assert st.ShieldTester.CALLBACK_STEP not in calls
+    assert all(a.items_done < b.items_done for a, b in zip(events, events[1:]))
+    assert events[-1].done and events[-1].fraction == 1.0
+    assert events[-1].loadouts_done == events[-1].loadouts_total == len(test_case.loadout_list) * events[-1].items_total
@@ -0,0 +1,38 @@
+import pytest
+
+SETTINGS = [
+    {"kinetic_dps": 100, "thermal_dps": 40, "damage_effectiveness": 0.5},
+    {"explosive_dps": 60, "absolute_dps": 10, "damage_effectiveness": 0.9},
+    {"thermal_dps": 150, "damage_effectiveness": 1.0, "scb_hitpoints": 500},
+]
+
+
+def create_test_case(tester, settings):
+    test_case = tester.select_ship("Synthetic Ship 5")
+    test_case.number_of_boosters_to_test = 2
+    for name, value in settings.items():
+        setattr(test_case, name, value)
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return test_case
+
+
+@pytest.mark.parametrize("settings", SETTINGS)
+def test_quick_finds_the_same_result(tester, settings):
+    test_case = create_test_case(tester, settings)
+    number_of_loadouts = len(test_case.loadout_list)
+    expected = tester.compute(test_case, use_cache=False)
+    result = tester.compute(test_case, quick=True, use_cache=False)
+    assert result.survival_time == pytest.approx(expected.survival_time)
+    assert result.incoming_dps == pytest.approx(expected.incoming_dps)
+    assert len(test_case.loadout_list) == number_of_loadouts
+    statistics = result.bound_filter_statistics
+    assert 1 <= statistics["kept"] <= statistics["shield_generator_variants"]
+    assert expected.bound_filter_statistics is None
+
+
+@pytest.mark.parametrize("settings", SETTINGS)
+def test_quick_ranking(tester, settings):
+    test_case = create_test_case(tester, settings)
+    expected = tester.compute(test_case, top_k=5, remove_dominated=False, use_cache=False)
+    ranking = tester.compute(test_case, top_k=5, remove_dominated=False, quick=True, use_cache=False)
+    assert [r.survival_time for r in ranking] == pytest.approx([r.survival_time for r in expected])
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+import shield_tester as st
+
+
+def create_test_case(tester, kinetic_dps=80):
+    test_case = tester.select_ship("Synthetic Ship 3")
+    test_case.number_of_boosters_to_test = 2
+    test_case.kinetic_dps = kinetic_dps
+    test_case.damage_effectiveness = 0.5
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return test_case
+
+
+def get_result_files(tester):
+    return [name for name in os.listdir(tester.cache_directory) if name.startswith(st.ResultCache.FILE_PREFIX)]
+
+
+def test_results_are_cached(tester):
+    test_case = create_test_case(tester)
+    first = tester.compute(test_case)
+    second = tester.compute(test_case)
+    assert tester.result_cache.statistics == {"hits": 1, "disk_hits": 0, "misses": 1, "entries": 1}
+    assert second is not first and second.loadout is not first.loadout
+    assert second.survival_time == first.survival_time
+    # only the containers are copied
+    assert second.loadout.shield_generator is first.loadout.shield_generator
+    assert second.loadout.boosters == first.loadout.boosters
+
+    # changing a result doesn't change the cache
+    second.survival_time = 0
+    second.loadout.boosters.clear()
+    third = tester.compute(test_case)
+    assert third.survival_time == first.survival_time
+    assert third.loadout.boosters == first.loadout.boosters
+
+    tester.compute(create_test_case(tester, kinetic_dps=81))
+    assert tester.result_cache.statistics["misses"] == 2
+
+
+def test_rankings_are_cached(tester):
+    test_case = create_test_case(tester)
+    ranking = tester.compute(test_case, top_k=5)
+    cached = tester.compute(test_case, top_k=5)
+    assert tester.result_cache.statistics["hits"] == 1
+    assert cached is not ranking
+    assert [r.loadout.shield_generator for r in cached] == [r.loadout.shield_generator for r in ranking]
+
+
+def test_persistent_results(tester, data_file):
+    tester.result_cache.persistent = True
+    expected = tester.compute(create_test_case(tester))
+    saved = get_result_files(tester)
+    assert len(saved) == 1
+
+    other = st.ShieldTester()
+    other.load_data(data_file)
+    other.cpu_cores = 1
+    other.result_cache.persistent = True
+    result = other.compute(create_test_case(other))
+    assert other.result_cache.statistics["disk_hits"] == 1
+    assert result.survival_time == pytest.approx(expected.survival_time)
+
+    # only the most recent result is kept if there is no space for more
+    other.result_cache.max_disk_bytes = 0
+    other.compute(create_test_case(other, kinetic_dps=90))
+    files = get_result_files(other)
+    assert len(files) == 1 and files != saved
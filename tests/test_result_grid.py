@@ -0,0 +1,101 @@
+import sys
+
+import pytest
+
+import shield_tester as st
+
+
+def create_test_case(tester):
+    test_case = tester.select_ship("Synthetic Ship 5")
+    test_case.number_of_boosters_to_test = 2
+    test_case.kinetic_dps = 80
+    test_case.thermal_dps = 60
+    test_case.damage_effectiveness = 0.7
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return test_case
+
+
+@pytest.fixture(params=[True, False], ids=["numpy", "python"])
+def numpy_imported(request, monkeypatch):
+    if request.param and not st.VectorizedEngine.is_available():
+        pytest.skip("NumPy is not installed")
+    monkeypatch.setattr(sys.modules["shield_tester.ResultGrid"], "_numpy_imported", request.param)
+    return request.param
+
+
+def check_grid(tester, test_case, path):
+    ranking = tester.compute(test_case, top_k=5, remove_dominated=False, use_cache=False)
+    with st.ResultGrid(path) as grid:
+        assert grid.complete
+        assert grid.number_of_loadouts == len(test_case.loadout_list)
+        assert grid.number_of_variants == len(test_case.shield_booster_variants)
+        assert len(grid) == grid.number_of_loadouts * grid.number_of_combinations
+        entries = grid.query(top_n=5)
+        assert [entry[2] for entry in entries] == pytest.approx([r.survival_time for r in ranking], rel=1e-5)
+        assert [entry[4] for entry in entries] == pytest.approx([r.total_hitpoints for r in ranking], rel=1e-5)
+        loadout_index, rank = entries[0][:2]
+        assert grid.get(loadout_index, rank) == tuple(entries[0][2:])
+        assert grid.get_description(loadout_index, rank).startswith(grid.loadouts[loadout_index]["name"])
+        with pytest.raises(IndexError):
+            grid.get(grid.number_of_loadouts, 0)
+
+
+def test_grid_matches_compute(tester, tmp_path, numpy_imported):
+    test_case = create_test_case(tester)
+    path = str(tmp_path / "grid.bin")
+    expected = tester.compute(test_case, use_cache=False)
+    result = tester.compute(test_case, result_grid=path)
+    assert result.survival_time == pytest.approx(expected.survival_time)
+    check_grid(tester, test_case, path)
+
+
+def test_grid_with_pool(mp_tester, tmp_path):
+    test_case = create_test_case(mp_tester)
+    path = str(tmp_path / "grid.bin")
+    mp_tester.compute(test_case, result_grid=path)
+    mp_tester.cpu_cores = 1
+    check_grid(mp_tester, test_case, path)
+
+
+def test_query_filters(tester, tmp_path, numpy_imported):
+    test_case = create_test_case(tester)
+    path = str(tmp_path / "grid.bin")
+    tester.compute(test_case, result_grid=path)
+    with st.ResultGrid(path) as grid:
+        best = grid.query()[0]
+        excluded_generator = grid.loadouts[best[0]]["experimental"]
+        entries = grid.query(top_n=3, loadout_filter=lambda loadout: loadout["experimental"] != excluded_generator)
+        assert len(entries) == 3
+        assert all(grid.loadouts[entry[0]]["experimental"] != excluded_generator for entry in entries)
+        assert entries[0][2:] != best[2:] or entries[0][0] != best[0]
+
+        excluded_booster = grid.shield_booster_variants[grid.get_boosters(best[1])[0]]["engineering"]
+        entries = grid.query(top_n=3, booster_filter=lambda booster: booster["engineering"] != excluded_booster)
+        for _, rank, *_ in entries:
+            assert all(grid.shield_booster_variants[x]["engineering"] != excluded_booster for x in grid.get_boosters(rank))
+        assert grid.query(booster_filter=lambda booster: False) == []
+
+
+def test_get_values(tester, tmp_path):
+    if not st.VectorizedEngine.is_available():
+        pytest.skip("NumPy is not installed")
+    test_case = create_test_case(tester)
+    path = str(tmp_path / "grid.bin")
+    tester.compute(test_case, result_grid=path)
+    with st.ResultGrid(path) as grid:
+        values = grid.get_values(st.ResultGrid.HITPOINTS)
+        assert values.shape == (grid.number_of_combinations, grid.number_of_loadouts)
+        assert values[3, 1] == pytest.approx(grid.get(1, 3)[2])
+
+
+def test_grid_errors(tester, tmp_path):
+    test_case = create_test_case(tester)
+    path = str(tmp_path / "grid.bin")
+    with pytest.raises(RuntimeError):
+        tester.compute(test_case, result_grid=path, search=st.ShieldTester.SEARCH_BRANCH_AND_BOUND)
+    with pytest.raises(RuntimeError):
+        tester.compute(test_case, result_grid=path, time_budget=10)
+    with open(path, "wb") as f:
+        f.write(b"no grid")
+    with pytest.raises(RuntimeError):
+        st.ResultGrid(path)
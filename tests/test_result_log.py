@@ -0,0 +1,70 @@
+import gzip
+import json
+import os
+
+import pytest
+
+import shield_tester as st
+
+
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_records_are_written_in_batches(tmp_path):
+    path = str(tmp_path / "logs" / "results.jsonl")
+    with st.ResultLog(path, batch_size=10, flush_interval=60) as log:
+        for i in range(25):
+            log.write({"index": i})
+        log.flush()
+        assert [record["index"] for record in read_records(path)] == list(range(25))
+        assert log.records_written == 25
+    assert log.batches_written >= 3
+    with pytest.raises(RuntimeError):
+        log.write({"index": 25})
+
+
+def test_rotation(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    with st.ResultLog(path, max_bytes=200, backups=2, batch_size=1) as log:
+        for i in range(40):
+            log.write({"index": i, "padding": "x" * 20})
+    assert log.rotations > 2
+    assert os.path.getsize(path) <= 200
+    assert os.path.exists(path + ".1.gz") and os.path.exists(path + ".2.gz") and not os.path.exists(path + ".3.gz")
+    with gzip.open(path + ".1.gz", "rt") as f:
+        backup = [json.loads(line) for line in f]
+    # the newest backup is followed by the current file
+    assert backup[-1]["index"] + 1 == read_records(path)[0]["index"]
+    assert read_records(path)[-1]["index"] == 39
+
+
+def test_write_log_record(tester, tmp_path):
+    test_case = tester.select_ship("Synthetic Ship 5")
+    test_case.number_of_boosters_to_test = 2
+    test_case.kinetic_dps = 60
+    tester.set_boosters_to_test(test_case, short_list=False)
+    result = tester.compute(test_case)
+    path = str(tmp_path / "results.jsonl")
+    with st.ResultLog(path) as log:
+        tester.write_log_record(log, test_case, result, include_service="EDSY")
+    record = read_records(path)[0]
+    assert record["test_case"]["ship"] == "Synthetic Ship 5" and record["test_case"]["kinetic_dps"] == 60
+    assert record["result"]["survival_time"] == pytest.approx(result.survival_time)
+    assert len(record["result"]["boosters"]) == 2
+    assert record["export"] == tester.get_export(result.loadout, "EDSY")
+
+
+@pytest.mark.parametrize("service", ["Coriolis", "EDSY", "SLEF"])
+def test_get_exports(tester, service):
+    test_case = tester.select_ship("Synthetic Ship 5")
+    test_case.number_of_boosters_to_test = 2
+    tester.set_boosters_to_test(test_case, short_list=False)
+    results = tester.compute(test_case, top_k=4)
+    loadouts = [r.loadout for r in results] + [None]
+    exports = tester.get_exports(loadouts, service)
+    assert exports == [tester.get_export(loadout, service) for loadout in loadouts]
+    if service == "SLEF":
+        assert exports[0] is not exports[1]
+        assert exports[0]["Modules"] is not exports[1]["Modules"]
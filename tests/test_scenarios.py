@@ -0,0 +1,42 @@
+import copy
+
+import pytest
+
+import shield_tester as st
+
+SCENARIOS = [{"kinetic_dps": 100, "thermal_dps": 50, "damage_effectiveness": 0.6},
+             {"explosive_dps": 5, "damage_effectiveness": 0.1},
+             {"absolute_dps": 40, "damage_effectiveness": 1, "scb_hitpoints": 800},
+             {"thermal_dps": 150}]  # damage_effectiveness of the test case
+
+
+@pytest.fixture
+def test_case(tester):
+    test_case = tester.select_ship("Synthetic Ship 3")
+    test_case.number_of_boosters_to_test = 2
+    test_case.damage_effectiveness = 0.4
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return test_case
+
+
+@pytest.mark.parametrize("engine", [st.ShieldTester.ENGINE_PYTHON, st.ShieldTester.ENGINE_NUMPY])
+def test_scenarios_match_compute(tester, test_case, engine):
+    if engine == st.ShieldTester.ENGINE_NUMPY and not st.VectorizedEngine.is_available():
+        pytest.skip("NumPy is not installed")
+    results = tester.compute_scenarios(test_case, SCENARIOS, engine=engine)
+    assert len(results) == len(SCENARIOS)
+    for scenario, result in zip(SCENARIOS, results):
+        single = copy.copy(test_case)
+        for name, value in scenario.items():
+            setattr(single, name, value)
+        expected = tester.compute(single)
+        assert result.survival_time == pytest.approx(expected.survival_time)
+        assert result.incoming_dps == pytest.approx(expected.incoming_dps)
+        assert result.total_hitpoints == pytest.approx(expected.total_hitpoints)
+
+
+def test_scenarios_need_something_to_test(tester, test_case):
+    with pytest.raises(RuntimeError):
+        tester.compute_scenarios(test_case, [])
+    with pytest.raises(RuntimeError):
+        tester.compute_scenarios(test_case, [{"warp_speed": 9}])
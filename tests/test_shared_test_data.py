@@ -0,0 +1,53 @@
+import multiprocessing
+import pickle
+
+import pytest
+
+import shield_tester as st
+
+pytestmark = pytest.mark.skipif(not st.SharedTestData.is_available(), reason="multiprocessing.shared_memory is not available")
+
+SCENARIOS = [{"kinetic_dps": 60, "damage_effectiveness": 0.8},
+             {"thermal_dps": 40, "explosive_dps": 40, "damage_effectiveness": 0.3}]
+
+
+def create_test_case(tester):
+    test_case = tester.select_ship("Synthetic Ship 2")
+    test_case.number_of_boosters_to_test = 2
+    test_case.kinetic_dps = 70
+    test_case.damage_effectiveness = 0.5
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return test_case
+
+
+def test_task_matches_test_case(tester):
+    test_case = create_test_case(tester)
+    table = tester.get_booster_bonus_table(test_case.shield_booster_variants, 2)
+    combinations = table.combinations
+    shared = st.SharedTestData.create([test_case], combinations, table.bonuses)
+    try:
+        # tasks only carry the names of the shared memory blocks
+        assert len(pickle.dumps(shared)) < len(pickle.dumps(test_case)) / 10
+
+        start, end = 5, len(combinations) - 3
+        with multiprocessing.Pool(processes=1) as pool:
+            result = shared.restore_result(pool.apply(st.SharedTestData.run_task, (shared, start, end, st.TestCase.test_case)))
+        expected = st.TestCase.test_case(test_case, list(combinations[start:end]), table.get_bonuses_slice(start, end))
+        assert str(result.loadout.shield_generator) == str(expected.loadout.shield_generator)
+        assert [str(b) for b in result.loadout.boosters] == [str(b) for b in expected.loadout.boosters]
+        assert result.survival_time == pytest.approx(expected.survival_time)
+        assert result.incoming_dps == pytest.approx(expected.incoming_dps)
+    finally:
+        shared.close()
+    assert not shared._blocks
+
+
+def test_pool_uses_shared_data(mp_tester):
+    test_case = create_test_case(mp_tester)
+    results = mp_tester.compute_scenarios(test_case, SCENARIOS)
+    mp_tester.cpu_cores = 1
+    expected = mp_tester.compute_scenarios(test_case, SCENARIOS)
+    for result, other in zip(results, expected):
+        assert str(result.loadout.shield_generator) == str(other.loadout.shield_generator)
+        assert result.survival_time == pytest.approx(other.survival_time)
+        assert result.incoming_dps == pytest.approx(other.incoming_dps)
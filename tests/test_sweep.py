@@ -0,0 +1,59 @@
+import copy
+import csv
+
+import pytest
+
+import shield_tester as st
+
+AXES = {"damage_effectiveness": [0.3, 0.65, 1.0], "kinetic_dps": [0, 50, 100], "thermal_dps": [0, 100]}
+
+
+def create_test_case(tester):
+    test_case = tester.select_ship("Synthetic Ship 5")
+    test_case.number_of_boosters_to_test = 2
+    test_case.explosive_dps = 20
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return test_case
+
+
+def test_sweep_tests_every_cell(tester):
+    test_case = create_test_case(tester)
+    sweep = tester.sweep(test_case, AXES)
+    assert len(sweep) == 18 and sweep.number_of_evaluated_cells == 18
+    for index in range(len(sweep)):
+        cell_test_case = copy.copy(test_case)
+        for name, value in sweep.get_parameters(index).items():
+            setattr(cell_test_case, name, value)
+        expected = tester.compute(cell_test_case, use_cache=False)
+        assert sweep.survival_times[index] == pytest.approx(expected.survival_time)
+        assert sweep.incoming_dps[index] == pytest.approx(expected.incoming_dps)
+        assert len(sweep.get_loadout(index).boosters) == 2
+
+
+def test_adaptive_sweep(tester):
+    test_case = create_test_case(tester)
+    full = tester.sweep(test_case, AXES)
+    adaptive = tester.sweep(test_case, AXES, adaptive=True)
+    assert 0 < adaptive.number_of_evaluated_cells <= len(adaptive)
+    for index in range(len(adaptive)):
+        if adaptive.evaluated[index]:
+            assert adaptive.get_winner(index) == full.get_winner(index)
+        assert adaptive.get_winner(index)[0] != st.SweepResult.NO_WINNER
+
+
+def test_save_csv(tester, tmp_path):
+    sweep = tester.sweep(create_test_case(tester), AXES)
+    file = str(tmp_path / "sweep.csv")
+    sweep.save_csv(file)
+    with open(file, newline="") as csv_file:
+        rows = list(csv.reader(csv_file))
+    assert len(rows) == 19
+    assert rows[0][:3] == ["damage_effectiveness", "kinetic_dps", "thermal_dps"]
+
+
+def test_invalid_axes(tester):
+    test_case = create_test_case(tester)
+    with pytest.raises(RuntimeError):
+        tester.sweep(test_case, {"hull_mass": [1, 2]})
+    with pytest.raises(RuntimeError):
+        tester.sweep(test_case, {"kinetic_dps": []})
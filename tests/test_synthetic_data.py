@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+import shield_tester as st
+from conftest import DATA_FILE
+from shield_tester.Benchmark import Benchmark
+
+
+def test_synthetic_data_is_reproducible(tmp_path):
+    # tests/data.json was created with the default settings
+    with open(DATA_FILE) as json_file:
+        assert st.SyntheticData.create() == json.load(json_file)
+    assert st.SyntheticData.create(seed=1) == st.SyntheticData.create(seed=1)
+    assert st.SyntheticData.create(seed=1) != st.SyntheticData.create(seed=2)
+
+    path = str(tmp_path / "small.json")
+    st.SyntheticData.write(path, number_of_ships=2, module_classes=3, number_of_booster_variants=4)
+    tester = st.ShieldTester()
+    tester.load_data(path)
+    assert len(tester.ship_names) == 2
+    assert len(tester.select_ship(tester.ship_names[0]).shield_booster_variants) <= 4
+
+
+def test_invalid_settings():
+    with pytest.raises(RuntimeError):
+        st.SyntheticData.create(module_classes=9)
+
+
+def test_benchmark_reports_regressions(tmp_path):
+    benchmark = Benchmark(repetitions=1, max_boosters=1, cpu_cores=1, console_output=False,
+                             synthetic_settings={"number_of_ships": 1, "module_classes": 2, "number_of_booster_variants": 3})
+    results = benchmark.run()
+    assert {"load_data", "select_ship", "prelim"} <= set(results["timings"])
+    path = str(tmp_path / "baseline.json")
+    Benchmark.save(results, path)
+    baseline = Benchmark.load(path)
+    assert Benchmark.compare(baseline, results) == []
+
+    slower = dict(results, timings={key: seconds * 2 + 1 for key, seconds in results["timings"].items()})
+    assert len(Benchmark.compare(baseline, slower)) == len(results["timings"])
@@ -0,0 +1,51 @@
+import pytest
+
+import shield_tester as st
+
+
+def create_test_case(tester):
+    test_case = tester.select_ship("Synthetic Ship 5")
+    test_case.number_of_boosters_to_test = 3
+    test_case.kinetic_dps = 80
+    test_case.thermal_dps = 40
+    test_case.damage_effectiveness = 0.6
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return test_case
+
+
+def test_large_budget_finds_best_result(tester):
+    test_case = create_test_case(tester)
+    expected = tester.compute(test_case, use_cache=False)
+    result = tester.compute(test_case, time_budget=600, use_cache=False)
+    assert result.search_finished and result.coverage == 1.0
+    assert result.survival_time == pytest.approx(expected.survival_time)
+    assert result.incoming_dps == pytest.approx(expected.incoming_dps)
+
+
+@pytest.mark.parametrize("engine", [st.ShieldTester.ENGINE_PYTHON, st.ShieldTester.ENGINE_NUMPY])
+def test_tiny_budget_returns_a_result(tester, engine):
+    if engine == st.ShieldTester.ENGINE_NUMPY and not st.VectorizedEngine.is_available():
+        pytest.skip("NumPy is not installed")
+    test_case = create_test_case(tester)
+    # the first task is always finished
+    result = tester.compute(test_case, engine=engine, time_budget=1e-5, use_cache=False)
+    assert result.loadout is not None and len(result.loadout.boosters) == 3
+    assert 0 < result.coverage < 1 and not result.search_finished
+
+    ranking = tester.compute(test_case, engine=engine, top_k=5, time_budget=1e-5, use_cache=False)
+    assert len(ranking) == 5
+
+
+def test_tiny_budget_with_pool(mp_tester):
+    test_case = create_test_case(mp_tester)
+    result = mp_tester.compute(test_case, time_budget=1e-5, use_cache=False)
+    assert result.loadout is not None and result.coverage > 0
+    # tasks that were skipped because of the deadline don't affect the next call
+    expected = mp_tester.compute(test_case, use_cache=False)
+    mp_tester.cpu_cores = 1
+    assert expected.survival_time == pytest.approx(mp_tester.compute(test_case, use_cache=False).survival_time)
+
+
+def test_budget_is_not_supported_by_branch_and_bound(tester):
+    with pytest.raises(RuntimeError):
+        tester.compute(create_test_case(tester), search=st.ShieldTester.SEARCH_BRANCH_AND_BOUND, time_budget=1)
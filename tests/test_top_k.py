@@ -0,0 +1,47 @@
+import functools
+
+import pytest
+
+import shield_tester as st
+
+
+def get_values(results):
+    return [(round(result.survival_time, 9), round(result.incoming_dps, 9), round(result.total_hitpoints, 9)) for result in results]
+
+
+@pytest.fixture
+def test_case(tester):
+    test_case = tester.select_ship("Synthetic Ship 0")
+    test_case.number_of_boosters_to_test = 2
+    test_case.kinetic_dps = 100
+    test_case.damage_effectiveness = 0.6
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return test_case
+
+
+def test_top_k_is_best_of_all_results(tester, test_case):
+    number_of_results = len(test_case.loadout_list) * st.BoosterBonusTable.count_combinations(len(test_case.shield_booster_variants), 2)
+    everything = tester.compute(test_case, top_k=number_of_results, remove_dominated=False, use_cache=False)
+    assert len(everything) == number_of_results
+
+    # every result is ranked at least as good as the next one
+    expected = sorted(everything, key=functools.cmp_to_key(lambda a, b: -1 if a.is_better_than(b) else (1 if b.is_better_than(a) else 0)))
+    assert get_values(everything) == get_values(expected)
+
+    ranking = tester.compute(test_case, top_k=20, remove_dominated=False, use_cache=False)
+    assert get_values(ranking) == get_values(everything[:20])
+    assert get_values(ranking[:1]) == get_values([tester.compute(test_case, use_cache=False)])
+
+
+def test_top_k_keeps_dominated_variants(tester, test_case):
+    filtered = tester.compute(test_case, top_k=20, remove_dominated=True, use_cache=False)
+    unfiltered = tester.compute(test_case, top_k=20, remove_dominated=False, use_cache=False)
+    assert len(filtered) == 20
+    assert get_values(filtered) == get_values(unfiltered)
+
+
+@pytest.mark.skipif(not st.VectorizedEngine.is_available(), reason="NumPy is not installed")
+def test_engines_find_same_ranking(tester, test_case):
+    python_ranking = tester.compute(test_case, top_k=15, engine=st.ShieldTester.ENGINE_PYTHON, use_cache=False)
+    numpy_ranking = tester.compute(test_case, top_k=15, engine=st.ShieldTester.ENGINE_NUMPY, use_cache=False)
+    assert get_values(numpy_ranking) == get_values(python_ranking)
@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+
+import shield_tester as st
+
+
+def create_test_case(tester, number_of_boosters):
+    test_case = tester.select_ship("Synthetic Ship 1")
+    test_case.number_of_boosters_to_test = number_of_boosters
+    test_case.kinetic_dps = 90
+    test_case.explosive_dps = 30
+    test_case.damage_effectiveness = 0.5
+    tester.set_boosters_to_test(test_case, short_list=False)
+    return test_case
+
+
+def compute_serial(tester, test_case, **kwargs):
+    tester.cpu_cores = 1
+    try:
+        return tester.compute(test_case, use_cache=False, **kwargs)
+    finally:
+        tester.cpu_cores = 2
+
+
+def get_values(result):
+    return round(result.survival_time, 9), round(result.incoming_dps, 9), round(result.total_hitpoints, 9), len(result.loadout.boosters)
+
+
+@pytest.mark.parametrize("engine", [st.ShieldTester.ENGINE_PYTHON, st.ShieldTester.ENGINE_NUMPY])
+@pytest.mark.parametrize("number_of_boosters", [1, 3])
+def test_pool_finds_same_result(mp_tester, number_of_boosters, engine):
+    if engine == st.ShieldTester.ENGINE_NUMPY and not st.VectorizedEngine.is_available():
+        pytest.skip("NumPy is not installed")
+    test_case = create_test_case(mp_tester, number_of_boosters)
+    expected = compute_serial(mp_tester, test_case, engine=engine)
+    assert get_values(mp_tester.compute(test_case, engine=engine, use_cache=False)) == get_values(expected)
+
+    expected_ranking = compute_serial(mp_tester, test_case, engine=engine, top_k=10)
+    assert [get_values(r) for r in mp_tester.compute(test_case, engine=engine, top_k=10, use_cache=False)] == [get_values(r) for r in expected_ranking]
+
+
+def test_cancel_keeps_pool_usable(mp_tester):
+    test_case = create_test_case(mp_tester, 3)
+    expected = compute_serial(mp_tester, test_case)
+    steps = list()
+
+    def callback(value):
+        if value == st.ShieldTester.CALLBACK_STEP:
+            steps.append(value)
+            mp_tester.cancel()
+
+    results = list()
+    thread = threading.Thread(target=lambda: results.append(mp_tester.compute(test_case, callback=callback, use_cache=False)))
+    thread.start()
+    thread.join(timeout=60)
+    assert not thread.is_alive()
+    assert results == [None]
+    assert steps
+
+    # the next call uses the same pool and isn't affected by the cancelled tasks
+    assert get_values(mp_tester.compute(test_case, use_cache=False)) == get_values(expected)